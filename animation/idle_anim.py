@@ -3,6 +3,7 @@ import time
 import random
 from animation.eye_anims import EyeAnimator
 from inout.piper_output import speak_and_display
+from inout.audio_output import PRIORITY_IDLE
 
 class IdleAnimation:
     def __init__(self, lcd, on_shutdown=None, check_interval=10):
@@ -51,7 +52,8 @@ class IdleAnimation:
         if 1 <= elapsed_minutes <= 5 and elapsed_ticks % (60 // self.check_interval) == 0:
             message = self.idle_messages.get(elapsed_minutes)
             if message:
-                speak_and_display(message, lang="en", lcd=None)
+                # Prioritas idle: dibuang jika sedang ada suara lain, dipotong jika prompt datang
+                speak_and_display(message, lang="en", lcd=None, priority=PRIORITY_IDLE)
             return
 
         # Shutdown di menit ke-6
@@ -65,7 +67,8 @@ class IdleAnimation:
         speak_and_display(
             "It seems I'm not being used. Goodbye.",
             lang="en",
-            lcd=None
+            lcd=None,
+            priority=PRIORITY_IDLE
         )
         self.eye.sleep()
         self.lcd.clear()
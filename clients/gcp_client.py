@@ -10,9 +10,11 @@ import time
 from google.cloud import speech
 from google.cloud import texttospeech
 from google.cloud import translate_v3 as translate
+import grpc
 import google.generativeai as genai
-from google.api_core.exceptions import GoogleAPIError
+from google.api_core.exceptions import GoogleAPIError, from_grpc_error
 from utils.path_helper import get_resource_path
+from utils.cancellation import Cancelled, resolve, run_cancellable
 
 # === KONFIGURASI KREDENSIAL & API ===
 CREDENTIALS_DIR = Path(get_resource_path("gcp_credential"))
@@ -36,18 +38,71 @@ if GEMINI_API_KEY_FILE.exists():
         genai.configure(api_key=api_key)
         gemini_model = genai.GenerativeModel("gemini-flash-lite-latest")
 
+PHRASE_HINT_BOOST = 15.0
+
 speech_client = speech.SpeechClient()
 tts_client = texttospeech.TextToSpeechClient()
 translate_client = translate.TranslationServiceClient()
 
 
-def gcp_transcribe_audio(audio_bytes, language_code="id-ID"):
+def _grpc_call(client, method, request, cancel=None, timeout=None, metadata=()):
+    """
+    Panggil RPC unary `method` lewat stub gRPC milik transport `client` sebagai future:
+    saat token `cancel` (default giliran saat ini) batal RPC-nya di-cancel, sehingga
+    server ikut berhenti, bukan hanya ditinggalkan. Error gRPC dilempar sebagai GoogleAPIError.
+    """
+    cancel = resolve(cancel)
+    cancel.raise_if_cancelled()
+    future = getattr(client._transport, method).future(request, timeout=timeout, metadata=metadata)
+    unregister = cancel.on_cancel(future.cancel)
+    try:
+        return future.result()
+    except grpc.FutureCancelledError:
+        raise Cancelled(cancel.reason or "dibatalkan")
+    except grpc.RpcError as e:
+        if cancel.cancelled:
+            raise Cancelled(cancel.reason or "dibatalkan")
+        raise from_grpc_error(e)
+    finally:
+        unregister()
+
+
+def _recognition_config(language_code, sample_rate_hertz, phrase_hints=None):
+    """RecognitionConfig LINEAR16 bersama untuk recognize dan streaming_recognize."""
+    config_args = {
+        "encoding": speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        "sample_rate_hertz": sample_rate_hertz,
+        "enable_automatic_punctuation": True,
+    }
+
+    if phrase_hints:
+        # Pertanyaan tertutup: arahkan pengenal ke daftar perintah yang diharapkan
+        config_args["speech_contexts"] = [
+            speech.SpeechContext(phrases=list(dict.fromkeys(phrase_hints)), boost=PHRASE_HINT_BOOST)
+        ]
+
+    if language_code == "und":
+        config_args["language_code"] = "id-ID"
+        config_args["alternative_language_codes"] = ["en-US"]
+        print("[INFO] STT mode: Auto-detect (ID/EN)")
+    else:
+        config_args["language_code"] = language_code
+        print(f"[INFO] STT mode: Specific language ({language_code})")
+
+    return speech.RecognitionConfig(**config_args)
+
+
+def gcp_transcribe_audio(audio_bytes, language_code="id-ID", sample_rate_hertz=None, phrase_hints=None,
+                         cancel=None):
     """
     Mengubah audio menjadi teks menggunakan Google Cloud Speech-to-Text.
     
     Args:
-        audio_bytes (bytes): Data audio mentah.
+        audio_bytes (bytes): File WAV, atau PCM16 mentah jika sample_rate_hertz diisi.
         language_code (str): Kode bahasa (misal 'id-ID', 'en-US', atau 'und' untuk auto-detect).
+        sample_rate_hertz (int, optional): Sample rate PCM mentah; jika None dibaca dari header WAV.
+        phrase_hints (list, optional): Perintah yang diharapkan (speech context).
+        cancel (CancelToken, optional): Default token giliran saat ini; "" jika dibatalkan.
     
     Returns:
         str: Hasil transkripsi teks.
@@ -55,26 +110,17 @@ def gcp_transcribe_audio(audio_bytes, language_code="id-ID"):
     if not audio_bytes:
         return ""
     try:
-        data, samplerate = sf.read(io.BytesIO(audio_bytes))
-        audio = speech.RecognitionAudio(content=audio_bytes)
-
-        config_args = {
-            "encoding": speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            "sample_rate_hertz": samplerate,
-            "enable_automatic_punctuation": True,
-        }
-        
-        if language_code == "und":
-            config_args["language_code"] = "id-ID"
-            config_args["alternative_language_codes"] = ["en-US"]
-            print("[INFO] STT mode: Auto-detect (ID/EN)")
+        if sample_rate_hertz is None:
+            samplerate = sf.info(io.BytesIO(audio_bytes)).samplerate
         else:
-            config_args["language_code"] = language_code
-            print(f"[INFO] STT mode: Specific language ({language_code})")
+            samplerate = sample_rate_hertz
+        audio = speech.RecognitionAudio(content=audio_bytes)
+        config = _recognition_config(language_code, samplerate, phrase_hints)
 
-        config = speech.RecognitionConfig(**config_args)
-        
-        resp = speech_client.recognize(config=config, audio=audio, timeout=20)
+        resp = _grpc_call(
+            speech_client, "recognize", speech.RecognizeRequest(config=config, audio=audio),
+            cancel=cancel, timeout=20,
+        )
 
         # Ambil semua hasil transkrip dan gabungkan
         if resp.results:
@@ -82,21 +128,87 @@ def gcp_transcribe_audio(audio_bytes, language_code="id-ID"):
             return " ".join(transcripts)
         return ""
 
+    except Cancelled:
+        print("[INFO] STT dibatalkan.")
+        return ""
     except GoogleAPIError as e:
         print(f"[ERROR STT] {e}")
         return ""
     except Exception as e:
         print(f"[ERROR STT Tak Terduga] {e}")
         return ""
-        
-        
-def gcp_text_to_speech(text, language_code="id-ID", voice_name=None, speaking_rate=1.0):
+
+
+
+def gcp_streaming_transcribe(audio_chunks, language_code="id-ID", sample_rate_hertz=16000,
+                             on_partial=None, phrase_hints=None, timeout=300, cancel=None):
+    """
+    Transkripsi streaming: potongan PCM16 dikirim selagi masih direkam.
+
+    Args:
+        audio_chunks (iterable of bytes): PCM16 mentah; iterasi berakhir saat rekaman selesai.
+        language_code (str): Kode bahasa (misal 'id-ID', 'en-US', atau 'und').
+        sample_rate_hertz (int): Sample rate PCM.
+        on_partial (callable, optional): Dipanggil dengan teks sementara (interim results).
+        phrase_hints (list, optional): Perintah yang diharapkan (speech context).
+        cancel (CancelToken, optional): Default token giliran saat ini; stream diputus saat batal.
+
+    Returns:
+        str: Gabungan hasil final, atau None jika gagal/dibatalkan (pemanggil boleh fallback ke recognize).
+    """
+    cancel = resolve(cancel)
+    unregister = lambda: None
+    try:
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=_recognition_config(language_code, sample_rate_hertz, phrase_hints),
+            interim_results=on_partial is not None,
+        )
+        stream_requests = (
+            speech.StreamingRecognizeRequest(audio_content=chunk)
+            for chunk in audio_chunks if chunk
+        )
+        responses = speech_client.streaming_recognize(
+            config=streaming_config, requests=stream_requests, timeout=timeout
+        )
+        unregister = cancel.on_cancel(responses.cancel)
+
+        finals = []
+        for resp in responses:
+            cancel.raise_if_cancelled()
+            for result in resp.results:
+                if not result.alternatives:
+                    continue
+                transcript = result.alternatives[0].transcript
+                if result.is_final:
+                    finals.append(transcript.strip())
+                elif on_partial:
+                    on_partial(" ".join(finals + [transcript.strip()]))
+        cancel.raise_if_cancelled()
+        return " ".join(t for t in finals if t)
+
+    except Cancelled:
+        print("[INFO] STT streaming dibatalkan.")
+        return None
+    except GoogleAPIError as e:
+        if cancel.cancelled:
+            print("[INFO] STT streaming dibatalkan.")
+            return None
+        print(f"[ERROR STT Streaming] {e}")
+        return None
+    except Exception as e:
+        print(f"[ERROR STT Streaming Tak Terduga] {e}")
+        return None
+    finally:
+        unregister()
+
+
+def gcp_text_to_speech(text, language_code="id-ID", voice_name=None, speaking_rate=1.0, cancel=None):
     """
     Mengubah teks menjadi audio menggunakan Google Cloud Text-to-Speech.
     Hasil audio di-boost dan ternormalisasi agar setara dengan Piper TTS.
     
     Returns:
-        bytes: Data audio hasil TTS dalam format WAV PCM16.
+        bytes: Data audio hasil TTS dalam format WAV PCM16 (b"" jika gagal/dibatalkan).
     """
     if not text:
         return b""
@@ -113,9 +225,10 @@ def gcp_text_to_speech(text, language_code="id-ID", voice_name=None, speaking_ra
             volume_gain_db=6.0  # boost volume +6 dB
         )
 
-        resp = tts_client.synthesize_speech(
+        request = texttospeech.SynthesizeSpeechRequest(
             input=synthesis_input, voice=voice_params, audio_config=audio_config
         )
+        resp = _grpc_call(tts_client, "synthesize_speech", request, cancel=cancel, timeout=20)
 
         # Load audio bytes → float32
         data, samplerate = sf.read(io.BytesIO(resp.audio_content), dtype="float32")
@@ -131,12 +244,15 @@ def gcp_text_to_speech(text, language_code="id-ID", voice_name=None, speaking_ra
         sf.write(buf, data, samplerate, format="WAV", subtype="PCM_16")
         return buf.getvalue()
 
+    except Cancelled:
+        print("[INFO] TTS GCP dibatalkan.")
+        return b""
     except GoogleAPIError as e:
         print(f"[ERROR TTS] {e}")
         return b""
 
         
-def gcp_translate_text(text, target_language="en", source_language=None):
+def gcp_translate_text(text, target_language="en", source_language=None, cancel=None):
     """
     Menerjemahkan teks menggunakan Google Cloud Translate.
     
@@ -144,6 +260,7 @@ def gcp_translate_text(text, target_language="en", source_language=None):
         text (str): Teks yang akan diterjemahkan.
         target_language (str): Kode bahasa tujuan.
         source_language (str, optional): Kode bahasa sumber.
+        cancel (CancelToken, optional): Default token giliran saat ini; "" jika dibatalkan.
     
     Returns:
         str: Hasil terjemahan.
@@ -152,28 +269,105 @@ def gcp_translate_text(text, target_language="en", source_language=None):
         return ""
     try:
         parent = f"projects/{PROJECT_ID}/locations/global"
-        resp = translate_client.translate_text(
+        request = translate.TranslateTextRequest(
             parent=parent,
             contents=[text],
             target_language_code=target_language,
-            source_language_code=source_language,
             mime_type="text/plain",
-            timeout=10,
+        )
+        if source_language:
+            request.source_language_code = source_language
+        resp = _grpc_call(
+            translate_client, "translate_text", request, cancel=cancel, timeout=10,
+            metadata=(("x-goog-request-params", f"parent={parent}"),),
         )
         return resp.translations[0].translated_text if resp.translations else ""
+    except Cancelled:
+        print("[INFO] Terjemahan dibatalkan.")
+        return ""
     except GoogleAPIError as e:
         print(f"[ERROR Translate] {e}")
         return text
 
-def gcp_gemini_generate(prompt, temperature=0.9, max_retries=3, retry_delay=1, timeout=30):
+def _generation_config(temperature, response_schema=None):
+    """GenerationConfig Gemini; dengan response_schema jawaban dipaksa berupa JSON sesuai schema."""
+    if response_schema is None:
+        return genai.types.GenerationConfig(temperature=temperature)
+    return genai.types.GenerationConfig(
+        temperature=temperature,
+        response_mime_type="application/json",
+        response_schema=response_schema,
+    )
+
+
+def _cancel_gemini_stream(resp):
+    """Cancel RPC stream Gemini (iterator gRPC di balik GenerateContentResponse stream=True)."""
+    iterator = getattr(resp, "_iterator", None)
+    if hasattr(iterator, "cancel"):
+        iterator.cancel()
+
+
+def _open_gemini_stream(contents, config, cancel, timeout):
+    """
+    generate_content(stream=True) yang bisa diputus: RPC di-cancel saat token batal,
+    juga jika stream baru terbuka setelah pemanggil berhenti menunggu.
+    Returns (resp, unregister); stream yang tidak dibaca sampai habis harus di-cancel pemanggil.
+    """
+    resp = run_cancellable(
+        gemini_model.generate_content, contents, generation_config=config, stream=True,
+        cancel=cancel, max_wait=timeout, discard=_cancel_gemini_stream,
+    )
+    return resp, cancel.on_cancel(lambda: _cancel_gemini_stream(resp))
+
+
+def _gemini_chunks(resp, cancel, timeout):
+    """Teks tiap potongan stream Gemini; `timeout` berlaku untuk tiap potongan."""
+    chunks = iter(resp)
+    while True:
+        chunk = run_cancellable(next, chunks, None, cancel=cancel, max_wait=timeout)
+        if chunk is None:
+            return
+        try:
+            text = chunk.text
+        except ValueError:
+            continue  # potongan tanpa teks (mis. hanya metadata keamanan)
+        if text:
+            yield text
+
+
+def _gemini_text(contents, config, cancel, timeout):
+    """
+    Jawaban lengkap Gemini. Diambil lewat stream agar saat batal/timeout RPC-nya benar-benar
+    di-cancel (panggilan unary tidak bisa diputus setelah dikirim).
+    """
+    resp, unregister = _open_gemini_stream(contents, config, cancel, timeout)
+    finished = False
+    text = ""
+    try:
+        text = "".join(_gemini_chunks(resp, cancel, timeout))
+        finished = True
+    finally:
+        unregister()
+        if not finished:
+            _cancel_gemini_stream(resp)
+    if not text:
+        raise ValueError("Gemini tidak mengembalikan teks.")  # dicoba ulang seperti error lain
+    return text
+
+
+def gcp_gemini_generate(prompt, temperature=0.9, max_retries=3, retry_delay=1, timeout=30, cancel=None,
+                        response_schema=None):
     """
     Menghasilkan teks dari prompt tunggal menggunakan Gemini.
-    Dengan retry dan timeout manual.
+    Dengan retry dan timeout; RPC diputus saat token `cancel` (default: token
+    giliran saat ini) dibatalkan, lalu "" dikembalikan tanpa retry.
+    `response_schema` (opsional): schema Gemini, jawaban dikembalikan sebagai teks JSON.
     """
     if not gemini_model:
         raise RuntimeError("Model Gemini belum dikonfigurasi.")
     if not prompt:
         return ""
+    cancel = resolve(cancel)
 
     attempt = 1
     while attempt <= max_retries:
@@ -181,34 +375,143 @@ def gcp_gemini_generate(prompt, temperature=0.9, max_retries=3, retry_delay=1, t
             print(f"[INFO] Mengirim prompt ke Gemini (percobaan {attempt}/{max_retries})...")
             start_time = time.time()
 
-            config = genai.types.GenerationConfig(temperature=temperature)
-            resp = gemini_model.generate_content(prompt, generation_config=config)
+            config = _generation_config(temperature, response_schema)
+            text = _gemini_text(prompt, config, cancel, timeout)
 
             elapsed = time.time() - start_time
-            if elapsed > timeout:
-                raise TimeoutError(f"Request melebihi batas {timeout} detik.")
-
             print(f"[INFO] Respons diterima dalam {elapsed:.2f} detik.")
-            return resp.text or ""
+            return text
 
+        except Cancelled:
+            print("[INFO] Generate Gemini dibatalkan.")
+            return ""
         except Exception as e:
             print(f"[WARNING] Gagal generate dari Gemini: {e}")
             if attempt < max_retries:
                 print(f"[INFO] Mencoba ulang dalam {retry_delay} detik...")
-                time.sleep(retry_delay)
+                if not cancel.sleep(retry_delay):
+                    return ""
             attempt += 1
 
     return "[Gagal] Tidak ada respons setelah beberapa percobaan."
 
 
-def gcp_gemini_generate_chat(prompt_or_context, context=None, temperature=0.9, max_retries=3, retry_delay=1, timeout=30):
+def _gemini_stream(contents, label, temperature, max_retries, retry_delay, timeout, cancel):
+    """
+    Generator potongan teks Gemini (generate_content stream=True).
+    Retry hanya sebelum potongan pertama diteruskan; `timeout` berlaku untuk tiap potongan.
+    Error dicetak dan streaming berhenti; pembatalan menghentikan streaming tanpa retry.
+    Returns (lewat StopIteration.value) True jika stream selesai normal dengan teks.
+    """
+    cancel = resolve(cancel)
+    emitted = False
+    for attempt in range(1, max_retries + 1):
+        try:
+            print(f"[INFO] {label} Gemini (stream, percobaan {attempt}/{max_retries})...")
+            start_time = time.time()
+            config = genai.types.GenerationConfig(temperature=temperature)
+            resp, unregister = _open_gemini_stream(contents, config, cancel, timeout)
+            finished = False
+            try:
+                for text in _gemini_chunks(resp, cancel, timeout):
+                    if not emitted:
+                        print(f"[INFO] Potongan pertama Gemini dalam {time.time() - start_time:.2f} detik.")
+                    emitted = True
+                    yield text
+                finished = True
+            finally:
+                # Error, timeout, atau pemanggil berhenti membaca: RPC stream diputus
+                unregister()
+                if not finished:
+                    _cancel_gemini_stream(resp)
+            if emitted:
+                print(f"[INFO] Respons Gemini selesai dalam {time.time() - start_time:.2f} detik.")
+                return True
+            print("[WARNING] Gemini tidak mengembalikan teks.")
+        except Cancelled:
+            print(f"[INFO] {label} Gemini dibatalkan.")
+            return False
+        except Exception as e:
+            print(f"[WARNING] Gagal stream dari Gemini: {e}")
+            if emitted:
+                return False
+        if attempt < max_retries:
+            print(f"[INFO] Mencoba ulang dalam {retry_delay} detik...")
+            if not cancel.sleep(retry_delay):
+                return False
+    return False
+
+
+def gcp_gemini_generate_stream(prompt, temperature=0.9, max_retries=3, retry_delay=1, timeout=30,
+                               cancel=None):
+    """
+    Seperti gcp_gemini_generate, tetapi menghasilkan potongan teks segera setelah
+    Gemini mengirimnya (untuk diucapkan selagi jawaban masih dihasilkan).
+    """
+    if not gemini_model:
+        raise RuntimeError("Model Gemini belum dikonfigurasi.")
+    if not prompt:
+        return
+    yield from _gemini_stream(prompt, "Generate", temperature, max_retries, retry_delay, timeout, cancel)
+
+
+def gcp_gemini_generate_chat_stream(prompt_or_context, context=None, temperature=0.9, max_retries=3,
+                                    retry_delay=1, timeout=30, cancel=None):
+    """
+    Seperti gcp_gemini_generate_chat (dua mode yang sama), tetapi menghasilkan potongan
+    teks secara bertahap. Pada mode 1 jawaban lengkap disimpan ke riwayat setelah stream
+    selesai; jika gagal pesan user dihapus lagi dari riwayat.
+    """
+    if not gemini_model:
+        raise RuntimeError("Model Gemini belum dikonfigurasi.")
+
+    if isinstance(prompt_or_context, str) and context is not None:
+        context.add_user_message(prompt_or_context)
+        messages = context.get_context()
+    elif isinstance(prompt_or_context, list):
+        messages = prompt_or_context
+        context = None
+    else:
+        raise ValueError(
+            "gcp_gemini_generate_chat_stream() membutuhkan prompt string + context, atau list of messages."
+        )
+    if not messages:
+        return
+
+    stream = _gemini_stream(messages, "Chat", temperature, max_retries, retry_delay, timeout, cancel)
+    parts = []
+    completed = False
+    try:
+        while True:
+            try:
+                text = next(stream)
+            except StopIteration as stop:
+                completed = bool(stop.value)
+                break
+            parts.append(text)
+            yield text
+    finally:
+        if context is not None:
+            if completed:
+                context.mark_system_prompt_sent()
+                context.add_assistant_message("".join(parts))
+            elif hasattr(context, "last_user_message") and context.last_user_message() == prompt_or_context:
+                context.messages.pop()
+
+
+def gcp_gemini_generate_chat(prompt_or_context, context=None, temperature=0.9, max_retries=3, retry_delay=1, timeout=30,
+                             cancel=None, response_schema=None):
     """
     Menghasilkan respon chat berbasis riwayat percakapan menggunakan Gemini.
-    Dengan retry dan timeout manual.
+    Dengan retry dan timeout; saat token `cancel` (default: token giliran saat ini)
+    dibatalkan, RPC diputus dan "" dikembalikan tanpa retry.
 
     Bisa dipanggil dalam dua mode:
     1. prompt_or_context = string prompt, context = GcpChatContext → otomatis simpan ke riwayat.
     2. prompt_or_context = list of dicts (pesan manual) → langsung kirim ke Gemini.
+
+    `response_schema` (opsional): schema Gemini (lihat utils/question_schema.gemini_schema);
+    jawaban dipaksa berupa JSON sesuai schema, validasi isinya tetap tugas pemanggil.
     """
     if not gemini_model:
         raise RuntimeError("Model Gemini belum dikonfigurasi.")
@@ -227,6 +530,7 @@ def gcp_gemini_generate_chat(prompt_or_context, context=None, temperature=0.9, m
 
     if not messages:
         return ""
+    cancel = resolve(cancel)
 
     attempt = 1
     while attempt <= max_retries:
@@ -234,18 +538,12 @@ def gcp_gemini_generate_chat(prompt_or_context, context=None, temperature=0.9, m
             print(f"[INFO] Mengirim ke Gemini (percobaan {attempt}/{max_retries})...")
             start_time = time.time()
 
-            config = genai.types.GenerationConfig(temperature=temperature)
-            resp = gemini_model.generate_content(
-                contents=messages,
-                generation_config=config
-            )
+            config = _generation_config(temperature, response_schema)
+            output_text = _gemini_text(messages, config, cancel, timeout)
 
             elapsed = time.time() - start_time
-            if elapsed > timeout:
-                raise TimeoutError(f"Request melebihi batas {timeout} detik.")
 
             print(f"[INFO] Respons diterima dalam {elapsed:.2f} detik.")
-            output_text = resp.text or ""
 
             if context:
                 context.mark_system_prompt_sent()
@@ -254,14 +552,20 @@ def gcp_gemini_generate_chat(prompt_or_context, context=None, temperature=0.9, m
             return output_text
 
         except Exception as e:
-            print(f"[WARNING] Gagal chat ke Gemini: {e}")
+            if isinstance(e, Cancelled):
+                print("[INFO] Chat Gemini dibatalkan.")
+            else:
+                print(f"[WARNING] Gagal chat ke Gemini: {e}")
             if context and isinstance(prompt_or_context, str):
                 if hasattr(context, "last_user_message") and context.last_user_message() == prompt_or_context:
                     if hasattr(context, "messages"):
                         context.messages.pop()
+            if isinstance(e, Cancelled):
+                return ""
             if attempt < max_retries:
                 print(f"[INFO] Mencoba ulang dalam {retry_delay} detik...")
-                time.sleep(retry_delay)
+                if not cancel.sleep(retry_delay):
+                    return ""
             attempt += 1
 
     return "[Gagal] Tidak ada respons setelah beberapa percobaan."
@@ -1,10 +1,120 @@
-import requests
+import json
+import threading
 import time
+import requests
+from requests.adapters import HTTPAdapter
+from utils.cancellation import Cancelled, resolve, run_cancellable
+
+OLLAMA_URL = "http://localhost:11434"
+DEFAULT_MODEL = "gemma3:1b"
+CONNECT_TIMEOUT = 3.05   # detik; server lokal, koneksi yang lama berarti Ollama tidak berjalan
+READ_TIMEOUT = 60        # detik tanpa data baru dari server (termasuk waktu memuat model)
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5      # detik sebelum retry pertama, dilipatgandakan tiap percobaan
+RETRY_BACKOFF_MAX = 4
+POOL_SIZE = 4            # koneksi keep-alive yang disimpan (chat + prefetch/warm-up paralel)
+
+_session = None
+_session_lock = threading.Lock()
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+class EmptyResponse(Exception):
+    """Model menjawab tanpa teks sama sekali (diperlakukan seperti error sementara)."""
+
+
+class GenerationStats:
+    """
+    Metadata waktu satu generasi Ollama (semua dalam detik).
+    - ttft: waktu sampai potongan teks pertama diterima (diukur di klien, dari percobaan terakhir)
+    - total: waktu total di klien
+    - load_duration, prompt_eval_duration, eval_duration: dari respons akhir Ollama
+    - prompt_tokens, tokens: jumlah token prompt dan token yang dihasilkan
+    - tokens_per_second: kecepatan generasi (tokens / eval_duration)
+    - completed: True jika Ollama mengirim potongan terakhir ("done")
+    """
+
+    def __init__(self):
+        self.start()
+
+    def start(self):
+        self._started = time.monotonic()
+        self.first_token = None
+        self.ttft = None
+        self.total = None
+        self.load_duration = None
+        self.prompt_eval_duration = None
+        self.eval_duration = None
+        self.prompt_tokens = None
+        self.tokens = None
+        self.completed = False
+
+    def mark_first_token(self):
+        self.first_token = time.monotonic()
+        self.ttft = self.first_token - self._started
+
+    def finish(self, chunk):
+        """Isi dari potongan terakhir Ollama (durasi dalam nanodetik)."""
+        self.total = time.monotonic() - self._started
+        for field in ("load_duration", "prompt_eval_duration", "eval_duration"):
+            if chunk.get(field) is not None:
+                setattr(self, field, chunk[field] / 1e9)
+        self.prompt_tokens = chunk.get("prompt_eval_count")
+        self.tokens = chunk.get("eval_count")
+        self.completed = True
+
+    @property
+    def tokens_per_second(self):
+        if not self.tokens or not self.eval_duration:
+            return None
+        return self.tokens / self.eval_duration
+
+    def __str__(self):
+        def fmt(value, unit="s"):
+            return "-" if value is None else f"{value:.2f}{unit}"
+        return (f"token pertama {fmt(self.ttft)}, total {fmt(self.total)}, "
+                f"{self.tokens or 0} token @ {fmt(self.tokens_per_second, ' tok/s')}, "
+                f"load {fmt(self.load_duration)}, prompt {fmt(self.prompt_eval_duration)} "
+                f"({self.prompt_tokens or 0} token)")
+
+
+def get_session():
+    """Session HTTP bersama untuk semua OllamaClient: koneksi ke server dipakai ulang (keep-alive)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def get_ollama_client(model=DEFAULT_MODEL, base_url=OLLAMA_URL):
+    """Instance OllamaClient bersama per (base_url, model); dipakai semua mode offline."""
+    with _clients_lock:
+        client = _clients.get((base_url, model))
+        if client is None:
+            client = _clients[(base_url, model)] = OllamaClient(base_url=base_url, model=model)
+        return client
+
+
+def _is_retryable(error):
+    """Error sementara yang layak dicoba ulang: koneksi/timeout, 5xx, atau jawaban kosong."""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                          requests.exceptions.ChunkedEncodingError, EmptyResponse)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return False
+
 
 class OllamaClient:
-    def __init__(self, base_url="http://localhost:11434", model="gemma3:1b"):
+    def __init__(self, base_url=OLLAMA_URL, model=DEFAULT_MODEL):
         """
-        Inisialisasi klien Ollama.
+        Inisialisasi klien Ollama. Gunakan get_ollama_client() agar instance dan
+        koneksinya dipakai bersama.
         
         Parameters:
         - base_url: URL dasar API Ollama.
@@ -12,97 +122,261 @@ class OllamaClient:
         """
         self.base_url = base_url
         self.model = model
+        self.session = get_session()
+        # keep_alive yang dikirim bersama setiap request (None = default server);
+        # diatur oleh OllamaResidency agar chat/generate tidak mereset pin model.
+        self.keep_alive = None
 
-    def generate(self, prompt, stream=False):
+    def _post_stream(self, path, payload, timeout, cancel):
+        """
+        POST dengan streaming NDJSON; yield tiap objek JSON.
+        Saat token dibatalkan koneksi ditutup, sehingga Ollama ikut menghentikan generasi;
+        jika header respons baru tiba setelah batal, koneksinya langsung ditutup saat itu.
+        """
+        payload = dict(payload, stream=True)
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        response = run_cancellable(
+            self.session.post, f"{self.base_url}{path}",
+            json=payload, stream=True,
+            timeout=(CONNECT_TIMEOUT, timeout), cancel=cancel,
+            discard=lambda late: late.close(),
+        )
+        unregister = cancel.on_cancel(response.close)
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                cancel.raise_if_cancelled()
+                if line:
+                    yield json.loads(line)
+            cancel.raise_if_cancelled()
+        except (requests.exceptions.RequestException, AttributeError, ValueError):
+            # Koneksi yang ditutup karena pembatalan muncul sebagai error baca
+            cancel.raise_if_cancelled()
+            raise
+        finally:
+            unregister()
+            response.close()
+
+    def _stream(self, label, path, payload, extract, timeout, max_retries, cancel, stats):
+        """
+        Generator potongan teks dengan kebijakan retry bersama: error sementara (lihat
+        _is_retryable) dicoba ulang dengan backoff eksponensial selama belum ada teks yang
+        diteruskan ke pemanggil; setelah itu (dan untuk error lain/pembatalan) error dilempar.
+        `stats` (GenerationStats) diisi selama dan setelah streaming.
+        """
+        delay = RETRY_BACKOFF
+        for attempt in range(1, max_retries + 1):
+            print(f"[INFO] {label} ke Ollama (percobaan {attempt}/{max_retries})...")
+            stats.start()
+            held = []  # potongan awal berisi spasi saja ditahan agar jawaban kosong bisa di-retry
+            try:
+                for chunk in self._post_stream(path, payload, timeout, cancel):
+                    delta = extract(chunk)
+                    if delta:
+                        if stats.first_token is None:
+                            if not delta.strip():
+                                held.append(delta)
+                                continue
+                            stats.mark_first_token()
+                            delta = "".join(held) + delta
+                        yield delta
+                    if chunk.get("done"):
+                        stats.finish(chunk)
+                if stats.first_token is None:
+                    raise EmptyResponse("Model tidak mengembalikan teks.")
+                print(f"[INFO] {label} Ollama: {stats}")
+                return
+            except Cancelled:
+                raise
+            except Exception as e:
+                if stats.first_token is not None or attempt == max_retries or not _is_retryable(e):
+                    raise
+                print(f"[WARNING] {label} gagal ({type(e).__name__}), mencoba ulang dalam {delay:.1f} detik...")
+            if not cancel.sleep(delay):
+                cancel.raise_if_cancelled()
+            delay = min(delay * 2, RETRY_BACKOFF_MAX)
+
+    def _generate_args(self, prompt, format=None):
+        payload = {"model": self.model, "prompt": prompt}
+        if format is not None:
+            payload["format"] = format
+        return ("Generate", "/api/generate", payload, lambda chunk: chunk.get("response", ""))
+
+    def _chat_args(self, prompt_or_context, context, format=None):
+        if isinstance(prompt_or_context, str) and context is not None:
+            # Mode 1: prompt string + objek ChatContext
+            context.add_user_message(prompt_or_context)
+            messages = context.get_context()
+        elif isinstance(prompt_or_context, list):
+            # Mode 2: langsung kirim list pesan tanpa objek context
+            messages = prompt_or_context
+        else:
+            raise ValueError(
+                "chat() membutuhkan prompt string + context, atau list of messages."
+            )
+        payload = {"model": self.model, "messages": messages}
+        if format is not None:
+            payload["format"] = format
+        return ("Chat", "/api/chat", payload, lambda chunk: chunk.get("message", {}).get("content", ""))
+
+    @staticmethod
+    def _record_chat(context, prompt, reply):
+        """
+        Mode 1: simpan jawaban asisten ke riwayat; jika gagal/dibatalkan pesan user dihapus
+        lagi agar giliran berikutnya tidak mengirim dua pesan user berturut-turut.
+        """
+        if reply:
+            context.add_assistant_message(reply)
+        elif context.messages and context.messages[-1] == {"role": "user", "content": prompt}:
+            context.messages.pop()
+
+    def _recorded_stream(self, stream, context, prompt, stats):
+        """Teruskan potongan `stream`, lalu catat jawaban lengkap ke `context` (lihat _record_chat)."""
+        parts = []
+        try:
+            for delta in stream:
+                parts.append(delta)
+                yield delta
+        finally:
+            self._record_chat(context, prompt, "".join(parts) if stats.completed else "")
+
+    def _guarded_stream(self, args, timeout, max_retries, cancel, stats):
+        """Seperti _stream, tetapi error dicetak dan streaming berhenti (untuk *_stream publik)."""
+        label = args[0]
+        try:
+            yield from self._stream(*args, timeout, max_retries, resolve(cancel), stats)
+        except Cancelled:
+            print(f"[INFO] {label} Ollama dibatalkan.")
+        except (requests.exceptions.RequestException, ValueError, EmptyResponse) as e:
+            print(f"[ERROR] {label} Ollama gagal: {e}")
+
+    def generate_stream(self, prompt, cancel=None, max_retries=MAX_RETRIES, timeout=READ_TIMEOUT,
+                        stats=None, format=None):
+        """
+        Seperti generate(), tetapi menghasilkan potongan teks (delta) segera setelah model
+        mengeluarkannya, sehingga pemanggil bisa mulai menampilkan/mengucapkan lebih awal.
+
+        Parameters:
+        - stats: GenerationStats (opsional) yang diisi waktu token pertama, token/s,
+          load_duration, prompt_eval_duration, dst. stats.completed False jika streaming
+          berhenti karena error/pembatalan (error dicetak, tidak dilempar).
+        """
+        return self._guarded_stream(self._generate_args(prompt, format), timeout, max_retries, cancel,
+                                    stats if stats is not None else GenerationStats())
+
+    def chat_stream(self, prompt_or_context, context=None, cancel=None, max_retries=MAX_RETRIES,
+                    timeout=READ_TIMEOUT, stats=None, format=None):
+        """
+        Seperti chat(), tetapi menghasilkan potongan teks (delta) secara bertahap.
+        Pesan user ditambahkan ke `context` saat dipanggil; jawaban asisten disimpan setelah
+        stream selesai lengkap, dan jika gagal/dibatalkan (atau pemanggil berhenti membaca)
+        pesan user dihapus lagi. Lihat generate_stream() untuk `stats`.
+        """
+        stats = stats if stats is not None else GenerationStats()
+        stream = self._guarded_stream(self._chat_args(prompt_or_context, context, format), timeout,
+                                      max_retries, cancel, stats)
+        if not isinstance(prompt_or_context, str):
+            return stream
+        return self._recorded_stream(stream, context, prompt_or_context, stats)
+
+    def generate(self, prompt, stream=False, cancel=None, max_retries=MAX_RETRIES, timeout=READ_TIMEOUT,
+                 format=None):
         """
         Mengirim prompt satu arah ke endpoint /api/generate.
 
         Parameters:
         - prompt: Teks perintah.
-        - stream: Jika True, hasil dikembalikan dalam bentuk stream (tidak digunakan di sini).
+        - stream: Jika True, kembalikan generator potongan teks (lihat generate_stream()).
+        - cancel: CancelToken (default: token giliran saat ini, lihat utils/cancellation.py).
+        - max_retries, timeout, format: lihat chat().
 
         Returns:
-        - Respons teks (string) dari model.
+        - Respons teks (string) dari model, atau "" jika gagal/dibatalkan.
         """
+        if stream:
+            return self.generate_stream(prompt, cancel=cancel, max_retries=max_retries, timeout=timeout,
+                                        format=format)
+        cancel = resolve(cancel)
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": stream
-                },
-                timeout=60
-            )
-            response.raise_for_status()
-            return response.json().get("response", "")
-        except requests.exceptions.RequestException as e:
+            return "".join(self._stream(*self._generate_args(prompt, format), timeout, max_retries, cancel,
+                                        GenerationStats()))
+        except Cancelled:
+            print("[INFO] Generate Ollama dibatalkan.")
+            return ""
+        except (requests.exceptions.RequestException, ValueError, EmptyResponse) as e:
             print(f"[ERROR] Gagal generate dari Ollama: {e}")
             return ""
 
-    def chat(self, prompt_or_context, context=None, stream=False, max_retries=3, timeout=60):
+    def chat(self, prompt_or_context, context=None, stream=False, max_retries=MAX_RETRIES,
+             timeout=READ_TIMEOUT, cancel=None, format=None):
         """
         Mengirim percakapan ke endpoint /api/chat dengan retry dan logging waktu respons.
 
         Bisa dipanggil dalam dua mode:
-        1. prompt_or_context = string prompt, context = ChatContext → akan ditambahkan ke riwayat.
+        1. prompt_or_context = string prompt, context = ChatContext → prompt dan jawaban ditambahkan
+           ke riwayat; jika gagal/dibatalkan prompt dihapus lagi dari riwayat.
         2. prompt_or_context = list of dicts (pesan manual) → tanpa manipulasi konteks.
 
         Parameters:
-        - max_retries: jumlah percobaan ulang jika timeout
-        - timeout: batas waktu per request (detik)
+        - stream: Jika True, kembalikan generator potongan teks (lihat chat_stream()).
+        - max_retries: jumlah percobaan untuk error sementara (timeout, koneksi, 5xx, jawaban kosong)
+        - timeout: batas waktu baca (detik tanpa data baru dari server)
+        - cancel: CancelToken (default: token giliran saat ini); saat dibatalkan koneksi
+          diputus dan "" dikembalikan tanpa retry.
+        - format: "json" atau JSON schema (dict); model dipaksa menjawab sesuai schema
+          (structured outputs Ollama). Validasi isinya tetap tugas pemanggil.
 
         Returns:
         - Hasil balasan dari asisten dalam bentuk teks.
         """
-        if isinstance(prompt_or_context, str) and context is not None:
-            # Mode 1: prompt string + objek ChatContext
-            context.add_user_message(prompt_or_context)
-            messages = context.get_context()
-        elif isinstance(prompt_or_context, list):
-            # Mode 2: langsung kirim list pesan tanpa objek context
-            messages = prompt_or_context
-        else:
-            raise ValueError(
-                "chat() membutuhkan prompt string + context, atau list of messages."
-            )
+        if stream:
+            return self.chat_stream(prompt_or_context, context=context, cancel=cancel,
+                                    max_retries=max_retries, timeout=timeout, format=format)
+        cancel = resolve(cancel)
+        args = self._chat_args(prompt_or_context, context, format)
+        reply = ""
+        try:
+            reply = "".join(self._stream(*args, timeout, max_retries, cancel, GenerationStats()))
+            return reply
+        except Cancelled:
+            print("[INFO] Chat Ollama dibatalkan.")
+            return ""
+        except (requests.exceptions.Timeout, EmptyResponse):
+            return "[Gagal] Tidak ada respons setelah beberapa percobaan."
+        except requests.exceptions.ConnectionError:
+            print("[ERROR] Ollama Offline: Server tidak dapat dihubungi.")
+            return ""
+        except Exception as e:
+            print(f"[ERROR] Gagal chat ke Ollama: {e}")
+            return ""
+        finally:
+            if isinstance(prompt_or_context, str):
+                self._record_chat(context, prompt_or_context, reply)
 
-        attempt = 1
-        while attempt <= max_retries:
-            try:
-                print(f"[INFO] Mengirim ke Ollama (percobaan {attempt}/{max_retries})...")
-                start_time = time.time()
-
-                response = requests.post(
-                    f"{self.base_url}/api/chat",
-                    json={
-                        "model": self.model,
-                        "messages": messages,
-                        "stream": stream
-                    },
-                    timeout=timeout
-                )
-                response.raise_for_status()
-
-                elapsed = time.time() - start_time
-                print(f"[INFO] Respons diterima dalam {elapsed:.2f} detik.")
-
-                data = response.json()
-                return data.get("message", {}).get("content", "")
-
-            except requests.exceptions.ReadTimeout:
-                print(f"[WARNING] Timeout setelah {timeout} detik. Mencoba ulang...")
-            except requests.exceptions.ConnectionError:
-                print("[ERROR] Ollama Offline: Server tidak dapat dihubungi.")
-                return ""
-            except Exception as e:
-                print(f"[ERROR] Gagal chat ke Ollama: {e}")
-                return ""
+    def load(self, keep_alive=None):
+        """
+        Muat model ke RAM tanpa menghasilkan teks (/api/generate tanpa prompt),
+        atau lepaskan dari RAM dengan keep_alive=0.
 
-            attempt += 1
-            time.sleep(1)  # jeda sebelum retry
+        Parameters:
+        - keep_alive: lama model dipertahankan ("5m", detik, -1 = selamanya, 0 = lepas).
 
-        return "[Gagal] Tidak ada respons setelah beberapa percobaan."
+        Returns:
+        - True jika server menerima permintaan.
+        """
+        payload = {"model": self.model, "stream": False}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/generate", json=payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+            )
+            response.raise_for_status()
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"[WARNING] Gagal mengatur model Ollama (keep_alive={keep_alive}): {e}")
+            return False
 
     def list_models(self):
         """
@@ -112,7 +386,7 @@ class OllamaClient:
         - List nama model (string) atau [] jika gagal.
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=(CONNECT_TIMEOUT, 10))
             response.raise_for_status()
             return [
                 model["name"]
@@ -130,7 +404,7 @@ class OllamaClient:
         - True jika server merespon dengan 200 OK.
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=(CONNECT_TIMEOUT, 5))
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
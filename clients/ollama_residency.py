@@ -0,0 +1,101 @@
+# ollama_residency.py
+# Mengatur kapan model LLM (gemma3:1b) berada di RAM Ollama:
+# - warm_up(): muat model di background selagi prompt "Loading..."/welcome diputar,
+#   sehingga chat/generate pertama tidak menunggu model dimuat.
+# - pin()/unpin() (atau `with pinned():`): model tidak dilepas selama mode yang memakai LLM aktif.
+# - unload(): lepas model (keep_alive 0) saat masuk learning audio atau mode online,
+#   agar RAM kembali untuk whisper dan MarianMT.
+# Server Ollama sendiri dinyalakan/dimatikan oleh ollama_server; pin() ikut menahannya.
+import queue
+import threading
+from contextlib import contextmanager
+from clients.ollama_server import ollama_server
+
+KEEP_ALIVE_IDLE = "5m"   # default Ollama: model dilepas 5 menit setelah request terakhir
+KEEP_ALIVE_PINNED = -1   # selama dipin: tidak pernah dilepas
+KEEP_ALIVE_UNLOAD = 0
+
+
+class OllamaResidency:
+    """
+    Pengatur residensi satu model Ollama. Permintaan dikirim oleh satu thread pekerja;
+    jika beberapa permintaan menumpuk hanya yang terakhir yang dikirim.
+    """
+
+    def __init__(self, client, server):
+        self.client = client
+        self.server = server
+        self._pins = 0
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+        threading.Thread(target=self._worker, daemon=True, name="ollama-residency").start()
+
+    def warm_up(self):
+        """Muat model di background (tidak memblok). Tidak mengubah pin."""
+        with self._lock:
+            keep_alive = KEEP_ALIVE_PINNED if self._pins else KEEP_ALIVE_IDLE
+        self._requests.put(keep_alive)
+
+    def pin(self):
+        """
+        Pertahankan model di RAM sampai unpin(); menyalakan server (memblok sampai siap)
+        dan memuat model jika belum dimuat.
+        """
+        with self._lock:
+            self._pins += 1
+            if self._pins > 1:
+                return
+            self.client.keep_alive = KEEP_ALIVE_PINNED
+        self.server.acquire()
+        self._requests.put(KEEP_ALIVE_PINNED)
+
+    def unpin(self):
+        """
+        Kembali ke keep_alive default: model dilepas setelah menganggur beberapa menit,
+        server dimatikan setelah menganggur ollama_server.idle_stop detik.
+        """
+        with self._lock:
+            if not self._pins:
+                return
+            self._pins -= 1
+            if self._pins:
+                return
+            self.client.keep_alive = None
+        self.server.release()
+        self._requests.put(KEEP_ALIVE_IDLE)
+
+    @contextmanager
+    def pinned(self):
+        self.pin()
+        try:
+            yield self
+        finally:
+            self.unpin()
+
+    def unload(self):
+        """Lepas model dari RAM sekarang (diabaikan jika masih dipin)."""
+        with self._lock:
+            if self._pins:
+                print("[INFO] Model Ollama masih dipakai, tidak dilepas.")
+                return
+        self._requests.put(KEEP_ALIVE_UNLOAD)
+
+    def _worker(self):
+        while True:
+            keep_alive = self._requests.get()
+            # Ambil permintaan terbaru saja (mis. warm_up lalu langsung unload)
+            while True:
+                try:
+                    keep_alive = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+            if not self.server.wait_ready():
+                print("[INFO] Server Ollama belum berjalan, residensi model dilewati.")
+                continue
+            if self.client.load(keep_alive=keep_alive):
+                action = "dilepas dari RAM" if keep_alive == KEEP_ALIVE_UNLOAD else f"dimuat (keep_alive={keep_alive})"
+                print(f"[INFO] Model Ollama {self.client.model} {action}.")
+
+
+# === Instance global untuk model yang dipakai mode offline ===
+ollama_residency = OllamaResidency(ollama_server.client, ollama_server)
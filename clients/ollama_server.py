@@ -0,0 +1,210 @@
+# ollama_server.py
+# Menjalankan `ollama serve` hanya saat mode offline yang memakai LLM dibutuhkan.
+# Server dinyalakan saat masuk mode offline / mode LLM, lalu dimatikan setelah
+# menganggur IDLE_STOP_SECONDS detik atau saat masuk mode online / learning audio,
+# sehingga RAM daemon + gemma3:1b kembali untuk whisper, MarianMT, dan Piper.
+#
+# Catatan: jika Ollama sudah berjalan sebagai service sistem (ollama.service), server
+# itu dipakai apa adanya dan tidak dimatikan. Nonaktifkan service tsb agar RAM bisa
+# dibebaskan (lihat systemd.md).
+import atexit
+import os
+import shutil
+import subprocess
+import threading
+import time
+from urllib.parse import urlparse
+from clients.ollama_client import get_ollama_client, DEFAULT_MODEL
+
+OLLAMA_BIN = shutil.which("ollama") or "/usr/local/bin/ollama"
+STARTUP_TIMEOUT = 30  # detik, sampai /api/tags menjawab (model belum dimuat)
+IDLE_STOP_SECONDS = float(os.environ.get("POCALA_OLLAMA_IDLE_STOP", "300"))
+
+
+class OllamaServer:
+    """
+    Pengawas proses `ollama serve` milik POCALA.
+    - start(wait): nyalakan server jika belum ada yang menjawab di base_url klien.
+    - acquire()/release(): dipanggil oleh mode yang memakai LLM; server tidak dimatikan
+      selama masih ada pemakai, dan dimatikan `idle_stop` detik setelah pemakai terakhir.
+    - stop(): matikan sekarang (hanya proses yang dinyalakan POCALA sendiri).
+    Metrik startup: starts, last_startup, total_startup, uptime.
+    """
+
+    def __init__(self, client, binary=OLLAMA_BIN, idle_stop=IDLE_STOP_SECONDS):
+        self.client = client
+        self.binary = binary
+        self.idle_stop = idle_stop
+        self.process = None
+        self.external = False  # server dijalankan di luar POCALA
+        self._users = 0
+        self._timer = None
+        self._lock = threading.Lock()
+        self._ready = False
+        self._startup_done = threading.Event()
+        self._startup_done.set()
+        self._started_at = None
+        # Metrik
+        self.starts = 0
+        self.last_startup = None
+        self.total_startup = 0.0
+        self.uptime = 0.0
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def is_ready(self):
+        """True jika server (milik POCALA atau eksternal) siap menerima request."""
+        if self.is_running():
+            return self._ready
+        return self.client.is_server_ready()
+
+    def start(self, wait=True):
+        """
+        Nyalakan server jika belum berjalan. wait=False: startup berjalan di background
+        (mis. selagi welcome diputar). Returns True jika server siap (atau sedang dinyalakan
+        saat wait=False).
+        """
+        with self._lock:
+            if not self.is_running():
+                self.process = None
+                if self.client.is_server_ready():
+                    if not self.external:
+                        print("[INFO] Server Ollama sudah berjalan di luar POCALA, tidak dikelola.")
+                    self.external = True
+                    return True
+                self.external = False
+                if not self._spawn_locked():
+                    return False
+            if not self._users:
+                self._schedule_idle_stop_locked()
+
+        if wait:
+            return self.wait_ready()
+        return True
+
+    def wait_ready(self, timeout=STARTUP_TIMEOUT):
+        """Tunggu startup yang sedang berjalan. Returns True jika server siap."""
+        self._startup_done.wait(timeout)
+        return self.is_ready()
+
+    def _spawn_locked(self):
+        env = dict(os.environ, OLLAMA_HOST=urlparse(self.client.base_url).netloc)
+        print("[INFO] Menjalankan server Ollama...")
+        try:
+            self.process = subprocess.Popen(
+                [self.binary, "serve"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                env=env,
+            )
+        except OSError as e:
+            print(f"[WARNING] Tidak bisa menjalankan ollama ({self.binary}): {e}")
+            self.process = None
+            return False
+        self._ready = False
+        self._startup_done.clear()
+        threading.Thread(target=self._wait_until_ready, args=(self.process,),
+                         daemon=True, name="ollama-server-startup").start()
+        return True
+
+    def _wait_until_ready(self, process):
+        """Polling sampai server menjawab, lalu catat biaya startup."""
+        start_time = time.monotonic()
+        try:
+            while time.monotonic() - start_time < STARTUP_TIMEOUT:
+                if process.poll() is not None:
+                    print("[ERROR] Server Ollama berhenti saat startup.")
+                    return
+                if self.client.is_server_ready():
+                    elapsed = time.monotonic() - start_time
+                    with self._lock:
+                        if process is not self.process:
+                            return
+                        self._ready = True
+                        self._started_at = time.monotonic()
+                        self.starts += 1
+                        self.last_startup = elapsed
+                        self.total_startup += elapsed
+                    print(f"[INFO] Server Ollama siap dalam {elapsed:.2f} detik "
+                          f"(start ke-{self.starts}, total {self.total_startup:.2f} detik).")
+                    return
+                time.sleep(0.2)
+            print(f"[ERROR] Server Ollama tidak siap setelah {STARTUP_TIMEOUT} detik.")
+            self.stop(force=True)
+        finally:
+            self._startup_done.set()
+
+    def acquire(self):
+        """Mode LLM mulai: batalkan jadwal stop dan pastikan server berjalan (memblok)."""
+        with self._lock:
+            self._users += 1
+            self._cancel_idle_stop_locked()
+        return self.start(wait=True)
+
+    def release(self):
+        """Mode LLM selesai: server dimatikan jika menganggur selama `idle_stop` detik."""
+        with self._lock:
+            if not self._users:
+                return
+            self._users -= 1
+            if not self._users:
+                self._schedule_idle_stop_locked()
+
+    def _schedule_idle_stop_locked(self):
+        self._cancel_idle_stop_locked()
+        if self.process is None or self.idle_stop is None or self.idle_stop < 0:
+            return
+        self._timer = threading.Timer(self.idle_stop, self._idle_stop)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_idle_stop_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _idle_stop(self):
+        with self._lock:
+            if self._users:
+                return
+        print(f"[INFO] Server Ollama menganggur {self.idle_stop:g} detik.")
+        self.stop()
+
+    def stop(self, force=False):
+        """
+        Matikan server milik POCALA (server eksternal dibiarkan). Diabaikan selama masih
+        ada pemakai, kecuali force=True (saat program keluar).
+        """
+        with self._lock:
+            self._cancel_idle_stop_locked()
+            if self._users and not force:
+                print("[INFO] Server Ollama masih dipakai, tidak dihentikan.")
+                return
+            process, self.process = self.process, None
+            if process is None:
+                return
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if self._started_at is not None:
+                self.uptime += time.monotonic() - self._started_at
+                self._started_at = None
+            self._ready = False
+        print(f"[INFO] Server Ollama dihentikan, RAM dibebaskan ({self.summary()}).")
+
+    def summary(self):
+        """Ringkasan metrik startup untuk log."""
+        if not self.starts:
+            return "belum pernah dinyalakan"
+        return (f"start {self.starts}x, startup terakhir {self.last_startup:.2f} detik, "
+                f"rata-rata {self.total_startup / self.starts:.2f} detik, "
+                f"aktif total {self.uptime / 60:.1f} menit")
+
+
+# === Instance global untuk server model mode offline ===
+ollama_server = OllamaServer(get_ollama_client(DEFAULT_MODEL))
+atexit.register(ollama_server.stop, force=True)
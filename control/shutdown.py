@@ -1,6 +1,7 @@
 # control/shutdown.py
 import subprocess
 import time
+from inout.audio_output import audio_output, PRIORITY_ALERT
 
 def shutdown_force(lcd=None, sound_file=None, delay=3):
     """
@@ -16,7 +17,8 @@ def shutdown_force(lcd=None, sound_file=None, delay=3):
             lcd.display_text("Shutting down...")
 
         if sound_file:
-            subprocess.Popen(["aplay", sound_file])
+            # Prioritas alert: memotong suara lain yang sedang diputar
+            audio_output.play_file(sound_file, priority=PRIORITY_ALERT)
             
         time.sleep(delay)
 
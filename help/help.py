@@ -1,11 +1,10 @@
 import os
 import langid
-import subprocess
-import threading
 from inout.whisper_transcriber import transcribe_auto
 from inout.recorder import record_once
 from inout.piper_output import speak_and_display
-from utils.response_check import is_yes, is_no, is_exit
+from inout.audio_output import audio_output, PRIORITY_SPEECH
+from utils.response_check import is_yes, is_no, is_exit, YES_NO_COMMANDS
 from utils.path_helper import get_resource_path
 from control.volume_control import get_current_volume
 
@@ -103,19 +102,19 @@ def play_help(topic: str, lang: str = "en", lcd=None):
         print(f"[HELP] Audio not found for {topic} ({lang})")
         return
 
-    # jalankan audio di thread terpisah
-    def play_audio():
-        subprocess.run(["aplay", audio_path])
-    
-    audio_thread = threading.Thread(target=play_audio)
-    audio_thread.start()
+    # antrekan clip ke output audio bersama (tidak membuka device baru)
+    handle = audio_output.play_file(audio_path, priority=PRIORITY_SPEECH)
+    if handle is None:
+        speak_and_display(text, lang=lang, lcd=lcd, mode="scroll")
+        return
 
     # tampilkan teks saat audio mulai
     if lcd:
+        handle.started.wait(timeout=2)
         lcd.scroll_text(text, speed=0.08)
 
     # tunggu audio selesai sebelum lanjut
-    audio_thread.join()
+    handle.wait()
 
 
 def tanya_ulang_help(lcd=None) -> bool:
@@ -128,7 +127,7 @@ def tanya_ulang_help(lcd=None) -> bool:
             speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
             continue
 
-        reply = (transcribe_auto(audio, lcd=lcd) or "").lower()
+        reply = (transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS) or "").lower()
         print(f"[HELP REPLY] {reply}")
 
         if is_no(reply):
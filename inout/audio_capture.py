@@ -0,0 +1,133 @@
+# audio_capture.py
+# Mikrofon dibiarkan terbuka ("warm") dan ditulis ke ring buffer dari callback PortAudio,
+# sehingga awal ucapan tidak hilang saat tombol baru ditekan.
+import threading
+import numpy as np
+import sounddevice as sd
+
+PREROLL_MS = 300       # audio sebelum tombol ditekan yang ikut disertakan
+MAX_RECORD_SECONDS = 60  # batas panjang rekaman yang disimpan (memori tetap terbatas)
+BLOCKSIZE = 256        # frame per callback (16 ms @ 16 kHz)
+MAX_BEGIN_LAG_SECONDS = 3  # batas mundur awal segmen untuk tombol yang sudah lebih dulu ditekan
+
+
+class AudioCapture:
+    """
+    Capture engine berbasis ring buffer.
+    - Buffer int16 dialokasikan sekali: (MAX_RECORD_SECONDS + pre-roll) * samplerate.
+    - Callback PortAudio hanya menyalin frame ke buffer, tanpa alokasi list/concatenate.
+    - begin() menandai awal segmen (mundur sebesar pre-roll), end() menyalin segmen keluar.
+    Jika tombol ditahan lebih lama dari kapasitas, yang disimpan adalah bagian terakhir.
+    """
+
+    def __init__(self, samplerate=16000, max_seconds=MAX_RECORD_SECONDS,
+                 preroll_ms=PREROLL_MS, blocksize=BLOCKSIZE):
+        self.samplerate = samplerate
+        self.preroll_frames = int(samplerate * preroll_ms / 1000)
+        self.capacity = int(samplerate * max_seconds) + self.preroll_frames
+        self.blocksize = blocksize
+
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0          # total frame yang pernah ditulis (monoton naik)
+        self._segment_start = None
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def _callback(self, indata, frames, time_info, status):
+        """Dipanggil PortAudio di thread audio: salin frame ke ring buffer."""
+        if status:
+            print(f"[WARNING] Audio input: {status}")
+        data = indata[:, 0]
+        pos = self._written % self.capacity
+        end = pos + frames
+        if end <= self.capacity:
+            self._buffer[pos:end] = data
+        else:
+            split = self.capacity - pos
+            self._buffer[pos:] = data[:split]
+            self._buffer[:end - self.capacity] = data[split:]
+        self._written += frames
+
+    def start(self):
+        """Buka stream input (sekali saja, lalu dibiarkan berjalan)."""
+        with self._lock:
+            if self._stream is not None and self._stream.active:
+                return
+            self._stream = sd.InputStream(
+                samplerate=self.samplerate,
+                channels=1,
+                dtype='int16',
+                blocksize=self.blocksize,
+                callback=self._callback,
+            )
+            self._stream.start()
+            print("[INFO] Mikrofon aktif (ring buffer).")
+
+    def stop(self):
+        """Tutup stream input."""
+        with self._lock:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+
+    @property
+    def frames_written(self):
+        return self._written
+
+    @property
+    def segment_start(self):
+        """Posisi absolut awal segmen yang sedang direkam (None jika tidak merekam)."""
+        return self._segment_start
+
+    def begin(self, lag_seconds=0.0):
+        """
+        Tandai awal segmen rekaman, termasuk pre-roll sebelum tombol ditekan.
+        `lag_seconds`: sudah berapa lama tombol ditekan (mis. barge-in saat prompt masih
+        dihentikan), agar segmen tetap dimulai dari saat tombol ditekan.
+        """
+        self.start()
+        lag_frames = int(min(lag_seconds, MAX_BEGIN_LAG_SECONDS) * self.samplerate)
+        self._segment_start = max(0, self._written - lag_frames - self.preroll_frames)
+
+    def read(self, start, stop=None):
+        """
+        Salin frame [start, stop) dari ring buffer (posisi absolut, lihat frames_written).
+        Bagian yang sudah tertimpa otomatis dilewati.
+        """
+        if stop is None:
+            stop = self._written
+        start = max(start, stop - self.capacity, 0)
+        if stop <= start:
+            return np.zeros(0, dtype=np.int16)
+
+        begin_pos = start % self.capacity
+        end_pos = begin_pos + (stop - start)
+        if end_pos <= self.capacity:
+            return self._buffer[begin_pos:end_pos].copy()
+        return np.concatenate((
+            self._buffer[begin_pos:],
+            self._buffer[:end_pos - self.capacity],
+        ))
+
+    def end(self, stop=None):
+        """Akhiri segmen dan kembalikan audio int16 sejak begin() sampai `stop`."""
+        if self._segment_start is None:
+            return np.zeros(0, dtype=np.int16)
+        samples = self.read(self._segment_start, stop)
+        self._segment_start = None
+        return samples
+
+
+_capture = None
+
+
+def get_audio_capture(samplerate=16000):
+    """Ambil capture engine global (dibuat ulang jika sample rate berbeda)."""
+    global _capture
+    if _capture is None or _capture.samplerate != samplerate:
+        if _capture is not None:
+            _capture.stop()
+        _capture = AudioCapture(samplerate=samplerate)
+    _capture.start()
+    return _capture
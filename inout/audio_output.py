@@ -0,0 +1,281 @@
+# audio_output.py
+# Satu output stream yang dibuka sekali pada sample rate native perangkat.
+# Semua suara (TTS, clip help, suara shutdown, learning audio, pengingat idle)
+# masuk ke antrean berprioritas sehingga tidak saling tumpang tindih.
+import heapq
+import itertools
+import queue
+import threading
+from math import gcd
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+from scipy.signal import resample_poly
+
+# Angka lebih kecil = prioritas lebih tinggi
+PRIORITY_ALERT = 0    # suara shutdown: memotong semua yang sedang diputar
+PRIORITY_SPEECH = 1   # prompt dan jawaban
+PRIORITY_MEDIA = 2    # learning audio
+PRIORITY_IDLE = 3     # pengingat idle: dibuang jika ada suara lain
+
+BLOCKSIZE = 1024
+FILE_BLOCK_FRAMES = 8192
+FILE_PREFETCH_BLOCKS = 8
+
+
+def resample(pcm, src_rate, dst_rate):
+    """Resample PCM int16 mono (polyphase) ke rate tujuan."""
+    pcm = np.asarray(pcm)
+    if src_rate == dst_rate or len(pcm) == 0:
+        return pcm.astype(np.int16, copy=False)
+    g = gcd(int(src_rate), int(dst_rate))
+    out = resample_poly(pcm.astype(np.float32), int(dst_rate) // g, int(src_rate) // g)
+    return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+
+def _to_mono(data):
+    data = np.asarray(data)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    return data
+
+
+class PlaybackHandle:
+    """Handle satu sumber suara: tunggu selesai, batalkan, atau cek sudah mulai."""
+
+    def __init__(self, priority, preemptible):
+        self.priority = priority
+        self.preemptible = preemptible
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.done.set()
+
+    def wait(self, timeout=None):
+        """True jika selesai (diputar habis atau dibatalkan) dalam batas waktu."""
+        return self.done.wait(timeout)
+
+    @property
+    def completed(self):
+        """True jika diputar sampai habis (bukan dibatalkan)."""
+        return self.done.is_set() and not self.cancelled
+
+
+class _BufferSource:
+    def __init__(self, pcm, handle):
+        self.pcm = pcm
+        self.pos = 0
+        self.handle = handle
+
+    def read(self, frames):
+        """Potongan berikutnya; None jika habis/dibatalkan, array kosong jika belum ada data."""
+        if self.handle.cancelled or self.pos >= len(self.pcm):
+            return None
+        chunk = self.pcm[self.pos:self.pos + frames]
+        self.pos += len(chunk)
+        return chunk
+
+
+class _FileSource:
+    """Dekode file di thread terpisah (blok demi blok) agar callback tidak menyentuh disk."""
+
+    def __init__(self, sound_file, rate, handle):
+        self.handle = handle
+        self.rate = rate
+        self._file = sound_file
+        self._blocks = queue.Queue(maxsize=FILE_PREFETCH_BLOCKS)
+        self._current = np.zeros(0, dtype=np.int16)
+        self._eof = False
+        threading.Thread(target=self._decode, daemon=True).start()
+
+    def _decode(self):
+        try:
+            with self._file as f:
+                for block in f.blocks(blocksize=FILE_BLOCK_FRAMES, dtype="int16", always_2d=True):
+                    if not self._put(resample(_to_mono(block), f.samplerate, self.rate)):
+                        return
+        except Exception as e:
+            print(f"[ERROR] Gagal mendekode audio: {e}")
+        finally:
+            self._put(None)
+
+    def _put(self, item):
+        """Masukkan blok ke antrean; berhenti menunggu jika pemutaran dibatalkan."""
+        while not self.handle.cancelled:
+            try:
+                self._blocks.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read(self, frames):
+        if self.handle.cancelled:
+            return None
+        if len(self._current) == 0:
+            if self._eof:
+                return None
+            try:
+                block = self._blocks.get_nowait()
+            except queue.Empty:
+                return self._current  # underrun: isi hening, coba lagi di callback berikutnya
+            if block is None:
+                self._eof = True
+                return None
+            self._current = block
+        chunk, self._current = self._current[:frames], self._current[frames:]
+        return chunk
+
+
+class AudioOutput:
+    """
+    Mesin output audio global.
+    - Stream dibuka sekali (lazy) pada sample rate default perangkat; sumber di-resample.
+    - Satu sumber diputar pada satu waktu; antrean diurutkan berdasarkan prioritas lalu urutan masuk.
+    - Sumber `preemptible` (pengingat idle) dibatalkan saat sumber berprioritas lebih tinggi datang,
+      dan dibuang jika perangkat sedang sibuk.
+    """
+
+    def __init__(self, samplerate=None, blocksize=BLOCKSIZE):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self._stream = None
+        self._queue = []
+        self._counter = itertools.count()
+        self._current = None
+        self._lock = threading.Lock()
+
+    def _ensure_stream(self):
+        if self._stream is not None and self._stream.active:
+            return
+        if self.samplerate is None:
+            self.samplerate = int(sd.query_devices(kind="output")["default_samplerate"])
+        self._stream = sd.OutputStream(
+            samplerate=self.samplerate,
+            channels=1,
+            dtype="int16",
+            blocksize=self.blocksize,
+            callback=self._callback,
+        )
+        self._stream.start()
+        print(f"[INFO] Output audio aktif ({self.samplerate} Hz).")
+
+    def _next_source(self):
+        with self._lock:
+            while self._queue:
+                _, _, source = heapq.heappop(self._queue)
+                if not source.handle.cancelled:
+                    self._current = source
+                    source.handle.started.set()
+                    return source
+            self._current = None
+            return None
+
+    def _callback(self, outdata, frames, time_info, status):
+        if status:
+            print(f"[WARNING] Audio output: {status}")
+        out = outdata[:, 0]
+        filled = 0
+        while filled < frames:
+            source = self._current or self._next_source()
+            if source is None:
+                break
+            chunk = source.read(frames - filled)
+            if chunk is None:
+                source.handle.done.set()
+                self._current = None
+                continue
+            if len(chunk) == 0:
+                break
+            out[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        out[filled:] = 0
+
+    def _sources_locked(self):
+        sources = [source for _, _, source in self._queue]
+        if self._current is not None:
+            sources.append(self._current)
+        return sources
+
+    def _busy_locked(self, ignore_preemptible=False):
+        return any(
+            not source.handle.cancelled
+            and not (ignore_preemptible and source.handle.preemptible)
+            for source in self._sources_locked()
+        )
+
+    def is_busy(self):
+        """True jika ada suara yang sedang diputar atau menunggu di antrean."""
+        with self._lock:
+            return self._busy_locked()
+
+    def _submit(self, make_source, priority, preemptible):
+        handle = PlaybackHandle(priority, preemptible)
+        with self._lock:
+            if preemptible and self._busy_locked(ignore_preemptible=True):
+                # Pengingat idle tidak boleh menunda atau menimpa suara lain
+                handle.cancel()
+                return handle
+            for source in self._sources_locked():
+                if source.handle.preemptible and source.handle.priority > priority:
+                    source.handle.cancel()
+            if priority == PRIORITY_ALERT:
+                self._cancel_locked()
+        self._ensure_stream()
+        source = make_source(handle)
+        with self._lock:
+            heapq.heappush(self._queue, (priority, next(self._counter), source))
+        return handle
+
+    def play(self, pcm, samplerate, priority=PRIORITY_SPEECH, preemptible=None):
+        """Antrekan buffer PCM int16 mono. Returns PlaybackHandle."""
+        if preemptible is None:
+            preemptible = priority == PRIORITY_IDLE
+        self._ensure_stream()
+        data = resample(_to_mono(pcm), samplerate, self.samplerate)
+        return self._submit(lambda handle: _BufferSource(data, handle), priority, preemptible)
+
+    def play_file(self, path, priority=PRIORITY_SPEECH, preemptible=None):
+        """
+        Antrekan file audio (wav/mp3/flac lewat soundfile, didekode bertahap).
+        Returns PlaybackHandle, atau None jika format tidak bisa dibuka.
+        """
+        if preemptible is None:
+            preemptible = priority == PRIORITY_IDLE
+        try:
+            sound_file = sf.SoundFile(path)
+        except Exception as e:
+            print(f"[WARNING] soundfile tidak bisa membuka {path}: {e}")
+            return None
+        self._ensure_stream()
+        return self._submit(
+            lambda handle: _FileSource(sound_file, self.samplerate, handle), priority, preemptible
+        )
+
+    def _cancel_locked(self, max_priority=None):
+        for source in self._sources_locked():
+            if max_priority is None or source.handle.priority >= max_priority:
+                source.handle.cancel()
+
+    def cancel_all(self, max_priority=None):
+        """
+        Batalkan semua suara. Jika `max_priority` diisi, hanya sumber dengan nilai
+        prioritas >= max_priority (yang sama atau kurang penting) yang dibatalkan.
+        """
+        with self._lock:
+            self._cancel_locked(max_priority)
+
+    def close(self):
+        with self._lock:
+            self._cancel_locked()
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+
+# === Instance global, dipakai bersama oleh semua modul ===
+audio_output = AudioOutput()
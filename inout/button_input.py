@@ -0,0 +1,109 @@
+# button_input.py
+# Lapisan input GPIO berbasis event: callback gpiozero mengisi antrean,
+# pemanggil cukup menunggu event tanpa polling (tidak makan CPU saat idle).
+import queue
+import threading
+import time
+from gpiozero import Button
+
+REC_BUTTON_PIN = 23
+BOUNCE_TIME = 0.03  # detik
+
+PRESS = "press"
+RELEASE = "release"
+
+
+class RecordButton:
+    """
+    Tombol rekam POCALA.
+
+    Catatan wiring: dengan pull_up=True, tombol fisik yang DITEKAN terbaca
+    `is_pressed == False` oleh gpiozero. Karena itu `when_released` gpiozero
+    dipetakan ke event PRESS dan `when_pressed` ke RELEASE.
+    """
+
+    def __init__(self, pin=REC_BUTTON_PIN, bounce_time=BOUNCE_TIME):
+        self.button = Button(pin, pull_up=True, bounce_time=bounce_time)
+        self.events = queue.Queue()
+        self._held = threading.Event()
+        self._press_listeners = []
+        self.last_press = None  # time.monotonic() saat tombol terakhir ditekan
+
+        if not self.button.is_pressed:
+            self._held.set()
+
+        self.button.when_released = self._on_press
+        self.button.when_pressed = self._on_release
+
+    def _on_press(self):
+        self.last_press = time.monotonic()
+        self._held.set()
+        self.events.put((PRESS, self.last_press))
+        for callback in list(self._press_listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"[ERROR] Listener tombol gagal: {e}")
+
+    def _on_release(self):
+        self._held.clear()
+        self.events.put((RELEASE, time.monotonic()))
+
+    def add_press_listener(self, callback):
+        """Daftarkan callback yang dipanggil langsung (thread gpiozero) saat tombol ditekan."""
+        self._press_listeners.append(callback)
+
+    def remove_press_listener(self, callback):
+        if callback in self._press_listeners:
+            self._press_listeners.remove(callback)
+
+    def held_for(self):
+        """Detik sejak tombol ditekan (0 jika tidak sedang ditahan)."""
+        if not self.is_held() or self.last_press is None:
+            return 0.0
+        return max(0.0, time.monotonic() - self.last_press)
+
+    def is_held(self):
+        """True jika tombol sedang ditekan secara fisik."""
+        return self._held.is_set()
+
+    def clear_events(self):
+        """Buang event lama yang belum dibaca."""
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                return
+
+    def _wait_for(self, kind, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                event, _ = self.events.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if event == kind:
+                return True
+
+    def wait_for_press(self, timeout=None):
+        """
+        Blok sampai tombol ditekan. Jika tombol sudah ditahan saat dipanggil,
+        langsung kembali. Returns False jika timeout.
+        """
+        self.clear_events()
+        if self.is_held():
+            return True
+        return self._wait_for(PRESS, timeout)
+
+    def wait_for_release(self, timeout=None):
+        """Blok sampai tombol dilepas. Returns False jika timeout."""
+        if not self.is_held():
+            return True
+        return self._wait_for(RELEASE, timeout)
+
+
+# GLOBAL BUTTON
+rec_button = RecordButton()
@@ -1,5 +1,6 @@
 import time
 import textwrap
+import threading
 from pathlib import Path
 from utils.path_helper import get_resource_path
 
@@ -53,6 +54,19 @@ class PocalaDisplay:
         self.bg_color = bg_color
         self.fg_color = fg_color
 
+        # LCD dipakai dari beberapa thread (main, speech queue, idle): satu frame per waktu
+        self._lock = threading.RLock()
+        self._scroll_generation = 0
+
+    def _show(self, image):
+        """Kirim satu frame ke panel (thread-safe)."""
+        with self._lock:
+            self.disp.display(image)
+
+    def cancel_scroll(self):
+        """Hentikan scroll_text yang sedang berjalan (misalnya saat teks berikutnya mulai diucapkan)."""
+        self._scroll_generation += 1
+
     def _create_canvas(self):
         """Buat kanvas kosong untuk menggambar teks."""
         image = Image.new("RGB", (self.width, self.height), self.bg_color)
@@ -62,7 +76,7 @@ class PocalaDisplay:
     def clear(self):
         """Bersihkan layar."""
         image = Image.new("RGB", (self.width, self.height), self.bg_color)
-        self.disp.display(image)
+        self._show(image)
 
     def display_text(self, text, color=None):
         """Tampilkan teks statis."""
@@ -76,7 +90,7 @@ class PocalaDisplay:
             bbox = self.font_main.getbbox(line)
             y += (bbox[3] - bbox[1]) + 4
 
-        self.disp.display(image)
+        self._show(image)
 
     def scroll_text(self, text, speed=0.08):
         """Tampilkan teks panjang dengan scroll vertikal."""
@@ -98,9 +112,12 @@ class PocalaDisplay:
             draw.text((5, y), line, font=self.font_main, fill=self.fg_color)
             y += line_height
 
+        generation = self._scroll_generation
         for top in range(0, y - self.height + 10, 2):
+            if generation != self._scroll_generation:
+                return
             frame = image.crop((0, top, self.width, top + self.height))
-            self.disp.display(frame)
+            self._show(frame)
             time.sleep(speed)
 
     def flash_message(self, text, duration=1.5, color=None):
@@ -116,7 +133,7 @@ class PocalaDisplay:
         try:
             image = Image.open(image_path)
             image = image.resize((self.width, self.height), resample=Image.LANCZOS)
-            self.disp.display(image)
+            self._show(image)
         except Exception as e:
             print(f"[ERROR] Gagal menampilkan gambar '{image_path}': {e}")
             
@@ -1,7 +1,11 @@
 import re
 import os
 from pathlib import Path
-from clients.gcp_client import gcp_transcribe_audio
+from clients.gcp_client import gcp_transcribe_audio, gcp_streaming_transcribe
+from inout.live_transcriber import LiveTranscription
+
+# Kode bahasa pendek (dipakai mode) -> kode bahasa GCP
+LANGUAGE_CODES = {"auto": "und", "id": "id-ID", "en": "en-US"}
 
 
 def clean_transcript(text):
@@ -20,49 +24,58 @@ def clean_transcript(text):
     return text.strip()
 
 
-def gcp_transcribe(audio_path, language_code="und", lcd=None):
+def gcp_transcribe(audio, language_code="und", lcd=None, commands=None, cancel=None):
     """
-    Menjalankan transkripsi menggunakan Google Cloud Speech-to-Text dari file audio.
+    Menjalankan transkripsi menggunakan Google Cloud Speech-to-Text.
 
     Parameter:
-        - audio_path: path ke file audio .wav.
+        - audio: Recording dari record_once (PCM16 di memori), atau path ke file .wav.
         - language_code: Kode bahasa GCP ('id-ID', 'en-US', 'und' untuk auto).
         - lcd: objek LCD (opsional) untuk menampilkan status.
+        - commands: daftar perintah yang diharapkan (opsional), dikirim sebagai phrase hints.
+        - cancel: CancelToken (opsional, default token giliran saat ini).
 
     Output:
         - Hasil transkripsi dalam bentuk teks yang sudah dibersihkan.
     """
-    if not Path(audio_path).exists():
-        print(f"[ERROR] File audio tidak ditemukan di: {audio_path}")
-        return ""
+    live = getattr(audio, "live", None)
+    # Hasil streaming hanya dipakai jika dibuat dengan phrase hints perintah yang sama
+    if live is not None and live.matches("gcp", language_code, commands):
+        raw_transcript = live.result()
+        if raw_transcript is not None:
+            print(f" [RAW TEXT (streaming)]: {raw_transcript}")
+            return clean_transcript(raw_transcript)
+
+    if isinstance(audio, (str, os.PathLike)):
+        # Jalur lama: baca WAV dari disk, sample rate dibaca dari header
+        if not Path(audio).exists():
+            print(f"[ERROR] File audio tidak ditemukan di: {audio}")
+            return ""
+
+        print(f"[*] Membaca file audio dari: {audio}")
+        try:
+            with open(audio, "rb") as audio_file:
+                audio_bytes = audio_file.read()
+        except IOError as e:
+            print(f"[ERROR] Gagal membaca file audio: {e}")
+            return ""
+        sample_rate = None
+    else:
+        # Recording: kirim PCM16 mentah, sample rate sudah diketahui
+        audio_bytes = audio.samples.tobytes()
+        sample_rate = audio.samplerate
 
     if lcd:
         lcd.clear()
-        lcd.display_text("Membaca file...")
-
-    print(f"[*] Membaca file audio dari: {audio_path}")
-    try:
-        with open(audio_path, "rb") as audio_file:
-            audio_bytes = audio_file.read()
-    except IOError as e:
-        print(f"[ERROR] Gagal membaca file audio: {e}")
-        return ""
-    
-    # Setelah dibaca, file asli bisa langsung dihapus
-    try:
-        os.remove(audio_path)
-        print(f"[*] File audio sementara '{audio_path}' telah dihapus.")
-    except OSError as e:
-        print(f"[WARNING] Gagal menghapus file audio sementara: {e}")
-
-
-    if lcd:
         lcd.display_text("Transkripsi...")
 
     print(f"[*] Mengirim audio ke Google Cloud STT (bahasa: {language_code})...")
     raw_transcript = gcp_transcribe_audio(
         audio_bytes=audio_bytes,
-        language_code=language_code
+        language_code=language_code,
+        sample_rate_hertz=sample_rate,
+        phrase_hints=commands,
+        cancel=cancel,
     )
 
     if not raw_transcript:
@@ -77,16 +90,57 @@ def gcp_transcribe(audio_path, language_code="und", lcd=None):
     return cleaned_transcript
 
 
-def transcribe_auto(audio_path, lcd=None): 
+class GcpLiveTranscription(LiveTranscription):
+    """
+    Streaming recognize GCP: audio dari ring buffer dikirim selama tombol ditahan,
+    hasil sementara ditampilkan di LCD. Saat tombol dilepas stream ditutup dan
+    hasil final biasanya sudah tersedia.
+    """
+
+    engine = "gcp"
+
+    def _chunks(self):
+        position = self._start_frame
+        while True:
+            running = self._wait_tick()
+            if self._cancelled:
+                return
+            end = self._current_end()
+            if end > position:
+                yield self.capture.read(position, end).tobytes()
+                position = end
+            if not running:
+                return
+
+    def _run(self):
+        self._text = gcp_streaming_transcribe(
+            self._chunks(),
+            language_code=self.language,
+            sample_rate_hertz=self.capture.samplerate,
+            on_partial=self._show_partial,
+            phrase_hints=self.commands,
+            cancel=self.turn,
+        )
+
+
+def live_transcription(language="auto", commands=None):
+    """
+    Buat transkripsi streaming GCP untuk record_once(live=...). `language`: auto/id/en.
+    `commands`: perintah yang diharapkan (phrase hints), sama dengan yang dikirim ke transcribe_*.
+    """
+    return GcpLiveTranscription(LANGUAGE_CODES.get(language, language), commands)
+
+
+def transcribe_auto(audio, lcd=None, commands=None, cancel=None):
     """Pintasan untuk transkripsi dengan deteksi bahasa otomatis."""
-    return gcp_transcribe(audio_path, language_code="und", lcd=lcd)
+    return gcp_transcribe(audio, language_code="und", lcd=lcd, commands=commands, cancel=cancel)
 
 
-def transcribe_id(audio_path, lcd=None): 
+def transcribe_id(audio, lcd=None, commands=None, cancel=None):
     """Pintasan untuk transkripsi Bahasa Indonesia."""
-    return gcp_transcribe(audio_path, language_code="id-ID", lcd=lcd)
+    return gcp_transcribe(audio, language_code="id-ID", lcd=lcd, commands=commands, cancel=cancel)
 
 
-def transcribe_en(audio_path, lcd=None):
+def transcribe_en(audio, lcd=None, commands=None, cancel=None):
     """Pintasan untuk transkripsi Bahasa Inggris."""
-    return gcp_transcribe(audio_path, language_code="en-US", lcd=lcd)
+    return gcp_transcribe(audio, language_code="en-US", lcd=lcd, commands=commands, cancel=cancel)
@@ -1,19 +1,20 @@
 import io
-import time
 import socket
-import sounddevice as sd
 import soundfile as sf
 
 from clients.gcp_client import gcp_text_to_speech
 from utils.num_to_text import convert_text
-from inout.piper_tts import speak_jenny, speak_nathalie  # fallback offline
+from inout.piper_tts import jenny_tts, nathalie_tts  # fallback offline
+from inout.tts_cache import tts_cache, cache_key
+from inout.prompt_pack import prompt_pack
+from utils.cancellation import resolve
 
 
 class GcpTTS:
     def __init__(self, lang_code, voice_name, default_speed=1.0, max_retries=3, retry_delay=1):
         """
         Wrapper Google Cloud Text-to-Speech dengan retry mechanism, print log,
-        dukungan audio_ready_event, dan fallback Piper.
+        dan fallback Piper. Diputar lewat antrean ucapan (inout/gcp_output.py).
         """
         self.lang_code = lang_code
         self.voice_name = voice_name
@@ -32,33 +33,26 @@ class GcpTTS:
         except (OSError, socket.timeout):
             return False
 
-    def speak(self, text, speed=None, convert_numbers=False, audio_ready_event=None):
+    def render(self, text, speed=None, cancel=None):
         """
-        Ucapkan teks menggunakan Google Cloud TTS.
-        Jika gagal, fallback otomatis ke PiperTTS.
+        Request GCP TTS (dengan retry) tanpa prompt pack/cache dan tanpa fallback.
+        Returns (np.ndarray int16, sample_rate), atau None jika gagal/dibatalkan.
         """
-        if not text:
-            return
-
-        if not self._internet_available():
-            print("WARNING: Tidak ada koneksi internet. Menggunakan fallback offline TTS (Piper).")
-            self._fallback_offline(text)
-            return
-
-        final_text = convert_text(text, lang=self.lang_code[:2]) if convert_numbers else text
         final_speed = speed if speed is not None else self.default_speed
+        cancel = resolve(cancel)
 
         audio_content = None
         for attempt in range(1, self.max_retries + 1):
             try:
                 print(f"INFO: Mengambil audio GCP (percobaan {attempt}/{self.max_retries})...")
                 audio_content = gcp_text_to_speech(
-                    text=final_text,
+                    text=text,
                     language_code=self.lang_code,
                     voice_name=self.voice_name,
                     speaking_rate=final_speed,
+                    cancel=cancel,
                 )
-                if audio_content:
+                if audio_content or cancel.cancelled:
                     break
                 print("WARNING: Tidak ada audio yang diterima dari GCP.")
             except Exception as e:
@@ -66,40 +60,66 @@ class GcpTTS:
 
             if attempt < self.max_retries:
                 print(f"INFO: Menunggu {self.retry_delay} detik sebelum mencoba lagi...")
-                time.sleep(self.retry_delay)
+                if not cancel.sleep(self.retry_delay):
+                    break
+
+        if audio_content:
+            try:
+                return sf.read(io.BytesIO(audio_content), dtype='int16')
+            except Exception as e:
+                print(f"ERROR: Gagal membaca audio GCP: {e}")
+        return None
+
+    def synthesize(self, text, speed=None, cancel=None):
+        """
+        Sintesis satu potong teks dengan GCP TTS.
+        Prompt statis (prompt pack) dan kalimat yang sudah ada di cache TTS diputar
+        tanpa request (dan tanpa biaya) GCP.
+        Returns (np.ndarray int16, sample_rate); jika GCP gagal dipakai Piper sebagai cadangan.
+        Returns None jika giliran (`cancel`, default giliran saat ini) dibatalkan (tanpa fallback).
+        """
+        key = self.cache_key(text, speed)
+        cached = prompt_pack.get(key) or tts_cache.get(key)
+        if cached is not None:
+            return cached
+
+        cancel = resolve(cancel)
+        result = self.render(text, speed=speed, cancel=cancel)
+        if result is not None:
+            tts_cache.put(key, *result)
+            return result
+        if cancel.cancelled:
+            return None
+
+        print("WARNING: GCP TTS gagal. Menggunakan fallback offline TTS (Piper).")
+        return self._fallback_tts().synthesize(text, cancel=cancel)
+
+    def prepare(self, text, speed=None, convert_numbers=False):
+        """
+        Siapkan teks untuk antrean ucapan / pipeline kalimat.
+        Returns (teks_final, synthesize); koneksi internet dicek sekali per teks,
+        jika offline synthesize langsung memakai Piper.
+        """
+        final_text = convert_text(text, lang=self.lang_code[:2]) if convert_numbers else text
+        if not self._internet_available():
+            print("WARNING: Tidak ada koneksi internet. Menggunakan fallback offline TTS (Piper).")
+            return final_text, lambda sentence, cancel=None: self._synthesize_offline(sentence, speed, cancel)
+        return final_text, lambda sentence, cancel=None: self.synthesize(sentence, speed=speed, cancel=cancel)
 
-        if not audio_content:
-            print("WARNING: GCP TTS gagal. Menggunakan fallback offline TTS (Piper).")
-            self._fallback_offline(final_text)
-            return
+    def cache_key(self, text, speed=None):
+        final_speed = speed if speed is not None else self.default_speed
+        return cache_key("gcp", self.voice_name, final_speed, text)
 
-        if audio_ready_event:
-            audio_ready_event.set()
+    def _synthesize_offline(self, text, speed=None, cancel=None):
+        """Saat offline: suara GCP dari prompt pack/cache jika ada, selain itu Piper."""
+        key = self.cache_key(text, speed)
+        cached = prompt_pack.get(key) or tts_cache.get(key)
+        if cached is not None:
+            return cached
+        return self._fallback_tts().synthesize(text, cancel=cancel)
 
-        # Playback audio
-        try:
-            buffer = io.BytesIO(audio_content)
-            data, fs = sf.read(buffer, dtype='int16')
-            #print(f"INFO: Memutar audio ({fs} Hz)...")
-            sd.play(data, fs)
-            sd.wait()
-        except Exception as e:
-            print(f"ERROR: Gagal memutar audio GCP: {e}")
-            try:
-                with open("tts_fallback.wav", "wb") as f:
-                    f.write(audio_content)
-                #print("INFO: Audio disimpan ke tts_fallback.wav sebagai fallback.")
-            except Exception as save_err:
-                print(f"CRITICAL: Gagal menyimpan file fallback: {save_err}")
-            # fallback offline juga bisa dijalankan di sini
-            self._fallback_offline(final_text)
-
-    def _fallback_offline(self, text):
-        """Gunakan PiperTTS sebagai cadangan TTS offline."""
-        if self.lang_code.startswith("en"):
-            speak_jenny(text)
-        else:
-            speak_nathalie(text)
+    def _fallback_tts(self):
+        return jenny_tts if self.lang_code.startswith("en") else nathalie_tts
 
 
 # === Instance TTS ===
@@ -112,11 +132,7 @@ gcp_en_tts = GcpTTS(lang_code="en-US", voice_name="en-US-Standard-F")
 gcp_id_tts = GcpTTS(lang_code="id-ID", voice_name="id-ID-Standard-A")
 
 
-# === Shortcut ===
-def speak_en(text, speed=None, audio_ready_event=None):
-    gcp_en_tts.speak(text, speed=speed, convert_numbers=True, audio_ready_event=audio_ready_event)
-
-
-def speak_id(text, speed=None, audio_ready_event=None):
-    gcp_id_tts.speak(text, speed=speed, convert_numbers=True, audio_ready_event=audio_ready_event)
-    
+def prepare_speech(text, lang="id"):
+    """Dipakai SpeechQueue (inout/gcp_output.py): (teks_final, synthesize) untuk bahasa tsb."""
+    tts = gcp_id_tts if lang == "id" else gcp_en_tts
+    return tts.prepare(text, convert_numbers=True)
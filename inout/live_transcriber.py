@@ -0,0 +1,110 @@
+# live_transcriber.py
+# Transkripsi berjalan selama tombol rekam ditahan: audio dibaca dari ring buffer
+# AudioCapture secara bertahap, sehingga saat tombol dilepas hanya ekor rekaman
+# yang masih perlu diproses.
+import threading
+from utils.cancellation import current_turn
+
+POLL_INTERVAL = 0.25   # detik antar pembacaan ring buffer
+RESULT_TIMEOUT = 30    # batas tunggu hasil akhir setelah tombol dilepas
+LCD_PARTIAL_CHARS = 54  # kira-kira 3 baris LCD
+
+
+class LiveTranscription:
+    """
+    Basis transkripsi parsial. Subclass mengisi `engine` dan mengimplementasikan `_run()`
+    yang berjalan di thread terpisah sampai `stop()` dipanggil, lalu menyimpan teks akhir
+    ke `self._text` (None jika gagal, agar pemanggil fallback ke transkripsi penuh).
+    `commands` (opsional): perintah yang diharapkan, dipakai engine yang mendukung phrase hints.
+    Pekerjaan live memakai token giliran saat start() (`self.turn`), jadi ikut batal saat barge-in.
+
+    Alur pakai (lihat record_once):
+        live.start(capture, capture.segment_start, lcd)
+        ... tombol dilepas ...
+        live.stop(stop_frame)
+        text = live.result()
+    """
+
+    engine = None
+
+    def __init__(self, language, commands=None):
+        self.language = language
+        self.commands = list(commands) if commands else None
+        self.turn = None
+        self.capture = None
+        self.lcd = None
+        self._text = None
+        self._start_frame = 0
+        self._stop_frame = None
+        self._stopped = threading.Event()
+        self._cancelled = False
+        self._thread = None
+
+    def start(self, capture, start_frame, lcd=None):
+        """Mulai membaca audio dari `capture` sejak posisi absolut `start_frame`."""
+        self.capture = capture
+        self.lcd = lcd
+        self.turn = current_turn()
+        self._start_frame = start_frame
+        self._thread = threading.Thread(target=self._safe_run, daemon=True)
+        self._thread.start()
+
+    def stop(self, stop_frame):
+        """Tombol dilepas: audio setelah `stop_frame` tidak ikut ditranskripsi."""
+        self._stop_frame = stop_frame
+        self._stopped.set()
+
+    def cancel(self):
+        """Batalkan tanpa menunggu hasil (misalnya rekaman ternyata hening)."""
+        self._cancelled = True
+        self.stop(self._stop_frame)
+
+    def matches(self, engine, language, commands=None):
+        """
+        True jika hasil ini bisa dipakai untuk permintaan transkripsi engine/bahasa tsb.
+        Jika `commands` diisi, live harus dibuat dengan daftar perintah yang sama.
+        """
+        if commands and self.commands != list(commands):
+            return False
+        return not self._cancelled and self.engine == engine and self.language == language
+
+    def result(self, timeout=RESULT_TIMEOUT):
+        """Tunggu worker selesai dan kembalikan teks mentah, atau None jika gagal/timeout."""
+        if self._thread is None or self._cancelled:
+            return None
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print("[WARNING] Transkripsi live belum selesai, pakai transkripsi penuh.")
+            return None
+        return self._text
+
+    def _safe_run(self):
+        try:
+            self._run()
+        except Exception as e:
+            print(f"[ERROR] Transkripsi live ({self.engine}) gagal: {e}")
+            self._text = None
+
+    def _run(self):
+        raise NotImplementedError
+
+    def _wait_tick(self):
+        """Tunggu satu interval; False jika tombol sudah dilepas."""
+        return not self._stopped.wait(POLL_INTERVAL)
+
+    def _current_end(self):
+        """Posisi akhir audio yang boleh dibaca saat ini."""
+        if self._stopped.is_set() and self._stop_frame is not None:
+            return self._stop_frame
+        return self.capture.frames_written
+
+    def _show_partial(self, text):
+        """Tampilkan potongan teks terakhir di LCD selama tombol masih ditahan."""
+        if not self.lcd or not text or self._stopped.is_set():
+            return
+        if len(text) > LCD_PARTIAL_CHARS:
+            text = "..." + text[-LCD_PARTIAL_CHARS:]
+        try:
+            self.lcd.display_text(text)
+        except Exception as e:
+            print(f"[WARNING] Gagal menampilkan teks parsial: {e}")
@@ -0,0 +1,49 @@
+# llm_speech.py
+# Ucapkan jawaban LLM selagi masih dihasilkan:
+# token (Ollama/Gemini) -> TtsNormalizer (kalimat bersih) -> antrean
+# ucapan (sintesis + putar), dan LCD menampilkan kalimat yang sedang terdengar.
+# Kalimat pertama sudah terdengar saat model masih menulis kalimat berikutnya.
+from inout.speech_pipeline import MIN_SENTENCE_CHARS
+from utils.cleaned_text import TtsNormalizer
+
+
+def speak_stream(deltas, speak_async, lang="id", lcd=None, prefix="", mode="short",
+                 scroll_speed=0.08, wait=True):
+    """
+    Ucapkan potongan teks dari LLM kalimat demi kalimat.
+
+    Args:
+        deltas (iterable of str): potongan teks dari chat_stream/generate_stream (Ollama)
+            atau gcp_gemini_generate_stream/gcp_gemini_generate_chat_stream.
+        speak_async (callable): speak_async dari piper_output atau gcp_output.
+        lang (str): bahasa TTS ('id' atau 'en').
+        lcd: objek LCD (opsional), tiap kalimat tampil saat mulai terdengar.
+        prefix (str): kalimat pembuka yang digabung ke kalimat pertama (mis. "the answer is").
+        mode, scroll_speed: diteruskan ke speak_async untuk tiap kalimat.
+        wait (bool): tunggu sampai kalimat terakhir selesai diucapkan.
+
+    Returns:
+        str: jawaban yang sudah dibersihkan (tanpa prefix), atau "" jika model tidak
+        menghasilkan teks (pemanggil boleh mengucapkan pesan gagal).
+    """
+    # Tanpa ekspansi angka di sini: LCD tetap menampilkan angka, TTS mengejanya saat prepare
+    normalizer = TtsNormalizer(min_chars=MIN_SENTENCE_CHARS)
+    spoken = []
+    handle = None
+
+    def say(sentences):
+        nonlocal handle, prefix
+        for text in sentences:
+            spoken.append(text)
+            if prefix:
+                text, prefix = f"{prefix} {text}", ""
+            handle = speak_async(text, lang=lang, lcd=lcd, mode=mode,
+                                 scroll_speed=scroll_speed) or handle
+
+    for delta in deltas:
+        say(normalizer.feed(delta))
+    say(normalizer.flush())
+
+    if wait and handle:
+        handle.wait()
+    return " ".join(spoken)
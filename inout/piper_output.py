@@ -1,36 +1,37 @@
-import threading
-from inout.piper_tts import speak_jenny, speak_nathalie
+from inout.piper_tts import prepare_speech
+from inout.audio_output import PRIORITY_SPEECH
+from inout.speech_queue import SpeechQueue
 
+speech_queue = SpeechQueue(prepare_speech, name="piper-speech")
 
-def speak_and_display(text, lang="id", mode="short", clear_after=False,
-                      lcd=None, scroll_speed=0.08):
+
+def speak_async(text, lang="id", mode="short", clear_after=False,
+                lcd=None, scroll_speed=0.08, priority=PRIORITY_SPEECH):
     """
-    Menyuarakan teks dan menampilkannya ke LCD secara sinkron.
+    Antrekan teks untuk diucapkan tanpa menunggu; teks tampil di LCD saat mulai terdengar.
+    Item berturut-turut diputar bersambung. Returns SpeechHandle (atau None jika teks kosong).
     """
     if not text:
-        return
+        return None
+    return speech_queue.say(text, lang=lang, mode=mode, lcd=lcd, clear_after=clear_after,
+                            scroll_speed=scroll_speed, priority=priority)
 
-    audio_ready_event = threading.Event()
-    tts_func = speak_nathalie if lang == "id" else speak_jenny
 
-    tts_thread = threading.Thread(
-        target=tts_func,
-        args=(text,),
-        kwargs={'audio_ready_event': audio_ready_event}
-    )
-    tts_thread.start()
-
-    if lcd:
-        print("[INFO] Menunggu sinyal audio siap dari TTS...")
-        audio_ready_event.wait()
-        print("[INFO] Sinyal diterima! Menampilkan ke LCD.")
-
-        if mode == "scroll":
-            lcd.scroll_text(text, speed=scroll_speed)
-        else:
-            lcd.display_text(text)
+def prefetch_speech(text, lang="id"):
+    """
+    Siapkan audio prompt yang kemungkinan besar diucapkan berikutnya selagi jawaban
+    saat ini diputar. Panggil setelah jawaban diantrekan (speak_async).
+    """
+    speech_queue.prefetch(text, lang=lang)
 
-    tts_thread.join()
 
-    if clear_after and lcd:
-        lcd.clear()
+def speak_and_display(text, lang="id", mode="short", clear_after=False,
+                      lcd=None, scroll_speed=0.08, priority=PRIORITY_SPEECH):
+    """
+    Menyuarakan teks dan menampilkannya ke LCD secara sinkron.
+    Menunggu sampai item ini (dan antrean sebelumnya) selesai.
+    """
+    handle = speak_async(text, lang=lang, mode=mode, clear_after=clear_after, lcd=lcd,
+                         scroll_speed=scroll_speed, priority=priority)
+    if handle:
+        handle.wait()
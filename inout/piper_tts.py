@@ -1,10 +1,19 @@
-import os
+import json
 import subprocess
-import sounddevice as sd
-import soundfile as sf
+import threading
+import numpy as np
 from pathlib import Path
 from utils.path_helper import get_resource_path
 from utils.num_to_text import convert_text
+from inout.tts_cache import tts_cache, cache_key
+from inout.prompt_pack import prompt_pack
+from utils.cancellation import Cancelled, run_process
+
+# Binding Python piper (piper-tts) opsional; tanpa itu dipakai CLI `piper --output-raw`
+try:
+    from piper import PiperVoice
+except ImportError:
+    PiperVoice = None
 
 
 class PiperTTS:
@@ -12,6 +21,7 @@ class PiperTTS:
         """
         Inisialisasi objek PiperTTS.
         model_dir: nama folder model di dalam folder models/
+        Voice ONNX dimuat sekali di background dan tetap resident di memori.
         """
         self.model_dir = Path(get_resource_path("piper_models", model_dir))
         self.model_name = self.model_dir.name
@@ -21,66 +31,96 @@ class PiperTTS:
         if not self.onnx.exists() or not self.config.exists():
             raise FileNotFoundError(f"Model atau config tidak ditemukan di {self.model_dir}")
 
-    def speak(self, text, convert_numbers=False, audio_ready_event=None):
-        """
-        Mengubah teks menjadi audio dan memberi sinyal saat audio siap.
-        - text (str): Teks untuk diucapkan.
-        - convert_numbers (bool): Ubah angka menjadi kata jika True.
-        - audio_ready_event (threading.Event): Objek untuk memberi sinyal.
-        """
-        if convert_numbers:
-            text = convert_text(text, lang="en")
+        with open(self.config, "r", encoding="utf-8") as f:
+            self.sample_rate = json.load(f).get("audio", {}).get("sample_rate", 22050)
 
-        out = Path(f"piper_output_{os.getpid()}.wav")  # Nama file unik berdasarkan PID
+        self._voice = None
+        self._load_lock = threading.Lock()
+        threading.Thread(target=self._load_voice, daemon=True).start()
 
+    def _load_voice(self):
+        """Muat sesi ONNX sekali (thread-safe). Mengembalikan None jika binding tidak tersedia."""
+        if PiperVoice is None:
+            return None
+        with self._load_lock:
+            if self._voice is None:
+                try:
+                    self._voice = PiperVoice.load(str(self.onnx), config_path=str(self.config))
+                    print(f"INFO: Voice Piper {self.model_name} dimuat.")
+                except Exception as e:
+                    print(f"WARNING: Gagal memuat voice Piper {self.model_name}: {e}")
+                    return None
+        return self._voice
+
+    def _synthesize_voice(self, voice, text):
+        """Sintesis dengan binding Python (mendukung API lama dan baru piper-tts)."""
+        if hasattr(voice, "synthesize_stream_raw"):
+            # piper-tts 1.2: potongan bytes PCM16 mentah per kalimat
+            pcm = b"".join(voice.synthesize_stream_raw(text))
+            return np.frombuffer(pcm, dtype=np.int16), self.sample_rate
+
+        # piper-tts >= 1.3: synthesize() menghasilkan AudioChunk per kalimat
+        chunks = list(voice.synthesize(text))
+        if not chunks:
+            return np.zeros(0, dtype=np.int16), self.sample_rate
+        pcm = np.concatenate([chunk.audio_int16_array.reshape(-1) for chunk in chunks])
+        return pcm, chunks[0].sample_rate
+
+    def _synthesize_cli(self, text, cancel=None):
+        """Fallback CLI: PCM mentah lewat stdout, tanpa file sementara (di-kill saat giliran dibatalkan)."""
         try:
+            result = run_process(
+                [
+                    "piper",
+                    "--model", str(self.onnx),
+                    "--config", str(self.config),
+                    "--output-raw"
+                ],
+                cancel=cancel,
+                input=text.encode("utf-8"),
+                check=True,
+                capture_output=True
+            )
+        except Cancelled:
+            print("INFO: Sintesis Piper dibatalkan.")
+            return None
+        except FileNotFoundError:
+            print("ERROR: Perintah 'piper' tidak ditemukan. Pastikan Piper terinstal dan ada di PATH.")
+            return None
+        except subprocess.CalledProcessError as e:
+            print(f"ERROR: Piper TTS gagal: {e.stderr.decode().strip()}")
+            return None
+        return np.frombuffer(result.stdout, dtype=np.int16), self.sample_rate
+
+    def cache_key(self, text):
+        return cache_key("piper", self.model_name, 1.0, text)
+
+    def render(self, text, cancel=None):
+        """Sintesis langsung tanpa prompt pack/cache (dipakai juga oleh builder prompt pack)."""
+        voice = self._load_voice()
+        if voice is not None:
             try:
-                subprocess.run(
-                    [
-                        "piper",
-                        "--model", str(self.onnx),
-                        "--config", str(self.config),
-                        "--output_file", str(out)
-                    ],
-                    input=text.encode("utf-8"),
-                    check=True,
-                    capture_output=True
-                )
-                #print("INFO: Piper TTS berhasil membuat file audio.")
-            except FileNotFoundError:
-                print("ERROR: Perintah 'piper' tidak ditemukan. Pastikan Piper terinstal dan ada di PATH.")
-                return
-            except subprocess.CalledProcessError as e:
-                print(f"ERROR: Piper TTS gagal: {e.stderr.decode().strip()}")
-                return
-
-            # Pastikan file .wav terbentuk
-            if not out.exists():
-                print("ERROR: File output audio tidak ditemukan.")
-                return
-
-            if audio_ready_event:
-                audio_ready_event.set()
-
-            # Mainkan audio
-            try:
-                data, fs = sf.read(out, dtype='int16')
-                sd.play(data, fs)
-                sd.wait()
-                #print("INFO: Audio berhasil diputar.")
-            except sd.PortAudioError as e:
-                print(f"ERROR: Gagal memutar audio: {e}")
-            except RuntimeError as e:
-                print(f"ERROR: Kesalahan saat membaca file audio: {e}")
-
-        finally:
-            # Bersihkan file sementara
-            if out.exists():
-                try:
-                    os.remove(out)
-                    #print(f"DEBUG: File sementara {out} dihapus.")
-                except OSError as e:
-                    print(f"WARNING: Gagal menghapus file sementara: {e}")
+                return self._synthesize_voice(voice, text)
+            except Exception as e:
+                print(f"WARNING: Sintesis Piper resident gagal, fallback ke CLI: {e}")
+        return self._synthesize_cli(text, cancel=cancel)
+
+    def synthesize(self, text, cancel=None):
+        """
+        Ubah teks menjadi PCM16 di memori. Prompt statis diambil dari prompt pack,
+        kalimat yang berulang dari cache TTS. `cancel`: token giliran pemilik kalimat
+        (default giliran saat ini).
+        Returns (np.ndarray int16, sample_rate), atau None jika gagal/dibatalkan.
+        """
+        key = self.cache_key(text)
+        cached = prompt_pack.get(key) or tts_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self.render(text, cancel=cancel)
+        if result is not None:
+            tts_cache.put(key, *result)
+        return result
 
 
 # === Inisialisasi model suara yang tersedia ===
@@ -88,11 +128,8 @@ jenny_tts = PiperTTS("en_GB-jenny_dioco-medium")
 nathalie_tts = PiperTTS("nl_BE-nathalie-medium")
 
 
-def speak_jenny(text, convert_numbers=True, audio_ready_event=None):
-    processed_text = convert_text(text, lang="en") if convert_numbers else text
-    jenny_tts.speak(processed_text, convert_numbers=False, audio_ready_event=audio_ready_event)
-
-
-def speak_nathalie(text, convert_numbers=True, audio_ready_event=None):
-    processed_text = convert_text(text, lang="id") if convert_numbers else text
-    nathalie_tts.speak(processed_text, convert_numbers=False, audio_ready_event=audio_ready_event)
+def prepare_speech(text, lang="id", convert_numbers=True):
+    """Dipakai SpeechQueue (inout/piper_output.py): (teks_final, synthesize) untuk bahasa tsb."""
+    tts = nathalie_tts if lang == "id" else jenny_tts
+    final_text = convert_text(text, lang="id" if lang == "id" else "en") if convert_numbers else text
+    return final_text, tts.synthesize
@@ -0,0 +1,321 @@
+# prompt_pack.py
+# Asset pack PCM untuk semua prompt statis (menu, pesan idle, teks help tanpa WAV).
+# Dibangun sekali (inkremental) lalu dibaca lewat memmap saat runtime, sehingga
+# speak_and_display memutar prompt statis tanpa sintesis.
+#
+# Cara membangun (dari root project):
+#   python -m inout.prompt_pack build              # semua engine (GCP butuh kredensial)
+#   python -m inout.prompt_pack build --engine piper
+#   python -m inout.prompt_pack status
+import argparse
+import ast
+import json
+import os
+import threading
+import numpy as np
+from utils.path_helper import get_resource_path
+from inout.tts_cache import cache_key
+
+PROMPT_PACK_DIR = get_resource_path("resource", "prompt_pack")
+PACK_FORMAT = 1
+
+# Katalog prompt: file sumber yang literal speak_and_display/speak_async-nya dipra-render.
+# Engine ditentukan dari modul output yang di-import file tsb (piper_output / gcp_output).
+PROMPT_SOURCES = [
+    "pocala_main.py",
+    "offline/main_offline.py",
+    "online/main_online.py",
+    "animation/idle_anim.py",
+    "help/help.py",
+]
+# Koleksi string yang diucapkan lewat variabel: (file, nama atribut/variabel, bahasa)
+PROMPT_COLLECTIONS = [
+    ("animation/idle_anim.py", "idle_messages", "en"),
+]
+HELP_LANGS = ["en", "id"]  # help/<lang>/<topik>.txt dipakai saat <topik>.wav tidak ada
+SPEAK_FUNCTIONS = {"speak_and_display", "speak_async"}
+
+
+def voice_signature(engine, voice):
+    """Versi voice: untuk Piper ukuran + mtime file ONNX, untuk GCP nama voice itu sendiri."""
+    if engine != "piper":
+        return voice
+    try:
+        stat = os.stat(get_resource_path("piper_models", voice, f"{voice}.onnx"))
+    except OSError:
+        return None
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+class PromptPack:
+    """
+    Pembaca asset pack (read-only).
+    get(key) -> (np.ndarray int16, sample_rate) atau None; kunci sama dengan cache TTS.
+    Entri yang voice-nya sudah berubah sejak pack dibangun diabaikan.
+    """
+
+    def __init__(self, directory=PROMPT_PACK_DIR):
+        self.directory = directory
+        self._entries = None
+        self._arrays = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def _load_locked(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(os.path.join(self.directory, "manifest.json"), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("format") != PACK_FORMAT:
+            print("[WARNING] Format prompt pack tidak cocok, jalankan ulang: python -m inout.prompt_pack build")
+            return
+        self._entries = manifest.get("entries", {})
+        print(f"[INFO] Prompt pack dimuat: {len(self._entries)} kalimat.")
+
+    def _valid_locked(self, entry):
+        voice_key = (entry["engine"], entry["voice"])
+        if voice_key not in self._signatures:
+            self._signatures[voice_key] = voice_signature(*voice_key)
+        return self._signatures[voice_key] == entry["signature"]
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            self._load_locked()
+            entry = self._entries.get(key)
+            if entry is None or not self._valid_locked(entry):
+                return None
+            pcm = self._arrays.get(key)
+            if pcm is None:
+                try:
+                    pcm = np.memmap(os.path.join(self.directory, f"{key}.pcm"), dtype=np.int16, mode="r")
+                except (OSError, ValueError) as e:
+                    print(f"[WARNING] Prompt pack rusak ({entry['text']!r}): {e}")
+                    self._entries.pop(key, None)
+                    return None
+                self._arrays[key] = pcm
+            return pcm, entry["sample_rate"]
+
+
+# === Builder ===
+
+def _source_engine(tree):
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "inout.gcp_output":
+            return "gcp"
+    return "piper"
+
+
+def _string_constants(tree):
+    """Variabel yang di-assign literal string (mis. question_text = "...")."""
+    names = {}
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+                and isinstance(node.value.value, str)):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names[target.id] = node.value.value
+    return names
+
+
+def _call_name(func):
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _scan_source(path):
+    """Kembalikan [(engine, lang, text)] dari satu file sumber."""
+    with open(get_resource_path(path), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    engine = _source_engine(tree)
+    constants = _string_constants(tree)
+    phrases = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or _call_name(node.func) not in SPEAK_FUNCTIONS or not node.args:
+            continue
+        arg = node.args[0]
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            text = arg.value
+        elif isinstance(arg, ast.Name) and arg.id in constants:
+            text = constants[arg.id]
+        else:
+            continue  # teks dinamis (f-string, hasil LLM): ditangani cache TTS
+        lang = "id"  # default speak_and_display
+        for keyword in node.keywords:
+            if keyword.arg == "lang":
+                if not isinstance(keyword.value, ast.Constant):
+                    lang = None
+                else:
+                    lang = keyword.value.value
+        if lang:
+            phrases.append((engine, lang, text))
+    return phrases
+
+
+def _scan_collection(path, name, lang):
+    with open(get_resource_path(path), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    engine = _source_engine(tree)
+    phrases = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Assign):
+            continue
+        if not any(_call_name(target) == name for target in node.targets):
+            continue
+        for value in ast.walk(node.value):
+            if isinstance(value, ast.Constant) and isinstance(value.value, str):
+                phrases.append((engine, lang, value.value))
+    return phrases
+
+
+def collect_prompts():
+    """Semua prompt statis dari katalog: [(engine, lang, text)] tanpa duplikat."""
+    phrases = []
+    for path in PROMPT_SOURCES:
+        phrases += _scan_source(path)
+    for path, name, lang in PROMPT_COLLECTIONS:
+        phrases += _scan_collection(path, name, lang)
+    for lang in HELP_LANGS:
+        help_dir = get_resource_path("help", lang)
+        if not os.path.isdir(help_dir):
+            continue
+        for filename in sorted(os.listdir(help_dir)):
+            topic, ext = os.path.splitext(filename)
+            if ext != ".txt" or os.path.exists(os.path.join(help_dir, f"{topic}.wav")):
+                continue
+            with open(os.path.join(help_dir, filename), "r", encoding="utf-8") as f:
+                text = f.read().strip()
+            if text:
+                phrases.append(("piper", lang, text))
+    return list(dict.fromkeys(phrases))
+
+
+def _voices(engine):
+    """(lang -> objek TTS) untuk engine; import di sini agar modul TTS bisa mengimpor prompt_pack."""
+    if engine == "gcp":
+        from inout.gcp_tts import gcp_en_tts, gcp_id_tts
+        return {"en": gcp_en_tts, "id": gcp_id_tts}
+    from inout.piper_tts import jenny_tts, nathalie_tts
+    return {"en": jenny_tts, "id": nathalie_tts}
+
+
+def _sentences(engine, lang, text):
+    """Kalimat persis seperti yang akan disintesis oleh antrean ucapan engine tsb."""
+    from inout.speech_pipeline import split_sentences
+    from utils.num_to_text import convert_text
+    return split_sentences(convert_text(text, lang="id" if lang == "id" else "en"))
+
+
+def _voice_name(engine, tts):
+    return tts.voice_name if engine == "gcp" else tts.model_name
+
+
+def _save_manifest(directory, entries):
+    path = os.path.join(directory, "manifest.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"format": PACK_FORMAT, "entries": entries}, f, indent=1, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def build(engines=("piper", "gcp"), directory=PROMPT_PACK_DIR, force=False):
+    """
+    Render semua prompt statis ke pack. Inkremental: kalimat yang teks, voice, dan
+    versi voice-nya tidak berubah dilewati; entri yang tidak lagi ada di katalog dihapus.
+    """
+    os.makedirs(directory, exist_ok=True)
+    try:
+        with open(os.path.join(directory, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        old_entries = manifest.get("entries", {}) if manifest.get("format") == PACK_FORMAT else {}
+    except (OSError, ValueError):
+        old_entries = {}
+
+    wanted = {}
+    for engine, lang, text in collect_prompts():
+        if engine not in engines:
+            continue
+        tts = _voices(engine)["id" if lang == "id" else "en"]
+        voice = _voice_name(engine, tts)
+        for sentence in _sentences(engine, lang, text):
+            key = tts.cache_key(sentence)
+            if key is None:
+                continue
+            wanted[key] = (tts, {"engine": engine, "voice": voice, "text": sentence,
+                                 "signature": voice_signature(engine, voice)})
+
+    entries = {key: entry for key, entry in old_entries.items() if entry["engine"] not in engines}
+    rendered = skipped = failed = 0
+    for key, (tts, meta) in wanted.items():
+        old = old_entries.get(key)
+        pcm_path = os.path.join(directory, f"{key}.pcm")
+        if (not force and old and old["signature"] == meta["signature"]
+                and os.path.exists(pcm_path)):
+            entries[key] = old
+            skipped += 1
+            continue
+
+        result = tts.render(meta["text"])
+        if result is None or len(result[0]) == 0:
+            print(f"[WARNING] Gagal merender prompt: {meta['text']!r}")
+            failed += 1
+            continue
+        pcm = np.ascontiguousarray(result[0], dtype=np.int16).reshape(-1)
+        with open(pcm_path, "wb") as f:
+            f.write(pcm.tobytes())
+        entries[key] = dict(meta, sample_rate=int(result[1]), samples=len(pcm))
+        rendered += 1
+        print(f"[INFO] Dirender ({meta['engine']}/{meta['voice']}): {meta['text']}")
+        _save_manifest(directory, entries)  # simpan progres, build bisa dilanjutkan jika terputus
+
+    stale = set(old_entries) - set(entries)
+    for key in stale:
+        try:
+            os.remove(os.path.join(directory, f"{key}.pcm"))
+        except OSError:
+            pass
+    _save_manifest(directory, entries)
+    print(f"[INFO] Prompt pack: {rendered} dirender, {skipped} tetap, {len(stale)} dihapus, {failed} gagal.")
+    return failed == 0
+
+
+def status(directory=PROMPT_PACK_DIR):
+    pack = PromptPack(directory)
+    prompts = collect_prompts()
+    missing = 0
+    for engine, lang, text in prompts:
+        tts = _voices(engine)["id" if lang == "id" else "en"]
+        if any(pack.get(tts.cache_key(s)) is None for s in _sentences(engine, lang, text)):
+            missing += 1
+            print(f"[MISSING] {engine}/{lang}: {text[:60]}")
+    print(f"[INFO] {len(prompts) - missing}/{len(prompts)} prompt statis ada di pack.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asset pack PCM untuk prompt statis POCALA.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="render prompt yang baru/berubah")
+    build_parser.add_argument("--engine", choices=["piper", "gcp", "all"], default="all")
+    build_parser.add_argument("--force", action="store_true", help="render ulang semua prompt")
+    sub.add_parser("status", help="tampilkan prompt yang belum ada di pack")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        engines = ("piper", "gcp") if args.engine == "all" else (args.engine,)
+        raise SystemExit(0 if build(engines, force=args.force) else 1)
+    status()
+
+
+# === Instance global, dibaca oleh PiperTTS dan GcpTTS ===
+prompt_pack = PromptPack()
+
+if __name__ == "__main__":
+    main()
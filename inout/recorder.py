@@ -1,13 +1,21 @@
 from utils.path_helper import get_resource_path
-import sounddevice as sd
+import os
 import scipy.io.wavfile as wav
 import numpy as np
-from gpiozero import Button
-import time
+from inout.button_input import rec_button
+from inout.recording import Recording, normalize_peak
+from inout.audio_capture import get_audio_capture
+from inout.vad import trim_silence
+from inout.speech_queue import wait_all_idle, await_barge_in, barge_in, end_barge_in
+from utils.cancellation import new_turn
 
-# GLOBAL BUTTON
-REC_BUTTON_PIN = 23
-button = Button(REC_BUTTON_PIN, pull_up=True)
+# GLOBAL BUTTON (event-driven, lihat inout/button_input.py)
+button = rec_button.button
+# Menekan tombol saat POCALA mengucapkan prompt/jawaban langsung memotongnya (barge-in)
+rec_button.add_press_listener(barge_in)
+
+# Set POCALA_DEBUG_AUDIO=1 untuk tetap menyimpan setiap rekaman sebagai WAV
+DEBUG_AUDIO = os.environ.get("POCALA_DEBUG_AUDIO", "0") == "1"
 
 
 class AudioRecorder:
@@ -28,7 +36,9 @@ class AudioRecorder:
         """Loop utama untuk merekam audio berkali-kali dengan menekan tombol."""
         try:
             while True:
-                if not button.is_pressed:
+                capture = get_audio_capture(self.samplerate)
+                if rec_button.wait_for_press():
+                    capture.begin()
                     print("INFO: TOMBOL DITEKAN - Mulai merekam...")
 
                     if self.lcd:
@@ -37,10 +47,10 @@ class AudioRecorder:
 
                     self.audio.clear()
 
-                    with sd.InputStream(samplerate=self.samplerate, channels=1, dtype='int16') as stream:
-                        while not button.is_pressed:
-                            frame, _ = stream.read(1024)
-                            self.audio.append(frame)
+                    rec_button.wait_for_release()
+                    frames = capture.end()
+                    if len(frames):
+                        self.audio.append(frames)
 
                     print("INFO: TOMBOL DILEPAS - Rekaman berhenti.")
 
@@ -56,8 +66,6 @@ class AudioRecorder:
                     self.save_audio()
                     print("INFO: Siap untuk rekaman berikutnya...")
 
-                time.sleep(0.05)
-
         except KeyboardInterrupt:
             print("INFO: Proses dihentikan oleh pengguna.")
 
@@ -72,40 +80,74 @@ class AudioRecorder:
         print(f"INFO: Rekaman disimpan sebagai: {self.filename}")
 
 
-# Fungsi sekali rekam dengan path audio konsisten
-def record_once(filename="audio.wav", samplerate=16000, lcd=None):
-    audio_path = get_resource_path(filename)
-
-    # Tunggu tombol dilepas dulu (biar gak langsung nyangkut)
-    while button.is_pressed:
-        time.sleep(0.05)
-
+# Fungsi sekali rekam, hasilnya Recording di memori
+def record_once(filename="audio.wav", samplerate=16000, lcd=None, live=None):
+    """
+    Rekam satu ucapan (tekan-tahan tombol) dan kembalikan objek Recording.
+    `filename` hanya dipakai untuk menyimpan WAV saat DEBUG_AUDIO aktif.
+    `live` (opsional): LiveTranscription dari live_transcription() milik transcriber;
+    transkripsi berjalan selama tombol ditahan dan ditempel ke `recording.live`.
+    """
+    # Mikrofon sudah berjalan di background, jadi pre-roll tersedia saat tombol ditekan
+    capture = get_audio_capture(samplerate)
+
+    # Prompt yang masih diantrekan (speak_async) diselesaikan dulu sebelum merekam;
+    # jika tombol ditekan selagi bicara (barge-in), antrean sudah dibatalkan
+    await_barge_in()
+    wait_all_idle()
+
+    # Tunggu event tombol ditekan (tanpa polling); langsung lanjut jika masih ditahan
+    rec_button.wait_for_press()
+
+    # Tandai awal segmen sebelum menyentuh LCD agar awal ucapan tidak hilang;
+    # setelah barge-in, segmen dimulai dari saat tombol ditekan
+    capture.begin(lag_seconds=rec_button.held_for())
+    new_turn()  # ASR/LLM/TTS untuk ucapan ini memakai token giliran baru
+    end_barge_in()
     print("INFO: TOMBOL DITEKAN - Mulai merekam...")
     if lcd:
         lcd.clear()
         lcd.display_text("Merekam...")
+    if live:
+        live.start(capture, capture.segment_start, lcd)
 
-    audio = []
-    with sd.InputStream(samplerate=samplerate, channels=1, dtype='int16') as stream:
-        while not button.is_pressed:
-            frame, _ = stream.read(1024)
-            audio.append(frame)
+    rec_button.wait_for_release()
 
+    stop_frame = capture.frames_written
+    audio_np = capture.end(stop_frame)
+    if live:
+        # Ekor rekaman mulai didekode sekarang, selagi LCD menampilkan status
+        live.stop(stop_frame)
     print("INFO: TOMBOL DILEPAS - Rekaman berhenti.")
-    if not audio:
+    if len(audio_np) == 0:
+        if live:
+            live.cancel()
         print("WARNING: Tidak ada audio.")
         if lcd:
             lcd.flash_message("Tidak ada audio.\nCoba rekam ulang.", duration=2)
         return None
 
+    # Pangkas hening; jika tidak ada suara sama sekali, ASR dilewati
+    speech = trim_silence(audio_np, samplerate)
+    if speech is None:
+        if live:
+            live.cancel()
+        print("WARNING: Tidak ada suara terdeteksi (VAD).")
+        if lcd:
+            lcd.flash_message("Tidak ada suara.\nCoba rekam ulang.", duration=2)
+        return None
+    print(f"INFO: VAD {len(audio_np) / samplerate:.2f}s -> {len(speech) / samplerate:.2f}s")
+    audio_np = speech
+
     if lcd:
         lcd.flash_message("Rekaman selesai.", duration=1.5)
 
-    audio_np = np.concatenate(audio, axis=0)
-    max_val = np.max(np.abs(audio_np))
-    if max_val > 0:
-        audio_np = (audio_np * (32767 / max_val)).astype(np.int16)
+    recording = Recording(normalize_peak(audio_np), samplerate)
+    recording.live = live
+    print(f"INFO: Rekaman {recording.duration:.2f} detik siap diproses.")
+
+    if DEBUG_AUDIO:
+        audio_path = recording.save(get_resource_path(filename))
+        print(f"INFO: Rekaman disimpan sebagai: {audio_path}")
 
-    wav.write(audio_path, samplerate, audio_np)
-    print(f"INFO: Rekaman disimpan sebagai: {audio_path}")
-    return audio_path
+    return recording
@@ -0,0 +1,49 @@
+# recording.py
+# Representasi rekaman di memori yang dipakai bersama recorder dan transcriber.
+import io
+import numpy as np
+import scipy.io.wavfile as wav
+
+
+def normalize_peak(samples):
+    """Normalisasi puncak buffer int16 ke skala penuh."""
+    samples = np.asarray(samples, dtype=np.int16)
+    max_val = np.max(np.abs(samples.astype(np.int32))) if len(samples) else 0
+    if max_val > 0:
+        samples = (samples * (32767 / max_val)).astype(np.int16)
+    return samples
+
+
+class Recording:
+    """
+    Hasil rekaman di memori: buffer int16 mono + sample rate.
+    Diteruskan langsung ke transcriber tanpa menulis file WAV.
+    """
+
+    def __init__(self, samples, samplerate):
+        self.samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        self.samplerate = samplerate
+        # Transkripsi parsial yang berjalan selama tombol ditahan (lihat live_transcriber.py)
+        self.live = None
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __bool__(self):
+        return len(self.samples) > 0
+
+    @property
+    def duration(self):
+        """Durasi rekaman dalam detik."""
+        return len(self.samples) / float(self.samplerate)
+
+    def to_wav_bytes(self):
+        """Bungkus buffer menjadi WAV PCM16 di memori."""
+        buf = io.BytesIO()
+        wav.write(buf, self.samplerate, self.samples)
+        return buf.getvalue()
+
+    def save(self, path):
+        """Simpan rekaman ke file WAV (untuk debugging)."""
+        wav.write(path, self.samplerate, self.samples)
+        return path
@@ -0,0 +1,33 @@
+# speech_pipeline.py
+# TTS per kalimat: pemecahan teks di batas kalimat dan batas sintesis di depan audio.
+# Pipeline-nya sendiri (kalimat pertama diputar begitu selesai disintesis, kalimat
+# berikutnya disintesis selagi kalimat sebelumnya diputar) ada di inout/speech_queue.py.
+import re
+
+MIN_SENTENCE_CHARS = 12   # potongan lebih pendek digabung ke kalimat berikutnya
+PREFETCH_SENTENCES = 2    # jumlah kalimat yang boleh disintesis lebih dulu
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(text, min_chars=MIN_SENTENCE_CHARS):
+    """
+    Pecah teks di batas kalimat (. ! ? dan baris baru).
+    Potongan yang terlalu pendek ("Yes.", "1.") digabung agar intonasi tetap wajar.
+    """
+    sentences = []
+    pending = ""
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}".strip() if pending else part
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences and len(pending) < min_chars:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
@@ -0,0 +1,300 @@
+# speech_queue.py
+# Antrean ucapan non-blocking: teks diantrekan dan langsung mendapat SpeechHandle.
+# Item diputar bersambung tanpa jeda (sintesis item berikutnya berjalan selagi item
+# sebelumnya diputar), dan LCD selalu menampilkan teks item yang sedang terdengar.
+import queue
+import threading
+from collections import deque
+from inout.audio_output import audio_output, PRIORITY_SPEECH
+from inout.speech_pipeline import split_sentences, PREFETCH_SENTENCES
+from utils.cancellation import current_turn, cancel_turn
+
+_queues = []
+_awaiting_press = threading.Event()  # record_once sedang menunggu tombol rekam ditekan
+_suppressed_turn = None  # giliran pengganti setelah barge-in: ucapan giliran di dalamnya dilewati
+
+
+class SpeechHandle:
+    """Handle satu item ucapan: tunggu selesai, batalkan, atau cek sudah mulai terdengar."""
+
+    def __init__(self, text, priority=PRIORITY_SPEECH):
+        self.text = text
+        self.priority = priority
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.cancelled = False
+        self._playbacks = []
+        self._lcd = None
+        self._unregister = lambda: None
+
+    def cancel(self):
+        """Hentikan item ini (audio dan scroll LCD-nya); item berikutnya tetap diputar."""
+        self.cancelled = True
+        for playback in list(self._playbacks):
+            playback.cancel()
+        if self._lcd and self.started.is_set() and not self.done.is_set():
+            self._lcd.cancel_scroll()
+
+    def wait(self, timeout=None):
+        """True jika item selesai (audio habis, LCD selesai) dalam batas waktu."""
+        return self.done.wait(timeout)
+
+    @property
+    def completed(self):
+        """True jika minimal satu kalimat diputar sampai habis dan item tidak dibatalkan."""
+        return (self.done.is_set() and not self.cancelled
+                and any(playback.completed for playback in self._playbacks))
+
+
+class _Item:
+    def __init__(self, handle, lang, lcd, mode, clear_after, scroll_speed, priority, turn):
+        self.handle = handle
+        self.lang = lang
+        self.lcd = lcd
+        self.mode = mode
+        self.clear_after = clear_after
+        self.scroll_speed = scroll_speed
+        self.priority = priority
+        self.turn = turn  # token giliran saat say(): sintesis ikut batal bersama giliran ini
+        self.first_queued = threading.Event()  # kalimat pertama sudah masuk audio_output
+        self.synth_done = threading.Event()    # semua kalimat sudah disintesis/diantrekan
+
+
+class _Prefetch:
+    def __init__(self, text, lang):
+        self.text = text
+        self.lang = lang
+
+
+class SpeechQueue:
+    """
+    Antrean ucapan untuk satu backend TTS.
+    - `prepare(text, lang)` -> (teks_final, synthesize) dengan synthesize(kalimat, cancel=token)
+      -> (pcm, sr) atau None.
+    - Tiga thread tetap (dibuat sekali): sintesis, pemantau pemutaran, dan LCD.
+    """
+
+    def __init__(self, prepare, name="speech"):
+        self.prepare = prepare
+        self.name = name
+        self._pending = queue.Queue()
+        self._monitor = queue.Queue()
+        self._display = queue.Queue()
+        self._active = []
+        self._prefetched = None  # (text, lang, [(pcm, sr), ...]) hasil prefetch() terakhir
+        self._lock = threading.Lock()
+        _queues.append(self)
+        for target in (self._synth_worker, self._monitor_worker, self._display_worker):
+            threading.Thread(target=target, daemon=True, name=f"{name}-{target.__name__}").start()
+
+    def say(self, text, lang="id", mode="short", lcd=None, clear_after=False,
+            scroll_speed=0.08, priority=PRIORITY_SPEECH):
+        """
+        Antrekan teks untuk diucapkan (dan ditampilkan ke LCD saat mulai terdengar).
+        Tidak memblok; kembalikan SpeechHandle. Item ikut dibatalkan saat giliran
+        dibatalkan (barge-in, shutdown; lihat utils/cancellation.py).
+        """
+        handle = SpeechHandle(text, priority)
+        handle._lcd = lcd
+        turn = current_turn()
+        if priority == PRIORITY_SPEECH and turn is _suppressed_turn:
+            # Pengguna sudah menekan tombol rekam: prompt lanjutan giliran ini dilewati
+            print(f"[INFO] Barge-in: ucapan dilewati sampai rekaman dimulai: {text!r}")
+            handle.cancelled = True
+            handle.done.set()
+            return handle
+        item = _Item(handle, lang, lcd, mode, clear_after, scroll_speed, priority, turn)
+        handle._unregister = turn.on_cancel(handle.cancel)
+        with self._lock:
+            self._active = [h for h in self._active if not h.done.is_set()]
+            self._active.append(handle)
+            self._pending.put(item)
+            self._monitor.put(item)
+        return handle
+
+    def prefetch(self, text, lang="id"):
+        """
+        Sintesis spekulatif prompt berikutnya yang paling mungkin (mis. "You can talk again!").
+        Dikerjakan setelah item yang sudah diantrekan, jadi tidak memperlambat jawaban yang
+        sedang diputar. Jika say() berikutnya memakai teks yang sama, audio langsung diputar;
+        jika berbeda, buffer dibuang.
+        """
+        if text:
+            self._pending.put(_Prefetch(text, lang))
+
+    def cancel_all(self):
+        """Batalkan semua item yang sedang diputar atau masih menunggu."""
+        with self._lock:
+            handles = list(self._active)
+        for handle in handles:
+            handle.cancel()
+
+    def is_idle(self, priority=None):
+        """
+        True jika tidak ada item yang sedang diputar atau menunggu
+        (hanya item dengan `priority` tsb jika diberikan).
+        """
+        with self._lock:
+            return all(handle.done.is_set() for handle in self._active
+                       if priority is None or handle.priority == priority)
+
+    def wait_idle(self, timeout=None):
+        """Tunggu sampai semua item selesai. Item selesai berurutan, jadi cukup tunggu yang terakhir."""
+        with self._lock:
+            last = self._active[-1] if self._active else None
+        return last is None or last.wait(timeout)
+
+    def _synth_worker(self):
+        outstanding = deque()
+        while True:
+            item = self._pending.get()
+            if isinstance(item, _Prefetch):
+                self._prefetch_item(item)
+                continue
+            try:
+                self._synthesize_item(item, outstanding)
+            except Exception as e:
+                print(f"[ERROR] Sintesis antrean {self.name} gagal: {e}")
+            finally:
+                item.first_queued.set()
+                item.synth_done.set()
+
+    def _prefetch_item(self, item):
+        try:
+            final_text, synthesize = self.prepare(item.text, item.lang)
+            results = []
+            for sentence in split_sentences(final_text):
+                if not self._pending.empty():
+                    return  # ada permintaan nyata: prediksi ditinggalkan
+                result = synthesize(sentence)
+                if result is None or len(result[0]) == 0:
+                    return
+                results.append(result)
+            self._prefetched = (item.text, item.lang, results)
+        except Exception as e:
+            print(f"[WARNING] Prefetch ucapan gagal: {e}")
+
+    def _take_prefetched(self, text, lang):
+        """Hasil prefetch jika cocok dengan item ini; selalu mengosongkan slot prefetch."""
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched and prefetched[:2] == (text, lang):
+            return prefetched[2]
+        return None
+
+    def _synthesize_item(self, item, outstanding):
+        handle = item.handle
+        prefetched = self._take_prefetched(handle.text, item.lang)
+        if handle.cancelled:
+            return
+        if prefetched:
+            for result in prefetched:
+                playback = audio_output.play(*result, priority=item.priority)
+                handle._playbacks.append(playback)
+                outstanding.append(playback)
+                item.first_queued.set()
+            return
+
+        final_text, synthesize = self.prepare(handle.text, item.lang)
+        for sentence in split_sentences(final_text):
+            # Jangan sintesis terlalu jauh di depan audio yang sedang diputar
+            while outstanding and outstanding[0].done.is_set():
+                outstanding.popleft()
+            if len(outstanding) > PREFETCH_SENTENCES:
+                outstanding.popleft().wait()
+            if handle.cancelled:
+                return
+            result = synthesize(sentence, cancel=item.turn)
+            if result is None or len(result[0]) == 0:
+                print(f"WARNING: Sintesis kalimat gagal, dilewati: {sentence!r}")
+                continue
+            if handle.cancelled:
+                return
+            # Langsung diantrekan: diputar bersambung dengan kalimat/item sebelumnya
+            playback = audio_output.play(*result, priority=item.priority)
+            handle._playbacks.append(playback)
+            outstanding.append(playback)
+            item.first_queued.set()
+        if not handle._playbacks:
+            print("ERROR: TTS tidak menghasilkan audio.")
+
+    def _monitor_worker(self):
+        while True:
+            item = self._monitor.get()
+            handle = item.handle
+            # Tampilkan teks saat kalimat pertamanya benar-benar mulai terdengar
+            item.first_queued.wait()
+            if handle._playbacks:
+                first = handle._playbacks[0]
+                while not first.started.wait(0.05) and not first.done.is_set():
+                    pass
+            if item.lcd:
+                item.lcd.cancel_scroll()  # scroll item sebelumnya berhenti di sini
+            handle.started.set()
+            self._display.put(("show", item))
+
+            item.synth_done.wait()
+            for playback in list(handle._playbacks):
+                playback.wait()
+            self._display.put(("finish", item))
+
+    def _display_worker(self):
+        while True:
+            action, item = self._display.get()
+            lcd = item.lcd
+            try:
+                if action == "show":
+                    if lcd and not item.handle.cancelled:
+                        if item.mode == "scroll":
+                            lcd.scroll_text(item.handle.text, speed=item.scroll_speed)
+                        else:
+                            lcd.display_text(item.handle.text)
+                elif item.clear_after and lcd:
+                    lcd.clear()
+            except Exception as e:
+                print(f"[ERROR] Gagal menampilkan teks ke LCD: {e}")
+            finally:
+                if action == "finish":
+                    item.handle._unregister()
+                    item.handle.done.set()
+
+
+def wait_all_idle(timeout=None):
+    """Tunggu semua antrean ucapan selesai (misalnya sebelum mulai merekam)."""
+    return all(speech_queue.wait_idle(timeout) for speech_queue in list(_queues))
+
+
+def cancel_all_speech():
+    """Batalkan semua ucapan di semua antrean."""
+    for speech_queue in list(_queues):
+        speech_queue.cancel_all()
+
+
+def await_barge_in():
+    """Dipanggil record_once sebelum menunggu tombol: barge-in boleh melewati prompt lanjutan."""
+    _awaiting_press.set()
+
+
+def barge_in():
+    """
+    Listener tombol rekam: jika POCALA sedang mengucapkan prompt/jawaban giliran ini,
+    hentikan ucapan dan scroll LCD serta batalkan pekerjaan giliran (request LLM/TTS yang
+    masih berjalan). Pengingat idle tidak dianggap giliran dan tidak memicu barge-in.
+    Selama record_once menunggu tombol, prompt giliran berikutnya dilewati sampai rekaman
+    dimulai (lihat end_barge_in). Returns True jika ada ucapan yang dipotong.
+    """
+    global _suppressed_turn
+    if all(speech_queue.is_idle(PRIORITY_SPEECH) for speech_queue in list(_queues)):
+        return False
+    print("[INFO] Barge-in: ucapan dihentikan oleh tombol rekam.")
+    cancel_turn("barge-in")
+    if _awaiting_press.is_set():
+        _suppressed_turn = current_turn()
+    cancel_all_speech()
+    return True
+
+
+def end_barge_in():
+    """Dipanggil saat rekaman dimulai: ucapan berikutnya diputar normal lagi."""
+    global _suppressed_turn
+    _awaiting_press.clear()
+    _suppressed_turn = None
@@ -0,0 +1,183 @@
+# tts_cache.py
+# Cache PCM hasil TTS, dialamatkan dengan hash (engine, voice, speaking rate, teks ternormalisasi).
+# Dua tingkat: LRU di RAM dan folder di disk (dibatasi ukurannya, bertahan setelah restart).
+# Kalimat yang sering diulang ("No audio detected. Please try again.") diputar tanpa sintesis
+# dan tanpa request GCP TTS. Entri baru hanya di RAM; baru ditulis ke SD card (di thread
+# background) saat dipakai ulang, jadi kalimat jawaban LLM yang tidak terulang tidak ditulis.
+import hashlib
+import os
+import queue
+import struct
+import threading
+from collections import OrderedDict
+import numpy as np
+from utils.path_helper import get_resource_path
+
+TTS_CACHE_DIR = get_resource_path("cache", "tts")
+RAM_CACHE_BYTES = 32 * 1024 * 1024    # ~12 menit audio 22 kHz
+DISK_CACHE_BYTES = 256 * 1024 * 1024
+MAX_ENTRY_BYTES = 1024 * 1024         # ~24 detik audio 22 kHz; kalimat lebih panjang jarang terulang
+
+_HEADER = struct.Struct("<I")  # sample rate, diikuti PCM int16 mentah
+
+
+def normalize_text(text):
+    """Normalisasi teks untuk kunci cache: spasi dirapikan, huruf besar/kecil tetap (memengaruhi intonasi)."""
+    return " ".join(text.split())
+
+
+def cache_key(engine, voice, rate, text):
+    """Kunci cache (juga dipakai prompt pack), atau None untuk teks kosong."""
+    text = normalize_text(text)
+    if not text:
+        return None
+    raw = f"{engine}\x00{voice}\x00{float(rate):.3f}\x00{text}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class TtsCache:
+    """
+    Cache PCM dua tingkat.
+    - get(key) -> (np.ndarray int16 read-only, sample_rate) atau None. Hit RAM pertama untuk
+      entri yang belum ada di disk menjadwalkan penulisan ke disk.
+    - put(key, pcm, sample_rate): simpan salinan ke RAM; entri tertua dibuang saat melebihi batas.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, ram_bytes=RAM_CACHE_BYTES, disk_bytes=DISK_CACHE_BYTES):
+        self.directory = directory
+        self.ram_bytes = ram_bytes
+        self.disk_bytes = disk_bytes
+        self._ram = OrderedDict()
+        self._ram_used = 0
+        self._disk = None  # OrderedDict key -> ukuran file, urut dari yang paling lama dipakai
+        self._disk_used = 0
+        self._lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._pending = set()  # kunci yang sedang menunggu ditulis ke disk
+        self.hits = 0
+        self.misses = 0
+        threading.Thread(target=self._write_worker, daemon=True, name="tts-cache-writer").start()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def _scan_disk_locked(self):
+        """Indeks folder cache sekali (saat pertama dipakai), urut berdasarkan waktu akses terakhir."""
+        if self._disk is not None:
+            return
+        self._disk = OrderedDict()
+        self._disk_used = 0
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".pcm")]
+        except OSError:
+            return
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            size = entry.stat().st_size
+            self._disk[entry.name[:-4]] = size
+            self._disk_used += size
+
+    def _remember_locked(self, key, pcm, sample_rate):
+        if key in self._ram:
+            self._ram.move_to_end(key)
+            return
+        self._ram[key] = (pcm, sample_rate)
+        self._ram_used += pcm.nbytes
+        while self._ram_used > self.ram_bytes and len(self._ram) > 1:
+            _, (old, _) = self._ram.popitem(last=False)
+            self._ram_used -= old.nbytes
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._ram.get(key)
+            if entry is not None:
+                self._ram.move_to_end(key)
+                self.hits += 1
+                self._scan_disk_locked()
+                if key not in self._disk and key not in self._pending:
+                    # Dipakai ulang: layak disimpan permanen, tanpa menahan pemutaran
+                    self._pending.add(key)
+                    self._writes.put((key, *entry))
+                return entry
+            self._scan_disk_locked()
+            on_disk = key in self._disk
+
+        if on_disk:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                (sample_rate,) = _HEADER.unpack_from(data)
+                pcm = np.frombuffer(data, dtype=np.int16, offset=_HEADER.size)
+                os.utime(path)  # tandai baru dipakai untuk LRU disk
+            except (OSError, struct.error, ValueError) as e:
+                print(f"[WARNING] Cache TTS rusak, diabaikan: {e}")
+                with self._lock:
+                    self._forget_disk_locked(key)
+            else:
+                with self._lock:
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    self._remember_locked(key, pcm, sample_rate)
+                    self.hits += 1
+                return pcm, sample_rate
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, pcm, sample_rate):
+        if key is None or len(pcm) == 0:
+            return
+        # Salinan read-only: array milik pemanggil (yang sedang diputar) tidak diubah
+        pcm = np.array(pcm, dtype=np.int16)
+        if pcm.nbytes > MAX_ENTRY_BYTES:
+            return
+        pcm.setflags(write=False)
+        with self._lock:
+            self._remember_locked(key, pcm, sample_rate)
+
+    def _write_worker(self):
+        while True:
+            key, pcm, sample_rate = self._writes.get()
+            try:
+                self._write(key, pcm, sample_rate)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def _write(self, key, pcm, sample_rate):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(int(sample_rate)))
+                f.write(pcm.tobytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARNING] Gagal menyimpan cache TTS: {e}")
+            return
+
+        size = _HEADER.size + pcm.nbytes
+        with self._lock:
+            self._disk[key] = size
+            self._disk_used += size
+            while self._disk_used > self.disk_bytes and len(self._disk) > 1:
+                old_key = next(iter(self._disk))
+                self._forget_disk_locked(old_key)
+
+    def _forget_disk_locked(self, key):
+        size = self._disk.pop(key, None)
+        if size is None:
+            return
+        self._disk_used -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+# === Instance global, dipakai bersama PiperTTS dan GcpTTS ===
+tts_cache = TtsCache()
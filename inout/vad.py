@@ -0,0 +1,131 @@
+# vad.py
+# Voice activity detection berbasis energi (vektorisasi NumPy) untuk memangkas
+# hening sebelum audio dikirim ke ASR.
+import numpy as np
+
+FRAME_MS = 20            # panjang frame analisis
+ABS_MIN_DB = -48.0       # di bawah ini selalu dianggap hening (dBFS)
+NOISE_MARGIN_DB = 10.0   # suara harus sekian dB di atas noise floor
+PEAK_RANGE_DB = 25.0     # threshold tidak pernah kurang dari (puncak - nilai ini)
+MIN_RANGE_DB = 12.0      # puncak harus sekian dB di atas noise floor, selain itu dianggap hening
+MIN_SPEECH_MS = 100      # potongan lebih pendek (klik tombol, ketukan) diabaikan
+PAD_MS = 150             # sisa hening yang dipertahankan di sekitar ucapan
+MAX_GAP_MS = 300         # jeda internal lebih panjang dipendekkan ke nilai ini
+SPLIT_SEARCH_MS = 1500   # jangkauan pencarian titik hening di sekitar batas potongan
+
+
+def _frame_view(samples, frame_len):
+    """Potong sinyal menjadi matriks (n_frame, frame_len); sisa di ujung diabaikan."""
+    n_frames = len(samples) // frame_len
+    return samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+
+
+def frame_energy_db(samples, samplerate, frame_ms=FRAME_MS):
+    """Energi RMS tiap frame dalam dBFS."""
+    frame_len = int(samplerate * frame_ms / 1000)
+    frames = _frame_view(np.asarray(samples, dtype=np.float32) / 32768.0, frame_len)
+    if len(frames) == 0:
+        return np.zeros(0, dtype=np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-6))
+
+
+def _runs(mask):
+    """Kembalikan array (start, stop) untuk setiap run True pada mask boolean."""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return edges.reshape(-1, 2)
+
+
+def speech_mask(samples, samplerate, frame_ms=FRAME_MS):
+    """
+    Tandai frame yang berisi suara.
+    Threshold adaptif: noise floor (persentil 10) + margin, dibatasi ABS_MIN_DB
+    dan tidak kurang dari (puncak - PEAK_RANGE_DB). Jika puncak kurang dari
+    MIN_RANGE_DB di atas noise floor (hanya noise ruangan), tidak ada frame yang ditandai.
+    """
+    db = frame_energy_db(samples, samplerate, frame_ms)
+    if len(db) == 0:
+        return np.zeros(0, dtype=bool)
+
+    noise_floor = np.percentile(db, 10)
+    if db.max() - noise_floor < MIN_RANGE_DB:
+        return np.zeros(len(db), dtype=bool)
+    threshold = max(noise_floor + NOISE_MARGIN_DB, db.max() - PEAK_RANGE_DB)
+    threshold = max(threshold, ABS_MIN_DB)
+    mask = db > threshold
+
+    # Buang potongan pendek (klik tombol, ketukan)
+    min_frames = max(1, MIN_SPEECH_MS // frame_ms)
+    for start, stop in _runs(mask):
+        if stop - start < min_frames:
+            mask[start:stop] = False
+    return mask
+
+
+def trim_silence(samples, samplerate, frame_ms=FRAME_MS,
+                 pad_ms=PAD_MS, max_gap_ms=MAX_GAP_MS):
+    """
+    Pangkas hening di awal/akhir dan pendekkan jeda panjang di tengah ucapan.
+
+    Returns:
+        np.ndarray int16 berisi ucapan saja, atau None jika tidak ada suara
+        (pemanggil bisa langsung melewati ASR).
+    """
+    samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+    mask = speech_mask(samples, samplerate, frame_ms)
+    runs = _runs(mask)
+    if len(runs) == 0:
+        return None
+
+    frame_len = int(samplerate * frame_ms / 1000)
+    pad = int(pad_ms / frame_ms)
+    max_gap = int(max_gap_ms / frame_ms)
+    n_frames = len(mask)
+
+    # Gabungkan run yang jedanya pendek, lalu pasang padding
+    segments = []
+    for start, stop in runs:
+        start, stop = max(0, start - pad), min(n_frames, stop + pad)
+        if segments and start - segments[-1][1] <= max_gap:
+            segments[-1][1] = stop
+        else:
+            segments.append([start, stop])
+
+    # Jeda panjang diganti hening sepanjang max_gap
+    gap = np.zeros(max_gap * frame_len, dtype=np.int16)
+    pieces = []
+    for i, (start, stop) in enumerate(segments):
+        if i > 0:
+            pieces.append(gap)
+        pieces.append(samples[start * frame_len:stop * frame_len])
+    return np.concatenate(pieces)
+
+
+def split_at_silence(samples, samplerate, parts, frame_ms=FRAME_MS, search_ms=SPLIT_SEARCH_MS):
+    """
+    Bagi sinyal menjadi `parts` potongan yang kira-kira sama panjang. Setiap batas
+    digeser ke frame paling hening dalam +/- search_ms agar tidak memotong kata.
+
+    Returns:
+        list np.ndarray int16, berurutan dan tanpa tumpang tindih.
+    """
+    samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+    db = frame_energy_db(samples, samplerate, frame_ms)
+    n_frames = len(db)
+    if parts <= 1 or n_frames < parts:
+        return [samples]
+
+    frame_len = int(samplerate * frame_ms / 1000)
+    search = int(search_ms / frame_ms)
+    cuts = [0]
+    for k in range(1, parts):
+        target = k * n_frames // parts
+        lo = max(cuts[-1] + 1, target - search)
+        hi = min(n_frames, target + search)
+        if lo >= hi:
+            continue
+        cuts.append(lo + int(np.argmin(db[lo:hi])))
+
+    bounds = [cut * frame_len for cut in cuts] + [len(samples)]
+    return [samples[start:stop] for start, stop in zip(bounds, bounds[1:]) if stop > start]
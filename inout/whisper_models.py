@@ -0,0 +1,293 @@
+# whisper_models.py (offline)
+# Registry tier model whisper.cpp + benchmark real-time factor (RTF) saat boot pertama,
+# lalu memilih model tercepat yang memenuhi target kualitas/latensi per profil pemanggil.
+import atexit
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+import wave
+from collections import OrderedDict
+from utils.path_helper import get_resource_path
+from inout.whisper_server import WhisperServer, WHISPER_PORT, WHISPER_THREADS, whisper_server
+
+# quality: perkiraan akurasi relatif (base multibahasa = 2.0)
+# cost: perkiraan RTF relatif terhadap base, dipakai sebelum benchmark tersedia
+# english_only: model .en hanya untuk transkripsi bahasa Inggris
+WHISPER_MODELS = OrderedDict([
+    ("base",          {"file": "ggml-base.bin",          "quality": 2.0,  "cost": 1.0, "english_only": False}),
+    ("tiny",          {"file": "ggml-tiny.bin",          "quality": 1.0,  "cost": 0.4, "english_only": False}),
+    ("tiny-q5_1",     {"file": "ggml-tiny-q5_1.bin",     "quality": 0.85, "cost": 0.3, "english_only": False}),
+    ("tiny.en",       {"file": "ggml-tiny.en.bin",       "quality": 1.1,  "cost": 0.4, "english_only": True}),
+    ("tiny.en-q5_1",  {"file": "ggml-tiny.en-q5_1.bin",  "quality": 0.95, "cost": 0.3, "english_only": True}),
+    ("base-q5_1",     {"file": "ggml-base-q5_1.bin",     "quality": 1.85, "cost": 0.8, "english_only": False}),
+    ("base-q8_0",     {"file": "ggml-base-q8_0.bin",     "quality": 1.95, "cost": 0.9, "english_only": False}),
+    ("base.en",       {"file": "ggml-base.en.bin",       "quality": 2.1,  "cost": 1.0, "english_only": True}),
+    ("base.en-q5_1",  {"file": "ggml-base.en-q5_1.bin",  "quality": 1.95, "cost": 0.8, "english_only": True}),
+    ("base.en-q8_0",  {"file": "ggml-base.en-q8_0.bin",  "quality": 2.05, "cost": 0.9, "english_only": True}),
+    ("small",         {"file": "ggml-small.bin",         "quality": 3.0,  "cost": 3.0, "english_only": False}),
+    ("small-q5_1",    {"file": "ggml-small-q5_1.bin",    "quality": 2.85, "cost": 2.4, "english_only": False}),
+    ("small.en",      {"file": "ggml-small.en.bin",      "quality": 3.1,  "cost": 3.0, "english_only": True}),
+    ("small.en-q5_1", {"file": "ggml-small.en-q5_1.bin", "quality": 2.95, "cost": 2.4, "english_only": True}),
+])
+
+DEFAULT_MODEL = "base"
+BASE_RTF_ESTIMATE = 0.5  # perkiraan RTF base di Raspberry Pi sebelum benchmark
+
+# Target per profil pemanggil: model tercepat dengan quality >= min_quality dan RTF <= max_rtf
+WHISPER_PROFILES = {
+    "default": {"min_quality": 2.0,  "max_rtf": 0.6},
+    "grammar": {"min_quality": 1.9,  "max_rtf": 0.4},   # contoh: base.en-q5_1 untuk transcribe_en
+    # Jawaban singkat ya/tidak/menu: model yang sudah dimuat selalu dipakai (bergantian dengan
+    # profil lain tidak boleh memuat ulang model tiap giliran)
+    "command": {"min_quality": 0.85, "max_rtf": 0.2, "use_resident": True},
+    "live":    {"min_quality": 1.85, "max_rtf": 0.6},   # jendela bergulir selagi tombol ditahan
+}
+
+MAX_RESIDENT_SERVERS = 2  # batasi RAM: paling banyak dua model tier dimuat bersamaan
+# Transkripsi paralel: proses pekerja terpisah (anggaran sendiri, di luar MAX_RESIDENT_SERVERS),
+# masing-masing WHISPER_THREADS // PARALLEL_WORKERS thread agar core tidak dibagi berlebihan
+PARALLEL_WORKERS = 2
+PARALLEL_PORT_OFFSET = 100
+BENCHMARK_AUDIO = get_resource_path("whisper.cpp", "samples", "jfk.wav")
+BENCHMARK_CACHE = get_resource_path("whisper.cpp", "models", "pocala_benchmark.json")
+
+
+def model_path(name):
+    return get_resource_path("whisper.cpp", "models", WHISPER_MODELS[name]["file"])
+
+
+def installed_models():
+    """Nama model dari registry yang file-nya ada di disk."""
+    return [name for name in WHISPER_MODELS if os.path.exists(model_path(name))]
+
+
+def _model_signature(name):
+    """Kunci cache benchmark: ukuran + mtime file model dan jumlah thread."""
+    stat = os.stat(model_path(name))
+    return f"{stat.st_size}:{int(stat.st_mtime)}:{WHISPER_THREADS}"
+
+
+def _audio_duration(path):
+    with wave.open(path, "rb") as f:
+        return f.getnframes() / float(f.getframerate())
+
+
+class WhisperModelSelector:
+    """Menyimpan hasil benchmark RTF dan memilih model per profil/bahasa."""
+
+    def __init__(self, cache_path=BENCHMARK_CACHE):
+        self.cache_path = cache_path
+        self.results = self._load_cache()
+        self._benchmark_thread = None
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        try:
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(self.results, f, indent=2)
+        except OSError as e:
+            print(f"[WARNING] Gagal menyimpan hasil benchmark whisper: {e}")
+
+    def rtf(self, name):
+        """RTF terukur jika benchmark masih valid, selain itu perkiraan dari registry."""
+        entry = self.results.get(name)
+        if entry and os.path.exists(model_path(name)) and entry.get("signature") == _model_signature(name):
+            return entry["rtf"]
+        return WHISPER_MODELS[name]["cost"] * BASE_RTF_ESTIMATE
+
+    def pending_benchmarks(self):
+        return [
+            name for name in installed_models()
+            if self.results.get(name, {}).get("signature") != _model_signature(name)
+        ]
+
+    def _benchmark_model(self, name, duration):
+        """Jalankan whisper-cli pada sampel jfk.wav dan hitung RTF tanpa waktu load model."""
+        whisper_bin = get_resource_path("whisper.cpp", "build", "bin", "whisper-cli")
+        start_time = time.time()
+        try:
+            result = subprocess.run(
+                [
+                    "nice", "-n", "10", whisper_bin,
+                    "-m", model_path(name),
+                    "-f", BENCHMARK_AUDIO,
+                    "-t", str(WHISPER_THREADS),
+                    "-l", "en",
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"[WARNING] Benchmark whisper {name} gagal: {e}")
+            return None
+        elapsed = time.time() - start_time
+
+        # whisper_print_timings dicetak ke stderr lewat log whisper (tanpa -np, yang mematikan log);
+        # jika tidak ditemukan, RTF dihitung dari waktu total termasuk load model
+        timings = dict(re.findall(r"(\w+) time =\s*([\d.]+) ms", result.stderr))
+        if "total" in timings:
+            elapsed = (float(timings["total"]) - float(timings.get("load", 0))) / 1000.0
+        return elapsed / duration
+
+    def run_benchmarks(self):
+        """Benchmark semua model terpasang yang belum punya hasil valid (blocking)."""
+        pending = self.pending_benchmarks()
+        if not pending:
+            return
+        if not os.path.exists(BENCHMARK_AUDIO):
+            print(f"[WARNING] Sampel benchmark tidak ditemukan: {BENCHMARK_AUDIO}")
+            return
+
+        duration = _audio_duration(BENCHMARK_AUDIO)
+        for name in pending:
+            rtf = self._benchmark_model(name, duration)
+            if rtf is None:
+                continue
+            self.results[name] = {"rtf": round(rtf, 4), "signature": _model_signature(name)}
+            print(f"[INFO] Benchmark whisper {name}: RTF {rtf:.3f}")
+            self._save_cache()
+
+    def start_benchmarks(self, after_server=None):
+        """
+        Benchmark di background (boot pertama / model baru); tidak memblok startup.
+        Jika `after_server` diberikan, benchmark menunggu server itu siap dulu agar
+        tidak berebut CPU dengan pemuatan model utama.
+        """
+        if self._benchmark_thread is not None and self._benchmark_thread.is_alive():
+            return
+        if not self.pending_benchmarks():
+            return
+
+        def run():
+            if after_server is not None:
+                after_server.start(wait=True)
+            self.run_benchmarks()
+
+        self._benchmark_thread = threading.Thread(target=run, daemon=True)
+        self._benchmark_thread.start()
+
+    def candidates(self, profile="default", language="auto"):
+        """Model terpasang yang mendukung bahasa dan memenuhi kualitas profil, urut dari tercepat."""
+        target = WHISPER_PROFILES.get(profile, WHISPER_PROFILES["default"])
+        names = [
+            name for name in installed_models()
+            if (language == "en" or not WHISPER_MODELS[name]["english_only"])
+            and WHISPER_MODELS[name]["quality"] >= target["min_quality"]
+        ]
+        return sorted(names, key=self.rtf)
+
+    def select(self, profile="default", language="auto", prefer=()):
+        """
+        Pilih model untuk profil/bahasa. Model di `prefer` (sudah dimuat) dipakai
+        jika memenuhi target, agar tidak memuat model baru hanya demi selisih kecil.
+        Profil dengan `use_resident` memakai model resident yang memenuhi kualitas/bahasa
+        walau latensinya di atas target.
+        """
+        target = WHISPER_PROFILES.get(profile, WHISPER_PROFILES["default"])
+        names = self.candidates(profile, language)
+        if not names:
+            return DEFAULT_MODEL
+
+        if target.get("use_resident"):
+            for name in names:
+                if name in prefer:
+                    return name
+
+        meeting = [name for name in names if self.rtf(name) <= target["max_rtf"]]
+        for name in meeting:
+            if name in prefer:
+                return name
+        # Tercepat yang memenuhi target; jika tidak ada yang memenuhi latensi, tetap yang tercepat
+        return meeting[0] if meeting else names[0]
+
+
+class WhisperServerPool:
+    """
+    Kumpulan whisper-server per model. Paling banyak MAX_RESIDENT_SERVERS berjalan;
+    yang paling lama tidak dipakai dihentikan saat model lain dibutuhkan.
+    Pekerja transkripsi paralel dikelola terpisah (lihat parallel_servers/stop_workers).
+    """
+
+    def __init__(self, selector, default_server):
+        self.selector = selector
+        self._servers = OrderedDict([(DEFAULT_MODEL, default_server)])
+        self._workers = {}
+        self._lock = threading.Lock()
+
+    def _create(self, name):
+        port = WHISPER_PORT + list(WHISPER_MODELS).index(name)
+        return WhisperServer(model_name=WHISPER_MODELS[name]["file"], port=port)
+
+    def server_for(self, profile="default", language="auto"):
+        """Kembalikan (nama_model, WhisperServer) untuk profil/bahasa tsb."""
+        with self._lock:
+            resident = [name for name, server in self._servers.items() if server.is_running()]
+            name = self.selector.select(profile, language, prefer=resident)
+            server = self._servers.get(name)
+            if server is None:
+                server = self._create(name)
+                self._servers[name] = server
+            self._servers.move_to_end(name)
+
+            running = [n for n, s in self._servers.items() if s.is_running() and n != name]
+            while len(running) >= MAX_RESIDENT_SERVERS:
+                evicted = running.pop(0)
+                print(f"[INFO] Menghentikan whisper-server {evicted} (batas model resident).")
+                self._servers[evicted].stop()
+        return name, server
+
+    def parallel_servers(self, name, workers=PARALLEL_WORKERS):
+        """
+        Server pekerja untuk transkripsi paralel model `name`: `workers` proses terpisah,
+        masing-masing WHISPER_THREADS // workers thread, sehingga bersama-sama memakai core
+        sebanyak satu server biasa. Server tier (yang memakai semua thread) tidak ikut
+        mendekode selama pekerja berjalan. Pekerja punya anggaran sendiri dan tidak
+        dihitung dalam MAX_RESIDENT_SERVERS.
+        Dijalankan saat pertama dibutuhkan (tanpa menunggu); hanya yang sudah siap dikembalikan.
+        """
+        threads = max(1, WHISPER_THREADS // workers)
+        ready = []
+        with self._lock:
+            # Pekerja model lain tidak berguna lagi
+            for key in [key for key in self._workers if key[0] != name]:
+                self._workers.pop(key).stop()
+            for i in range(workers):
+                key = (name, i)
+                server = self._workers.get(key)
+                if server is None:
+                    port = WHISPER_PORT + PARALLEL_PORT_OFFSET + 10 * list(WHISPER_MODELS).index(name) + i
+                    server = WhisperServer(model_name=WHISPER_MODELS[name]["file"], port=port, threads=threads)
+                    self._workers[key] = server
+                if not server.is_running():
+                    server.start(wait=False)
+                if server.is_ready():
+                    ready.append(server)
+        return ready
+
+    def stop_workers(self):
+        """Hentikan semua server pekerja paralel (saat mode yang memakainya selesai)."""
+        with self._lock:
+            for server in self._workers.values():
+                server.stop()
+
+    def stop_all(self):
+        with self._lock:
+            for server in list(self._servers.values()) + list(self._workers.values()):
+                server.stop()
+
+
+# === Instance global: server default (base) ikut dikelola pool ===
+model_selector = WhisperModelSelector()
+whisper_pool = WhisperServerPool(model_selector, whisper_server)
+atexit.register(whisper_pool.stop_all)
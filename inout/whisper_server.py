@@ -0,0 +1,231 @@
+# whisper_server.py (offline)
+# Menjalankan whisper.cpp dalam mode server agar model cukup dimuat sekali saat boot.
+import atexit
+import http.client
+import json
+import math
+import os
+import socket
+import subprocess
+import threading
+import time
+import requests
+from utils.path_helper import get_resource_path
+from utils.cancellation import Cancelled, resolve
+
+WHISPER_HOST = "127.0.0.1"
+WHISPER_PORT = 8910
+WHISPER_THREADS = os.cpu_count() or 4
+STARTUP_TIMEOUT = 60  # detik, memuat model dari SD card bisa lama
+
+
+class WhisperServer:
+    """
+    Wrapper untuk proses `whisper-server` (whisper.cpp) yang berjalan terus.
+    Model dimuat sekali, lalu audio dikirim lewat HTTP ke endpoint /inference.
+    """
+
+    def __init__(self, model_name="ggml-base.bin", host=WHISPER_HOST, port=WHISPER_PORT,
+                 threads=WHISPER_THREADS):
+        self.server_bin = get_resource_path("whisper.cpp", "build", "bin", "whisper-server")
+        self.model_path = get_resource_path("whisper.cpp", "models", model_name)
+        self.host = host
+        self.port = port
+        self.threads = threads
+        self.base_url = f"http://{host}:{port}"
+        self.process = None
+        self._lock = threading.Lock()
+        self._ready = False
+        self._startup_done = threading.Event()
+
+    def is_available(self):
+        """True jika binary server dan model tersedia di disk."""
+        return os.path.exists(self.server_bin) and os.path.exists(self.model_path)
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def is_ready(self):
+        """True jika server berjalan dan model sudah selesai dimuat."""
+        return self._ready and self.is_running()
+
+    def start(self, wait=True):
+        """
+        Jalankan server (jika belum berjalan).
+        wait=False berguna saat boot: model dimuat di background sambil welcome prompt diputar.
+        """
+        with self._lock:
+            if not self.is_running():
+                if not self.is_available():
+                    print(f"[WARNING] whisper-server atau model tidak ditemukan: {self.server_bin}")
+                    return False
+
+                print(f"[INFO] Menjalankan whisper-server ({os.path.basename(self.model_path)})...")
+                self._ready = False
+                self._startup_done.clear()
+                self.process = subprocess.Popen(
+                    [
+                        self.server_bin,
+                        "-m", self.model_path,
+                        "-t", str(self.threads),
+                        "--host", self.host,
+                        "--port", str(self.port),
+                    ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                threading.Thread(target=self._wait_until_ready, daemon=True).start()
+
+        if wait:
+            self._startup_done.wait(STARTUP_TIMEOUT)
+            return self._ready
+        return True
+
+    def _wait_until_ready(self):
+        """Polling sampai server mulai listen (artinya model sudah selesai dimuat)."""
+        start_time = time.time()
+        try:
+            while time.time() - start_time < STARTUP_TIMEOUT:
+                if not self.is_running():
+                    print("[ERROR] whisper-server berhenti saat startup.")
+                    return
+                try:
+                    requests.get(self.base_url, timeout=1)
+                    self._ready = True
+                    print(f"[INFO] whisper-server siap dalam {time.time() - start_time:.2f} detik.")
+                    return
+                except requests.exceptions.RequestException:
+                    time.sleep(0.2)
+            print(f"[ERROR] whisper-server tidak siap setelah {STARTUP_TIMEOUT} detik.")
+            self.stop()
+        finally:
+            self._startup_done.set()
+
+    def stop(self):
+        """Hentikan proses server."""
+        with self._lock:
+            if self.is_running():
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+            self.process = None
+            self._ready = False
+
+    def _inference(self, audio, data, timeout, cancel=None):
+        """
+        POST audio ke /inference dan kembalikan payload JSON, atau None jika gagal/dibatalkan.
+        Saat token batal socket request diputus, sehingga whisper-server menghentikan dekode
+        (abort callback saat koneksi tertutup) dan siap untuk giliran berikutnya.
+        """
+        if not self.start(wait=True):
+            return None
+
+        if isinstance(audio, (str, os.PathLike)):
+            with open(audio, "rb") as f:
+                wav_bytes = f.read()
+        else:
+            wav_bytes = audio.to_wav_bytes()
+
+        cancel = resolve(cancel)
+        request = requests.Request(
+            "POST", f"{self.base_url}/inference",
+            files={"file": ("audio.wav", wav_bytes, "audio/wav")},
+            data=data,
+        ).prepare()
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        unregister = lambda: None
+        try:
+            cancel.raise_if_cancelled()
+            connection.connect()
+            unregister = cancel.on_cancel(lambda: _abort_socket(connection.sock))
+            connection.request("POST", "/inference", body=request.body, headers=dict(request.headers))
+            response = connection.getresponse()
+            body = response.read()
+            cancel.raise_if_cancelled()
+            if response.status >= 400:
+                raise http.client.HTTPException(f"HTTP {response.status} {response.reason}")
+            return json.loads(body)
+        except Cancelled:
+            print("[INFO] Transkripsi whisper-server dibatalkan.")
+            return None
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            if cancel.cancelled:
+                print("[INFO] Transkripsi whisper-server dibatalkan.")
+            else:
+                print(f"[ERROR] whisper-server gagal: {e}")
+            return None
+        finally:
+            unregister()
+            connection.close()
+
+    def transcribe(self, audio, language="auto", timeout=60, prompt=None, cancel=None):
+        """
+        Kirim audio ke server dan kembalikan teks mentah.
+        `audio` boleh berupa Recording (dikirim langsung dari memori) atau path file WAV.
+        `prompt` (opsional) dipakai sebagai konteks awal decoder, misalnya teks potongan sebelumnya.
+        Mengembalikan None jika server tidak bisa dipakai (pemanggil boleh fallback ke CLI)
+        atau token `cancel` dibatalkan (cek token sebelum fallback).
+        """
+        data = {
+            "language": language,
+            "response_format": "json",
+            "temperature": "0.0",
+        }
+        if prompt:
+            data["prompt"] = prompt
+
+        payload = self._inference(audio, data, timeout, cancel)
+        if payload is None:
+            return None
+        return payload.get("text", "").strip()
+
+    def transcribe_with_confidence(self, audio, language="auto", timeout=30, prompt=None,
+                                   cancel=None):
+        """
+        Seperti transcribe(), tetapi meminta verbose_json agar keyakinan decoder ikut dihitung.
+        Returns (teks, confidence 0..1 atau None jika server tidak melaporkannya), atau None jika gagal.
+        """
+        data = {
+            "language": language,
+            "response_format": "verbose_json",
+            "temperature": "0.0",
+        }
+        if prompt:
+            data["prompt"] = prompt
+
+        payload = self._inference(audio, data, timeout, cancel)
+        if payload is None:
+            return None
+        return payload.get("text", "").strip(), _confidence(payload)
+
+
+def _abort_socket(sock):
+    """Putus socket yang sedang menunggu respons (membangunkan recv di thread lain)."""
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def _confidence(payload):
+    """Rata-rata probabilitas token dari respons verbose_json (None jika tidak tersedia)."""
+    probs = []
+    for segment in payload.get("segments", []):
+        if "avg_logprob" in segment:
+            probs.append(math.exp(segment["avg_logprob"]))
+            continue
+        for token in segment.get("tokens", []):
+            if isinstance(token, dict) and "p" in token:
+                probs.append(token["p"])
+    if not probs:
+        return None
+    return sum(probs) / len(probs)
+
+
+# === Instance global, dipakai bersama oleh semua mode ===
+whisper_server = WhisperServer()
+atexit.register(whisper_server.stop)
@@ -1,9 +1,31 @@
 # whisper_transcriber.py (offline)
+import math
 import os
 import re
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import numpy as np
 from utils.path_helper import get_resource_path
+from inout.whisper_server import whisper_server
+from inout.whisper_models import whisper_pool, WHISPER_MODELS
+from inout.live_transcriber import LiveTranscription
+from inout.recording import Recording, normalize_peak
+from inout.vad import frame_energy_db, trim_silence, split_at_silence
+from utils.response_check import match_command, command_prompt
+from utils.cancellation import Cancelled, resolve, run_process
+
+LIVE_WINDOW_SECONDS = 6   # audio sepanjang ini didekode selagi tombol masih ditahan
+LIVE_CUT_SEARCH_SECONDS = 2  # cari titik potong paling hening di ujung jendela
+LIVE_CUT_FRAME_MS = 20
+LIVE_BACKLOG_SECONDS = 2 * LIVE_WINDOW_SECONDS  # live tertinggal sejauh ini: siapkan pekerja paralel
+
+COMMAND_MAX_SECONDS = 5        # jawaban lebih panjang bukan perintah singkat
+COMMAND_MIN_CONFIDENCE = 0.45  # di bawah ini fallback ke ASR penuh
+
+PARALLEL_MIN_SECONDS = 15      # sisa audio live lebih panjang dibagi ke beberapa server pekerja
+PARALLEL_SEGMENT_SECONDS = 30  # satu jendela encoder whisper
 
 def clean_transcript(text):
     """Membersihkan hasil transkripsi dari karakter non-alfanumerik."""
@@ -15,69 +37,268 @@ def clean_transcript(text):
     return text.strip()
 
 
-def transcribe_whisper(audio_path, language="auto", lcd=None):
+def _transcribe_cli(audio, language="auto", model_name="base", cancel=None):
+    """
+    Fallback: jalankan whisper-cli sekali jalan (model dimuat ulang setiap panggilan).
+    whisper-cli butuh file, jadi Recording ditulis sementara ke /tmp.
+    Mengembalikan teks mentah atau "" jika gagal/dibatalkan (proses di-kill saat token batal).
+    """
+    whisper_bin = get_resource_path("whisper.cpp", "build", "bin", "whisper-cli")
+    model_path = get_resource_path("whisper.cpp", "models", WHISPER_MODELS[model_name]["file"])
+
+    if isinstance(audio, (str, os.PathLike)):
+        audio_path, temp_path = str(audio), None
+    else:
+        fd, temp_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        audio_path = audio.save(temp_path)
+
+    try:
+        try:
+            run_process(
+                [
+                    whisper_bin,
+                    "-m", model_path,
+                    "-f", audio_path,
+                    "-otxt",
+                    "-l", language,
+                ],
+                cancel=cancel,
+                check=True
+            )
+        except Cancelled:
+            print("[INFO] whisper-cli dibatalkan.")
+            return ""
+        except subprocess.CalledProcessError as e:
+            print(f"[ERROR] Proses whisper.cpp gagal: {e}")
+            return ""
+
+        result_file = Path(audio_path).with_suffix(".wav.txt")
+        if not result_file.exists():
+            print("[ERROR] File hasil transkripsi tidak ditemukan.")
+            return ""
+
+        with open(result_file, "r", encoding="utf-8") as f:
+            result_text = f.read().strip()
+        os.remove(result_file)
+        return result_text
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _transcribe_command(audio, language, commands, cancel=None):
+    """
+    Jalur cepat untuk pertanyaan tertutup: decoder diarahkan dengan initial prompt berisi
+    daftar perintah, lalu hasilnya dicocokkan ke perintah tersebut.
+    Mengembalikan None jika keyakinan rendah atau tidak ada perintah yang cocok.
+    """
+    duration = getattr(audio, "duration", None)
+    if duration is not None and duration > COMMAND_MAX_SECONDS:
+        return None
+
+    prompt = command_prompt(commands)
+    _, server = whisper_pool.server_for("command", language)
+    result = server.transcribe_with_confidence(audio, language=language, prompt=prompt,
+                                              cancel=cancel)
+    if result is None:
+        return None
+
+    text, confidence = result
+    if confidence is not None and confidence < COMMAND_MIN_CONFIDENCE:
+        print(f"[INFO] Keyakinan perintah rendah ({confidence:.2f}): {text!r}")
+        return None
+
+    command = match_command(text, commands)
+    if command is None:
+        print(f"[INFO] Tidak ada perintah yang cocok: {text!r}")
+        return None
+
+    print(f"[INFO] Perintah dikenali: {command!r} (teks: {text!r})")
+    text = clean_transcript(text)
+    # Jika cocok karena kemiripan ejaan, kembalikan perintah aslinya agar is_yes() dll. cocok
+    return text if command.lower() in text.lower() else command
+
+
+def _transcribe_parallel(audio, language, model_name, cancel=None):
+    """
+    Sisa audio live yang panjang: potong di batas hening lalu dekode potongan secara paralel pada
+    server pekerja (thread CPU dibagi rata di antara mereka), kemudian sambung sesuai urutan.
+    Mengembalikan None jika pekerja belum siap atau ada potongan yang gagal,
+    sehingga pemanggil memakai jalur serial biasa.
+    """
+    servers = whisper_pool.parallel_servers(model_name)
+    if len(servers) < 2:
+        return None
+
+    parts = max(len(servers), math.ceil(audio.duration / PARALLEL_SEGMENT_SECONDS))
+    segments = split_at_silence(audio.samples, audio.samplerate, parts)
+    chunks = [Recording(segment, audio.samplerate) for segment in segments]
+    print(f"[INFO] Transkripsi paralel: {len(chunks)} potongan di {len(servers)} server.")
+
+    with ThreadPoolExecutor(max_workers=len(servers)) as executor:
+        futures = [
+            executor.submit(servers[i % len(servers)].transcribe, chunk, language, cancel=cancel)
+            for i, chunk in enumerate(chunks)
+        ]
+        texts = [future.result() for future in futures]
+
+    if any(text is None for text in texts):
+        return None
+    return " ".join(text for text in texts if text)
+
+
+def stop_parallel_transcription():
+    """Lepas server pekerja paralel agar RAM-nya kembali untuk mode berikutnya."""
+    whisper_pool.stop_workers()
+
+
+def transcribe_whisper(audio, language="auto", lcd=None, commands=None, profile="default",
+                       cancel=None):
     """
-    Menjalankan whisper.cpp CLI untuk melakukan transkripsi dari file audio.
+    Melakukan transkripsi audio menggunakan whisper.cpp.
+    Memakai whisper-server yang sudah memuat model; jika server tidak tersedia,
+    fallback ke whisper-cli.
 
     Parameter:
-        audio_path : str atau Path
-            Path ke file audio .wav.
+        audio : Recording, str, atau Path
+            Rekaman di memori dari record_once, atau path ke file audio .wav.
         language : str
             'auto', 'id', atau 'en'.
         lcd : objek LCD (opsional)
             Untuk menampilkan status ke pengguna.
+        commands : list[str] (opsional)
+            Daftar perintah yang diharapkan (ya/tidak, menu, A-D). Jika diisi, dicoba
+            jalur pengenalan perintah dulu; ASR penuh hanya dipakai jika keyakinannya rendah.
+        profile : str
+            Profil target akurasi/latensi (lihat WHISPER_PROFILES di whisper_models.py),
+            menentukan tier model yang dipakai.
+        cancel : CancelToken (opsional)
+            Default token giliran saat ini; saat dibatalkan request/proses whisper
+            dihentikan dan "" dikembalikan tanpa fallback.
 
     Output:
         str : hasil transkripsi dalam bentuk teks (tanpa karakter asing).
     """
-    whisper_bin = get_resource_path("whisper.cpp", "build", "bin", "whisper-cli")
-    model_path = get_resource_path("whisper.cpp", "models", "ggml-base.bin")
-    
+    cancel = resolve(cancel)
     if lcd:
         lcd.clear()
         lcd.display_text("Memproses audio...")
 
-    print(f"Memulai transkripsi dengan whisper.cpp (bahasa: {language}) ...")
+    # Jalur perintah dulu: teks live tidak dicocokkan ke daftar perintah
+    if commands:
+        command_text = _transcribe_command(audio, language, commands, cancel)
+        if command_text:
+            return command_text
+        if cancel.cancelled:
+            return ""
 
-    try:
-        subprocess.run(
-            [
-                whisper_bin,
-                "-m", model_path,
-                "-f", audio_path,
-                "-otxt",
-                "-l", language,
-            ],
-            check=True
-        )
-    except subprocess.CalledProcessError as e:
-        print(f"[ERROR] Proses whisper.cpp gagal: {e}")
-        return ""
+    live = getattr(audio, "live", None)
+    if live is not None and live.matches("whisper", language):
+        result_text = live.result()
+        if result_text is not None:
+            print(f"Transkripsi live whisper.cpp (bahasa: {language}) selesai.")
+            return clean_transcript(result_text)
+
+    model_name, server = whisper_pool.server_for(profile, language)
+    print(f"Memulai transkripsi dengan whisper.cpp (bahasa: {language}, model: {model_name}) ...")
 
-    result_file = Path(audio_path).with_suffix(".wav.txt")
-    if not result_file.exists():
-        print("[ERROR] File hasil transkripsi tidak ditemukan.")
+    result_text = server.transcribe(audio, language=language, cancel=cancel)
+    if result_text is None and not cancel.cancelled:
+        result_text = _transcribe_cli(audio, language=language, model_name=model_name, cancel=cancel)
+    if result_text is None:
         return ""
 
-    with open(result_file, "r", encoding="utf-8") as f:
-        result_text = f.read().strip()
+    return clean_transcript(result_text)
+
+
+class WhisperLiveTranscription(LiveTranscription):
+    """
+    Transkripsi whisper.cpp per jendela bergulir selama tombol ditahan.
+    Setiap kali audio tertunda mencapai LIVE_WINDOW_SECONDS, jendela dipotong di frame
+    paling hening pada LIVE_CUT_SEARCH_SECONDS terakhirnya dan dikirim ke whisper-server.
+    Setelah tombol dilepas hanya ekor (< satu jendela) yang perlu didekode. Jika dekode
+    tertinggal (model lambat), server pekerja paralel disiapkan selagi tombol ditahan dan
+    sisa audio yang panjang dibagi ke pekerja tsb (lihat _transcribe_parallel).
+    """
+
+    engine = "whisper"
+
+    def _cut_point(self, samples, samplerate):
+        """Indeks sampel pada frame paling hening di bagian akhir jendela."""
+        frame_len = int(samplerate * LIVE_CUT_FRAME_MS / 1000)
+        search = int(samplerate * LIVE_CUT_SEARCH_SECONDS)
+        offset = max(0, len(samples) - search)
+        db = frame_energy_db(samples[offset:], samplerate, LIVE_CUT_FRAME_MS)
+        if len(db) == 0:
+            return len(samples)
+        return offset + (int(np.argmin(db)) + 1) * frame_len
+
+    def _decode(self, samples, prompt):
+        """Dekode satu potongan; "" jika hening, None jika server gagal."""
+        samplerate = self.capture.samplerate
+        speech = trim_silence(samples, samplerate)
+        if speech is None:
+            return ""
+        chunk = Recording(normalize_peak(speech), samplerate)
+        _, server = whisper_pool.server_for("live", self.language)
+        return server.transcribe(chunk, language=self.language, prompt=prompt, cancel=self.turn)
+
+    def _run(self):
+        samplerate = self.capture.samplerate
+        window = int(samplerate * LIVE_WINDOW_SECONDS)
+        backlog = int(samplerate * LIVE_BACKLOG_SECONDS)
+        model_name, _ = whisper_pool.server_for("live", self.language)
+        decoded = self._start_frame
+        parts = []
+
+        while self._wait_tick():
+            while self._current_end() - decoded >= window and not self._stopped.is_set():
+                samples = self.capture.read(decoded, decoded + window)
+                cut = self._cut_point(samples, samplerate)
+                text = self._decode(samples[:cut], " ".join(parts))
+                if text is None:
+                    return
+                decoded += cut
+                if text:
+                    parts.append(text)
+                    self._show_partial(" ".join(parts))
+                if self._current_end() - decoded >= backlog:
+                    whisper_pool.parallel_servers(model_name)  # mulai di background
 
-    cleaned_transcript = clean_transcript(result_text)
+        if self._cancelled:
+            return
+        tail = self.capture.read(decoded, self._current_end())
+        text = None
+        if len(tail) > samplerate * PARALLEL_MIN_SECONDS:
+            text = _transcribe_parallel(Recording(normalize_peak(tail), samplerate), self.language,
+                                        model_name, self.turn)
+        if text is None and len(tail):
+            text = self._decode(tail, " ".join(parts))
+            if text is None:
+                return
+        if text:
+            parts.append(text)
+        self._text = " ".join(parts)
 
-    # Bersihkan file sementara
-    os.remove(audio_path)
-    os.remove(result_file)
 
-    return cleaned_transcript
+def live_transcription(language="auto"):
+    """Buat transkripsi live whisper untuk record_once(live=...)."""
+    if not whisper_server.is_available():
+        return None
+    return WhisperLiveTranscription(language)
 
 
-def transcribe_auto(audio_path, lcd=None):
-    return transcribe_whisper(audio_path, language="auto", lcd=lcd)
+def transcribe_auto(audio, lcd=None, commands=None, profile="default", cancel=None):
+    return transcribe_whisper(audio, language="auto", lcd=lcd, commands=commands, profile=profile,
+                              cancel=cancel)
 
 
-def transcribe_id(audio_path, lcd=None):
-    return transcribe_whisper(audio_path, language="id", lcd=lcd)
+def transcribe_id(audio, lcd=None, commands=None, profile="default", cancel=None):
+    return transcribe_whisper(audio, language="id", lcd=lcd, commands=commands, profile=profile,
+                              cancel=cancel)
 
 
-def transcribe_en(audio_path, lcd=None):
-    return transcribe_whisper(audio_path, language="en", lcd=lcd)
+def transcribe_en(audio, lcd=None, commands=None, profile="default", cancel=None):
+    return transcribe_whisper(audio, language="en", lcd=lcd, commands=commands, profile=profile,
+                              cancel=cancel)
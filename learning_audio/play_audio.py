@@ -2,11 +2,13 @@ import os
 import random
 import subprocess
 import signal
-import time
-from inout.recorder import record_once, button  
+import threading
+from inout.recorder import record_once
+from inout.button_input import rec_button
+from inout.audio_output import audio_output, PRIORITY_MEDIA
 from inout.whisper_transcriber import transcribe_auto
 from inout.piper_output import speak_and_display
-from utils.response_check import is_yes, is_no, is_repeat, is_exit
+from utils.response_check import is_yes, is_no, is_repeat, is_exit, YES_NO_COMMANDS, EXIT_KEYWORDS
 from utils.path_helper import get_resource_path
 
 # Folder utama tempat audio learning
@@ -19,6 +21,9 @@ GENRES = {
     "instrumental": ["instrumental", "ins", "acoustic", "instrumen"]
 }
 
+# Perintah yang diharapkan saat memilih genre (dipakai transcriber `commands=`)
+GENRE_COMMANDS = [kw for keywords in GENRES.values() for kw in keywords] + EXIT_KEYWORDS
+
 
 def detect_genre(user_input: str):
     """Deteksi genre berdasarkan keyword."""
@@ -41,32 +46,61 @@ def list_audio_files(genre):
     ]
 
 
+def _wait_or_skip(wait_done, stop):
+    """
+    Tunggu sampai audio selesai; tekan tombol untuk skip. True jika diskip.
+    Satu Event dibangunkan oleh callback tombol maupun oleh selesainya audio,
+    jadi tidak ada polling dan tekanan tombol tidak bisa terbuang.
+    """
+    wake = threading.Event()
+    pressed = threading.Event()
+
+    def on_press():
+        pressed.set()
+        wake.set()
+
+    def watch_done():
+        wait_done()
+        wake.set()
+
+    rec_button.add_press_listener(on_press)
+    try:
+        threading.Thread(target=watch_done, daemon=True).start()
+        wake.wait()
+    finally:
+        rec_button.remove_press_listener(on_press)
+
+    if not pressed.is_set():
+        return False
+    print("[SKIP] Audio diskip.")
+    stop()
+    rec_button.wait_for_release(timeout=2)  # satu tekan = satu skip
+    return True
+
+
 def play_audio_file(file_path, lcd=None):
-    """Putar file audio dengan aplay/mpg123, bisa di-skip dengan tombol."""
+    """Putar file audio lewat output audio bersama (fallback mpg123), bisa di-skip dengan tombol."""
     filename = os.path.basename(file_path)
     title = os.path.splitext(filename)[0]
     if lcd:
         lcd.display_text(f"Now Playing:\n{title}")
     print(f"[PLAYING] {title}")
 
+    if not file_path.lower().endswith((".wav", ".mp3")):
+        return False
+
     try:
-        if file_path.lower().endswith(".wav"):
-            process = subprocess.Popen(["aplay", "-q", file_path])
-        elif file_path.lower().endswith(".mp3"):
-            process = subprocess.Popen(["mpg123", "-q", file_path])
-        else:
-            return False
+        handle = audio_output.play_file(file_path, priority=PRIORITY_MEDIA)
+        if handle is not None:
+            return _wait_or_skip(handle.wait, handle.cancel)
+
+        # libsndfile lama tidak bisa membaca mp3 → pakai mpg123
+        process = subprocess.Popen(["mpg123", "-q", file_path])
+        return _wait_or_skip(
+            process.wait,
+            lambda: process.send_signal(signal.SIGTERM),
+        )
 
-        while process.poll() is None:
-            if not button.is_pressed:  # ditekan → skip
-                print("[SKIP] Audio diskip.")
-                process.send_signal(signal.SIGTERM)
-                time.sleep(0.2)  # debounce
-                return True
-            time.sleep(0.1)
-        
-        return False  # False = selesai normal
-            
     except Exception as e:
         print(f"[ERROR] gagal memutar {file_path}: {e}")
         return False
@@ -90,7 +124,7 @@ def ask_replay(lcd=None) -> bool:
             speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
             continue
 
-        reply = (transcribe_auto(audio, lcd=lcd) or "").lower()
+        reply = (transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS) or "").lower()
         print(f"[REPLAY REPLY] {reply}")
 
         if is_repeat(reply):
@@ -129,7 +163,7 @@ def learning_audio_mode(lcd=None):
                 speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
                 continue
 
-            user_input = (transcribe_auto(audio, lcd=lcd) or "").lower()
+            user_input = (transcribe_auto(audio, lcd=lcd, commands=GENRE_COMMANDS) or "").lower()
             print(f"[GENRE INPUT] {user_input}")
 
             if is_exit(user_input):
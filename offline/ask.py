@@ -1,10 +1,10 @@
 import time
-from inout.whisper_transcriber import transcribe_auto
+from inout.whisper_transcriber import transcribe_auto, live_transcription
 from inout.recorder import record_once
-from inout.piper_output import speak_and_display
-from clients.ollama_client import OllamaClient
-from utils.response_check import is_yes, is_no
-from utils.cleaned_text import clean_for_tts
+from inout.piper_output import speak_and_display, speak_async
+from inout.llm_speech import speak_stream
+from clients.ollama_client import get_ollama_client
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 
 
 def pilih_bahasa_input(lcd=None):
@@ -87,7 +87,7 @@ def tanya_ulang_ask(lang="en", lcd=None):
             )
             continue
 
-        reply = transcribe_auto(audio, lcd=lcd).lower()
+        reply = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS).lower()
         print(f"[USER REPLY]: {reply}")
 
         if is_no(reply):
@@ -116,14 +116,14 @@ def ask_mode(lcd=None):
         1. Memilih bahasa input.
         2. Merekam dan mentranskripsi pertanyaan.
         3. Mengirim pertanyaan ke model LLM (Ollama).
-        4. Menampilkan dan membacakan jawaban.
+        4. Membacakan dan menampilkan jawaban selagi dihasilkan (per kalimat).
         5. Menanyakan apakah ingin bertanya lagi.
 
     Args:
         lcd: Objek LCD opsional untuk menampilkan teks.
     """
     lang = pilih_bahasa_input(lcd=lcd)
-    ollama = OllamaClient(model="gemma3:1b")
+    ollama = get_ollama_client("gemma3:1b")
 
     while True:
         speak_and_display(
@@ -134,7 +134,7 @@ def ask_mode(lcd=None):
 
         # Rekam pertanyaan sampai valid
         while True:
-            audio = record_once(filename="ask_question.wav", lcd=lcd)
+            audio = record_once(filename="ask_question.wav", lcd=lcd, live=live_transcription("auto"))
 
             if audio is None:
                 speak_and_display(
@@ -169,8 +169,15 @@ def ask_mode(lcd=None):
             else f"Jawablah pertanyaan berikut secara ringkas dan langsung ke intinya:\n{question}"
         )
 
-        answer = OllamaClient.generate(ollama, prompt).strip().replace("*", "")
-        answer = clean_for_tts(answer)
+        # Jawaban diucapkan kalimat demi kalimat selagi model masih menulis
+        answer = speak_stream(
+            ollama.generate_stream(prompt),
+            speak_async,
+            lang=lang,
+            lcd=lcd,
+            prefix="the answer is" if lang == "en" else "jawabannya adalah",
+            mode="scroll",
+        )
 
         if not answer:
             speak_and_display(
@@ -179,13 +186,6 @@ def ask_mode(lcd=None):
                 lcd=lcd,
             )
             continue
-
-        speak_and_display(
-            (f"the answer is {answer}" if lang == "en" else f"jawabannya adalah {answer}"),
-            lang=lang,
-            mode="scroll",
-            lcd=lcd,
-        )
         time.sleep(1)
 
         if not tanya_ulang_ask(lang=lang, lcd=lcd):
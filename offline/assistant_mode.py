@@ -1,7 +1,7 @@
 from inout.whisper_transcriber import transcribe_auto
 from inout.recorder import record_once
 from inout.piper_output import speak_and_display
-from utils.response_check import is_yes, is_no
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 from offline.grammar import grammar_mode
 from offline.ask import ask_mode
 from offline.question import question_mode
@@ -47,7 +47,7 @@ def tanya_ulang_assistant(lcd=None):
             )
             continue
 
-        reply = (transcribe_auto(audio, lcd=lcd) or "").lower()
+        reply = (transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS) or "").lower()
         print(f"[USER REPLY] {reply}")
 
         if is_no(reply):
@@ -1,8 +1,8 @@
 from inout.whisper_transcriber import transcribe_en
 from inout.recorder import record_once
 from inout.piper_output import speak_and_display
-from clients.ollama_client import OllamaClient
-from utils.response_check import is_yes, is_no
+from clients.ollama_client import get_ollama_client
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 
 
 def tanya_ulang_grammar(lcd=None):
@@ -32,7 +32,7 @@ def tanya_ulang_grammar(lcd=None):
             )
             continue
 
-        reply = transcribe_en(audio, lcd=lcd).lower()
+        reply = transcribe_en(audio, lcd=lcd, commands=YES_NO_COMMANDS).lower()
         print(f"[USER REPLY]: {reply}")
 
         if is_no(reply):
@@ -65,7 +65,7 @@ def grammar_mode(lcd=None):
     Args:
         lcd: Objek LCD opsional untuk menampilkan teks di layar.
     """
-    ollama = OllamaClient(model="gemma3:1b")
+    ollama = get_ollama_client("gemma3:1b")
 
     speak_and_display(
         "Grammar function selected.",
@@ -92,7 +92,7 @@ def grammar_mode(lcd=None):
                 )
                 continue
 
-            sentence = transcribe_en(audio, lcd=lcd).strip()
+            sentence = transcribe_en(audio, lcd=lcd, profile="grammar").strip()
             if not sentence:
                 speak_and_display(
                     "Sorry, I didn't catch that. Please try again.",
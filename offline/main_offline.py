@@ -2,10 +2,12 @@
 from inout.piper_output import speak_and_display
 from inout.recorder import record_once
 from inout.whisper_transcriber import transcribe_auto
-from utils.response_check import is_yes, is_no, is_help, is_exit
+from utils.response_check import is_yes, is_no, is_help, is_exit, YES_NO_COMMANDS
 from offline.translator_mode import translator_mode
 from offline.vocabulary_mode import vocabulary_mode
 from offline.assistant_mode import assistant_mode
+from clients.ollama_residency import ollama_residency
+from clients.ollama_server import ollama_server
 
 
 MODE_KEYWORDS = {
@@ -32,7 +34,7 @@ def tetap_di_offline_mode(lcd=None):
             speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
             continue
 
-        reply_raw = transcribe_auto(audio, lcd=lcd) or ""
+        reply_raw = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS) or ""
         reply = reply_raw.strip().lower()
         print(f"[USER REPLY] {reply}")
 
@@ -62,6 +64,10 @@ def offline_mode(lcd=None):
     Main function to display the offline mode menu and handle mode selection.
     Supports Translator, Vocabulary, and Assistant modes.
     """
+    # Server + model LLM dinyalakan selagi welcome diputar; jika hanya translator yang
+    # dipakai, server dimatikan lagi setelah menganggur (lihat clients/ollama_server.py)
+    ollama_server.start(wait=False)
+    ollama_residency.warm_up()
     speak_and_display("Welcome to offline mode POCALA!", lang="en", lcd=lcd)
 
     while True:
@@ -104,9 +110,12 @@ def offline_mode(lcd=None):
             if any(k in command for k in MODE_KEYWORDS["translator"]):
                 translator_mode(lcd=lcd)
             elif any(k in command for k in MODE_KEYWORDS["vocabulary"]):
-                vocabulary_mode(lcd=lcd)
+                # Model LLM dipin selama mode yang memakainya aktif
+                with ollama_residency.pinned():
+                    vocabulary_mode(lcd=lcd)
             elif any(k in command for k in MODE_KEYWORDS["assistant"]):
-                assistant_mode(lcd=lcd)
+                with ollama_residency.pinned():
+                    assistant_mode(lcd=lcd)
             else:
                 speak_and_display(
                     "Unknown mode. Please try again!",
@@ -1,12 +1,12 @@
 import re
-import time
-from inout.whisper_transcriber import transcribe_auto, transcribe_en, transcribe_id
+from inout.whisper_transcriber import transcribe_auto, transcribe_en, transcribe_id, live_transcription, stop_parallel_transcription
 from inout.recorder import record_once
-from inout.piper_output import speak_and_display
-from clients.ollama_client import OllamaClient
+from inout.piper_output import speak_and_display, speak_async
+from inout.llm_speech import speak_stream
+from clients.ollama_client import get_ollama_client
 from utils.response_check import is_yes, is_no, is_exit, is_clear_context
 from utils.ollama_context_builder import ChatContext
-from utils.cleaned_text import hapus_emoji_dan_ekspresi, clean_for_tts
+from utils.cleaned_text import hapus_emoji_dan_ekspresi
 
 
 def pilih_bahasa_input(lcd=None) -> str:
@@ -47,7 +47,7 @@ def speaking_mode(lcd=None):
         lang=lang, lcd=lcd
     )
 
-    ollama = OllamaClient(model="gemma3:1b")
+    ollama = get_ollama_client("gemma3:1b")
     system_prompt = (
         "You are pocala, a friendly English-speaking conversation partner. "
         "Keep the dialogue natural, helpful, and concise."
@@ -67,7 +67,7 @@ def speaking_mode(lcd=None):
     while True:
         # Ambil input suara
         while True:
-            audio = record_once(filename="speaking_input.wav", lcd=lcd)
+            audio = record_once(filename="speaking_input.wav", lcd=lcd, live=live_transcription(lang))
             if not audio:
                 speak_and_display(
                     "No audio detected. Please try again." if lang == "en"
@@ -115,32 +115,18 @@ def speaking_mode(lcd=None):
             lcd.flash_message(f"User: {cleaned_input}", duration=2)
             lcd.display_text("Thinking..." if lang == "en" else "Berpikir...")
 
-        # Retry maksimal 3x jika model tidak membalas
-        response = ""
-        for attempt in range(1, 4):
-            try:
-                response = ollama.chat(cleaned_input, context=context)
-            except Exception as e:
-                print(f"[ERROR] Ollama chat failed: {e}")
-                response = ""
+        # Retry/backoff sudah ditangani OllamaClient (termasuk jawaban kosong), yang juga
+        # menyimpan jawaban ke `context` (atau menghapus lagi pesan user jika gagal/dipotong).
+        # Respon diucapkan per kalimat selagi dihasilkan; emoji, tanda kurung, dan * dibuang.
+        response = speak_stream(
+            ollama.chat_stream(cleaned_input, context=context),
+            speak_async,
+            lang=lang,
+            lcd=lcd,
+            mode="scroll",
+            scroll_speed=0.06,
+        )
 
-            # Bersihkan respon dari emoji, tanda kurung, dan simbol *
-            response = hapus_emoji_dan_ekspresi(response.replace("*", "")).strip()
-            response = clean_for_tts(response)
-
-            if response:
-                context.add_assistant_message(response)
-                break
-
-            print(f"[WARNING] Model tidak merespon, percobaan {attempt}/3")
-            if lcd:
-                lcd.flash_message(
-                    f"Retry {attempt}/3" if lang == "en" else f"Mencoba ulang {attempt}/3",
-                    duration=2
-                )
-            if attempt < 3:
-                time.sleep(1)
-                
         if not response:
             speak_and_display(
                 "I couldn't get a response from the model." if lang == "en"
@@ -149,8 +135,6 @@ def speaking_mode(lcd=None):
             )
             continue
 
-        speak_and_display(response, lang=lang, mode="scroll", lcd=lcd, scroll_speed=0.06)
-
         interaction_count += 1
         if interaction_count % 5 == 0:
             speak_and_display(
@@ -168,3 +152,6 @@ def speaking_mode(lcd=None):
             )
             if lcd:
                 lcd.display_text("Listening to input..." if lang == "en" else "Mendengarkan...")
+
+    # Server pekerja paralel (jika live sempat tertinggal) tidak dibutuhkan lagi di luar mode ini
+    stop_parallel_transcription()
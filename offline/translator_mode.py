@@ -1,9 +1,20 @@
 from offline.translator_init import Translator
-from inout.whisper_transcriber import transcribe_auto
+from inout.whisper_transcriber import transcribe_auto, live_transcription, stop_parallel_transcription
 from inout.recorder import record_once
-from inout.piper_output import speak_and_display
+from inout.piper_output import speak_and_display, speak_async, prefetch_speech
 from utils.response_check import is_exit
 
+TALK_AGAIN_PROMPT = "You can talk again!"
+EXIT_REMINDER_PROMPT = "You can talk again, or say 'exit' to leave translator mode."
+EXIT_REMINDER_EVERY = 5  # pengingat keluar setiap 5 interaksi
+
+
+def next_prompt(interaction_count):
+    """Prompt yang diucapkan setelah terjemahan ke-`interaction_count`."""
+    if interaction_count % EXIT_REMINDER_EVERY == 0:
+        return EXIT_REMINDER_PROMPT
+    return TALK_AGAIN_PROMPT
+
 
 def translator_mode(lcd=None):
     """
@@ -21,7 +32,7 @@ def translator_mode(lcd=None):
 
     while True:
         # Rekam input suara pengguna
-        audio = record_once(filename="translator_input.wav", lcd=lcd)
+        audio = record_once(filename="translator_input.wav", lcd=lcd, live=live_transcription("auto"))
 
         if audio is None:
             speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
@@ -50,7 +61,11 @@ def translator_mode(lcd=None):
             lang, target_lang, _ = translator.detect_direction(text)
 
             # Tampilkan hasil terjemahan dengan mode scroll agar panjang bisa terbaca
-            speak_and_display(result, lang=target_lang, mode="scroll", lcd=lcd)
+            handle = speak_async(result, lang=target_lang, mode="scroll", lcd=lcd)
+            # Prompt berikutnya sudah pasti: disintesis selagi hasil terjemahan diputar
+            prefetch_speech(next_prompt(interaction_count + 1), lang="en")
+            if handle:
+                handle.wait()
 
         except Exception as e:
             # Tangani error jika model gagal menerjemahkan
@@ -64,15 +79,14 @@ def translator_mode(lcd=None):
         interaction_count += 1
 
         # Informasi ke pengguna bahwa sistem siap input lagi
-        if interaction_count % 5 == 0:
-            # Pengingat keluar setiap 5 interaksi
-            speak_and_display(
-                "You can talk again, or say 'exit' to leave translator mode.",
-                lang="en", lcd=lcd
-            )
+        if next_prompt(interaction_count) == EXIT_REMINDER_PROMPT:
+            speak_and_display(EXIT_REMINDER_PROMPT, lang="en", lcd=lcd)
             if lcd:
                 lcd.display_text("say 'exit' to quit")
         else:
-            speak_and_display("You can talk again!", lang="en", lcd=None)
+            speak_and_display(TALK_AGAIN_PROMPT, lang="en", lcd=None)
             if lcd:
                 lcd.display_text("Listening to input...")
+
+    # Server pekerja paralel (jika live sempat tertinggal) tidak dibutuhkan lagi di luar mode ini
+    stop_parallel_transcription()
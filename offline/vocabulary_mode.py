@@ -1,11 +1,11 @@
 from inout.whisper_transcriber import transcribe_auto, transcribe_id, transcribe_en
 from inout.recorder import record_once
-from inout.piper_output import speak_and_display
+from inout.piper_output import speak_and_display, speak_async, prefetch_speech
 from transformers import MarianTokenizer, MarianMTModel
-from clients.ollama_client import OllamaClient
+from clients.ollama_client import get_ollama_client
 from utils.extract_word import extract_vocab_word
 from utils.path_helper import get_resource_path
-from utils.response_check import is_yes, is_no
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 
 
 class VocabTranslator:
@@ -142,6 +142,10 @@ def ambil_definisi(word, lang, ollama):
 
 
 
+def another_word_prompt(lang):
+    return "Ingin coba kata lain?" if lang == "id" else "Do you want to try another word?"
+
+
 def tampilkan_hasil(word, translated, ipa, definition, example, lang, lcd=None):
     """
     Menampilkan hasil akhir kepada pengguna: terjemahan, IPA, definisi, dan contoh.
@@ -160,28 +164,29 @@ def tampilkan_hasil(word, translated, ipa, definition, example, lang, lcd=None):
         if lcd:
             lcd.display_text(f"Phonetic: {ipa}")
         speak_and_display(f"Phonetic: {translated}", lang="en", lcd=None)
-        speak_and_display(definition, lang="id", mode="scroll", lcd=lcd)
+        handle = speak_async(definition, lang="id", mode="scroll", lcd=lcd)
         if example:
-            speak_and_display(f"Example of use: {example}", lang="en", mode="scroll", lcd=lcd)
+            handle = speak_async(f"Example of use: {example}", lang="en", mode="scroll", lcd=lcd)
     else:
         if lcd:
             lcd.display_text(f"Phonetic: {ipa}")
         speak_and_display(f"Phonetic: {word}", lang="en", lcd=None)
         speak_and_display(f"Terjemahan ke Indonesia: {translated}", lang="id", lcd=lcd)
-        speak_and_display(definition, lang="id", mode="scroll", lcd=lcd)
+        handle = speak_async(definition, lang="id", mode="scroll", lcd=lcd)
         if example:
-            speak_and_display(f"Example of use: {example}", lang="en", mode="scroll", lcd=lcd)
+            handle = speak_async(f"Example of use: {example}", lang="en", mode="scroll", lcd=lcd)
+
+    # Pertanyaan berikutnya hampir pasti "coba kata lain?": disintesis selagi hasil diputar
+    prefetch_speech(another_word_prompt(lang), lang=lang)
+    if handle:
+        handle.wait()
 
 
 def tanya_ulang(lang="id", lcd=None):
     """
     Menanyakan apakah ingin mengulang sesi dengan kata lain.
     """
-    speak_and_display(
-        "Ingin coba kata lain?" if lang == "id"
-        else "Do you want to try another word?",
-        lang=lang, lcd=lcd
-    )
+    speak_and_display(another_word_prompt(lang), lang=lang, lcd=lcd)
     while True:
         audio = record_once(filename="ask_again.wav", lcd=lcd)
 
@@ -193,7 +198,7 @@ def tanya_ulang(lang="id", lcd=None):
             )
             continue
 
-        reply = transcribe_auto(audio, lcd=lcd).lower()
+        reply = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS).lower()
         print(f"[USER REPLY] {reply}")
 
         if is_no(reply):
@@ -220,7 +225,7 @@ def vocabulary_mode(lcd=None):
     """
     lang = pilih_bahasa_input(lcd=lcd)
     translator, g2p_en = load_model_dan_tools(lang, lcd=lcd)
-    ollama = OllamaClient(model="gemma3:1b")
+    ollama = get_ollama_client("gemma3:1b")
 
     while True:
         word = ambil_kata(lang, lcd=lcd)
@@ -1,11 +1,11 @@
 # Mode untuk tanya jawab interaktif menggunakan Google Cloud Platform.
 import time
-from clients.gcp_client import gcp_gemini_generate, gemini_model
-from inout.gcp_transcriber import transcribe_auto
+from clients.gcp_client import gcp_gemini_generate_stream, gemini_model
+from inout.gcp_transcriber import transcribe_auto, live_transcription
 from inout.recorder import record_once
-from inout.gcp_output import speak_and_display
-from utils.response_check import is_yes, is_no
-from utils.cleaned_text import clean_for_tts
+from inout.gcp_output import speak_and_display, speak_async
+from inout.llm_speech import speak_stream
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 
 
 def pilih_bahasa_input(lcd=None):
@@ -58,7 +58,7 @@ def tanya_ulang_ask(lang="en", lcd=None):
         if not audio:
             continue
 
-        reply = transcribe_auto(audio, lcd=lcd).lower()
+        reply = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS).lower()
         print(f"[USER REPLY]: {reply}")
 
         if is_no(reply):
@@ -104,7 +104,7 @@ def ask_mode(lcd=None):
 
         # Rekam pertanyaan sampai valid
         while True:
-            audio = record_once(filename="ask_question.wav", lcd=lcd)
+            audio = record_once(filename="ask_question.wav", lcd=lcd, live=live_transcription("auto"))
             if not audio:
                 continue
 
@@ -129,23 +129,22 @@ def ask_mode(lcd=None):
                  f"dan langsung ke intinya:\n{question}"
         )
 
-        answer = gcp_gemini_generate(prompt_to_gemini).strip().replace("*", "")
-        answer = clean_for_tts(answer)
+        # Tampilkan dan bacakan jawaban per kalimat selagi Gemini masih menulis
+        answer = speak_stream(
+            gcp_gemini_generate_stream(prompt_to_gemini),
+            speak_async,
+            lang=lang, lcd=lcd,
+            prefix="the answer is" if lang == "en" else "jawabannya adalah",
+            mode="scroll",
+        )
 
         if not answer:
-            answer = (
+            speak_and_display(
                 "Sorry, I can't answer that right now."
                 if lang == "en"
-                else "Maaf, tidak bisa menjawab saat ini."
+                else "Maaf, tidak bisa menjawab saat ini.",
+                lang=lang, lcd=lcd
             )
-
-        # Tampilkan dan bacakan jawaban
-        speak_and_display(
-            f"the answer is {answer}"
-            if lang == "en"
-            else f"jawabannya adalah {answer}",
-            lang=lang, mode="scroll", lcd=lcd
-        )
         time.sleep(1)
 
         # Tanyakan apakah ingin bertanya lagi
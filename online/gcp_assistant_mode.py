@@ -1,7 +1,7 @@
 from inout.gcp_transcriber import transcribe_auto
 from inout.recorder import record_once
 from inout.gcp_output import speak_and_display
-from utils.response_check import is_yes, is_no
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 from online.gcp_grammar import grammar_mode
 from online.gcp_ask import ask_mode
 from online.gcp_question import question_mode
@@ -47,7 +47,7 @@ def tanya_ulang_assistant(lcd=None):
             )
             continue
 
-        reply = (transcribe_auto(audio, lcd=lcd) or "").lower()
+        reply = (transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS) or "").lower()
         print(f"[USER REPLY] {reply}")
 
         if is_no(reply):
@@ -3,7 +3,7 @@ from inout.gcp_transcriber import transcribe_en, transcribe_auto
 from clients.gcp_client import gcp_gemini_generate, gemini_model
 from inout.recorder import record_once
 from inout.gcp_output import speak_and_display
-from utils.response_check import is_yes, is_no
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 
 
 def tanya_ulang_grammar(lcd=None):
@@ -17,7 +17,7 @@ def tanya_ulang_grammar(lcd=None):
         if not audio:
             continue
 
-        reply = transcribe_auto(audio, lcd=lcd).lower()
+        reply = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS).lower()
         print(f"[USER REPLY]: {reply}")
 
         if is_no(reply):
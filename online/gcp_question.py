@@ -3,16 +3,23 @@ import json
 import random
 import re
 import string
-import time
 from clients.gcp_client import gcp_gemini_generate_chat
 from inout.gcp_transcriber import transcribe_en, transcribe_auto
-from inout.gcp_output import speak_and_display
+from inout.gcp_output import speak_and_display, speak_async
 from inout.recorder import record_once
 from utils.extract_word import extract_topic_and_level
 from utils.gcp_context_builder import GcpChatContext
 from utils.path_helper import get_resource_path
-from utils.response_check import is_yes, is_no
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 from utils.cleaned_text import clean_for_tts
+from utils.question_schema import (
+    QuestionItem, Evaluation, question_schema, evaluation_schema, gemini_schema,
+    ask_with_schema, repair_prompt,
+)
+
+
+# Jawaban pilihan ganda yang diharapkan (dipakai transcriber `commands=`)
+MC_ANSWER_COMMANDS = ["A", "B", "C", "D"]
 
 
 def normalize_answer(user_text, mode="mc"):
@@ -42,24 +49,49 @@ def normalize_answer(user_text, mode="mc"):
     return cleaned_text
 
 
-def parse_question_and_answer(model_output):
-    """Memisahkan teks model menjadi pertanyaan, opsi, dan jawaban benar."""
-    lines = [line.strip() for line in model_output.strip().splitlines() if line.strip()]
-    question_lines = []
-    options = []
-    correct_answer = None
+def _user_message(text):
+    return {"role": "user", "parts": [{"text": text}]}
 
-    for line in lines:
-        lower_line = line.lower()
-        if lower_line.startswith("key answer") or lower_line.startswith("correct answer"):
-            correct_answer = line.split(":", 1)[-1].strip()
-        elif re.match(r"^[A-D]\)", line, re.IGNORECASE):
-            options.append(line)
-        else:
-            question_lines.append(line)
 
-    question_text = "\n".join(question_lines).strip()
-    return question_text, options, correct_answer
+def _ask_json(messages, schema, parse, label, log_tag):
+    """
+    Kirim `messages` ke Gemini dengan response_schema, lalu validasi dengan `parse`.
+    Jika melanggar schema, jawaban salah + permintaan perbaikan ikut dikirim (tidak
+    disimpan ke context). Returns objek hasil parse atau None.
+    """
+    response_schema = gemini_schema(schema)
+
+    def ask(invalid):
+        request = list(messages)
+        if invalid:
+            raw, error = invalid
+            request += [
+                {"role": "model", "parts": [{"text": raw}]},
+                _user_message(repair_prompt(error)),
+            ]
+        output = gcp_gemini_generate_chat(request, response_schema=response_schema)
+        print(f"[{log_tag}]:\n{output}")
+        return output
+
+    return ask_with_schema(ask, parse, label=label)
+
+
+def generate_question(context, prompt, question_type):
+    """Satu soal baru (soal-soal sebelumnya di `context` ikut dikirim). Returns QuestionItem atau None."""
+    return _ask_json(
+        context.get_context() + [_user_message(prompt)],
+        question_schema(question_type), lambda raw: QuestionItem.from_json(raw, question_type),
+        "Soal", "RAW MODEL OUTPUT",
+    )
+
+
+def evaluate_answer(eval_prompt, question_type):
+    """Nilai jawaban pengguna (tanpa context). Returns Evaluation atau None."""
+    return _ask_json(
+        [_user_message(eval_prompt)],
+        evaluation_schema(question_type), lambda raw: Evaluation.from_json(raw, question_type),
+        "Penilaian", "EVALUATION FEEDBACK",
+    )
 
 
 def tanya_lanjut_question(lcd=None):
@@ -74,7 +106,7 @@ def tanya_lanjut_question(lcd=None):
         if audio is None:
             speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
             continue
-        reply = transcribe_auto(audio, lcd=lcd).lower()
+        reply = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS).lower()
         print(f"[USER REPLY]: {reply}")
         if is_no(reply) or any(word in reply for word in ["tidak", "enggak", "ga", "gak"]):
             speak_and_display("Exiting question mode. Goodbye!", lang="en", lcd=lcd)
@@ -132,8 +164,6 @@ def question_mode(lcd=None):
     level = None 
     question_type = None
     question_number = 1
-    last_question = None
-    last_correct_answer = None
     previous_questions = []
 
     while True:
@@ -149,7 +179,7 @@ def question_mode(lcd=None):
                     )
                     continue
 
-                reply = transcribe_auto(audio, lcd=lcd).lower()
+                reply = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS).lower()
 
                 if is_yes(reply):
                     speak_and_display(
@@ -242,12 +272,11 @@ def question_mode(lcd=None):
                 f"Generate exactly ONE English multiple-choice question about the topic '{topic}'.\n"
                 f"{guides}"
                 f"Avoid repeating any of the previous questions mentioned in chat history.\n"
-                f"Include:\n"
-                f"- Question text\n"
-                f"- Four answer choices labeled A), B), C), D)\n"
-                f"- Give the correct answer letter and text, starting with 'Correct Answer:'\n"
-                f"Do not give explanation.\n"
-                f"Output must contain only ONE question, not a list."
+                f"Reply in JSON with:\n"
+                f"- question: the question text only\n"
+                f"- options: four answer choices in order A, B, C, D, without letter labels\n"
+                f"- answer: the letter of the correct choice\n"
+                f"- rationale: one short sentence explaining the correct answer"
             )
         else:
             prompt = (
@@ -255,89 +284,81 @@ def question_mode(lcd=None):
                 f"Generate exactly ONE English short-answer question about the topic '{topic}'.\n"
                 f"{guides}"
                 f"Avoid repeating any of the previous questions mentioned in chat history.\n"
-                f"Include:\n"
-                f"- Question text without options\n"
-                f"- Give the correct answer, starting with 'Correct Answer:'\n"
-                f"Do not give explanation.\n"
-                f"Output must contain only ONE question, not a list."
+                f"Reply in JSON with:\n"
+                f"- question: the question text without options\n"
+                f"- answer: the correct answer\n"
+                f"- rationale: one short sentence explaining the correct answer"
             )
 
-        model_output = gcp_gemini_generate_chat(prompt, context=context).replace("*", "")
-        print(f"[RAW MODEL OUTPUT]:\n{model_output}")
-
-        question_text, options, last_correct_answer = parse_question_and_answer(model_output)
-        last_question = question_text
+        item = generate_question(context, prompt, question_type)
+        if item is None:
+            speak_and_display("Sorry, I couldn't create a question.", lang="en", lcd=lcd)
+        else:
+            previous_questions.append(item.question.splitlines()[0].strip())
 
-        extracted_question_line = question_text.splitlines()[0] if question_text else ""
-        previous_questions.append(extracted_question_line.strip())
+            # Diantrekan sekaligus (tanpa jeda); record_once menunggu antrean selesai
+            speak_async(clean_for_tts(item.question), lang="en", lcd=lcd)
+            for opt in item.option_lines():
+                speak_async(clean_for_tts(opt), lang="en", lcd=lcd)
 
-        speak_and_display(clean_for_tts(question_text), lang="en", lcd=lcd)
-        time.sleep(0.5)
+            speak_async("Please say your answer.", lang="en", lcd=lcd)
+            while True:
+                audio = record_once("answer.wav", lcd=lcd)
+                if audio is None:
+                    speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
+                    continue
+                commands = MC_ANSWER_COMMANDS if question_type == "multiple choice" else None
+                raw_answer = transcribe_auto(audio, lcd=lcd, commands=commands).strip()
+                if question_type == "multiple choice":
+                    answer = normalize_answer(raw_answer, mode="mc")
+                else:
+                    answer = normalize_answer(raw_answer, mode="short")
+                    answer = answer.capitalize()
+                if answer:
+                    break
+                speak_and_display("Sorry, I didn't catch your answer. Please try again.", lang="en", lcd=lcd)
 
-        for opt in options:
-            speak_and_display(clean_for_tts(opt), lang="en", lcd=lcd)
-            time.sleep(0.3)
+            if lcd:
+                lcd.flash_message(f"Your Answer {answer}", duration=2)
 
-        speak_and_display("Please say your answer.", lang="en", lcd=lcd)
-        while True:
-            audio = record_once("answer.wav", lcd=lcd)
-            if audio is None:
-                speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
-                continue
-            raw_answer = transcribe_auto(audio, lcd=lcd).strip()
             if question_type == "multiple choice":
-                answer = normalize_answer(raw_answer, mode="mc")
+                eval_prompt = (
+                    "You are an English grammar teacher.\n"
+                    f"Level: {level if level else 'unspecified'}\n"
+                    f"Question:\n{item.question}\n"
+                    + "\n".join(item.option_lines()) + "\n\n"
+                    f"Correct Answer: {item.answer_text()}\n"
+                    f"Explanation: {item.rationale}\n"
+                    f"User Answer: {answer}\n\n"
+                    "Evaluate if the user's answer is correct or incorrect\n"
+                    "Respond in Indonesian, in JSON with:\n"
+                    "- verdict: benar or salah\n"
+                    "- reason: penjelasan singkat dan jawaban yang benar"
+                )
             else:
-                answer = normalize_answer(raw_answer, mode="short")
-                answer = answer.capitalize()
-            if answer:
-                break
-            speak_and_display("Sorry, I didn't catch your answer. Please try again.", lang="en", lcd=lcd)
-
-        if lcd:
-            lcd.flash_message(f"Your Answer {answer}", duration=2)
-
-        if question_type == "multiple choice":
-            eval_prompt = (
-                "You are an English grammar teacher.\n"
-                f"Level: {level if level else 'unspecified'}\n"
-                f"Question:\n{last_question}\n"
-                + "\n".join(options) + "\n\n"
-                f"Correct Answer: {last_correct_answer}\n"
-                f"User Answer: {answer}\n\n"
-                "Evaluate if the user's answer is correct or incorrect\n"
-                "Respond in Indonesian with:\n"
-                "[Penilaian] <singkat benar/salah>\n"
-                "[Alasan] <penjelasan singkat dan jawaban yang benar>"
-            )
-        else:
-            eval_prompt = (
-                "You are an English grammar teacher.\n"
-                f"Level: {level if level else 'unspecified'}\n"
-                f"Question:\n{last_question}\n\n"
-                f"Correct Answer: {last_correct_answer}\n"
-                f"User Answer: {answer}\n\n"
-                "Evaluate if the user's answer has the SAME MEANING as the correct answer, "
-                "even if the wording is different.\n"
-                "Do not mark incorrect if the answer is a synonym, paraphrase, or "
-                "slightly different wording with the same meaning.\n"
-                "Respond in Indonesian with:\n"
-                "[Penilaian] <singkat benar/hampir benar/salah>\n"
-                "[Alasan] <penjelasan singkat dan jawaban yang benar>"
-            )
-
-        feedback = gcp_gemini_generate_chat([{"role": "user", "parts": [{"text": eval_prompt}]}]).replace("*", "")
-        print(f"[EVALUATION FEEDBACK]: {feedback}")
-        
-        cleaned_feedback = clean_for_tts(feedback)
-        
-        if "[Penilaian]" in feedback and "[Alasan]" in feedback:
-            penilaian, alasan = cleaned_feedback.split("[Alasan]", 1)
-            speak_and_display(clean_for_tts(penilaian.replace("[Penilaian]", "").strip()), lang="id", lcd=lcd)
-            speak_and_display(clean_for_tts(alasan.strip()), lang="id", mode="scroll", lcd=lcd)
-        else:
-            speak_and_display(clean_for_tts(cleaned_feedback), lang="id", mode="scroll", lcd=lcd)
-
+                eval_prompt = (
+                    "You are an English grammar teacher.\n"
+                    f"Level: {level if level else 'unspecified'}\n"
+                    f"Question:\n{item.question}\n\n"
+                    f"Correct Answer: {item.answer}\n"
+                    f"Explanation: {item.rationale}\n"
+                    f"User Answer: {answer}\n\n"
+                    "Evaluate if the user's answer has the SAME MEANING as the correct answer, "
+                    "even if the wording is different.\n"
+                    "Do not mark incorrect if the answer is a synonym, paraphrase, or "
+                    "slightly different wording with the same meaning.\n"
+                    "Respond in Indonesian, in JSON with:\n"
+                    "- verdict: benar, hampir benar, or salah\n"
+                    "- reason: penjelasan singkat dan jawaban yang benar"
+                )
+
+            evaluation = evaluate_answer(eval_prompt, question_type)
+            if evaluation is None:
+                evaluation = item.local_evaluation(answer)
+
+            if evaluation.verdict:
+                speak_and_display(evaluation.verdict.capitalize(), lang="id", lcd=lcd)
+            speak_and_display(clean_for_tts(evaluation.reason), lang="id", mode="scroll", lcd=lcd)
         keputusan = tanya_lanjut_question(lcd=lcd)
         if keputusan == "exit":
             break
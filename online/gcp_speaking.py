@@ -1,12 +1,12 @@
 # Mode percakapan interaktif (speaking partner) menggunakan Google Cloud Platform.
-from inout.gcp_transcriber import transcribe_auto, transcribe_en, transcribe_id
-from clients.gcp_client import gcp_gemini_generate_chat, gemini_model
+from inout.gcp_transcriber import transcribe_auto, transcribe_en, transcribe_id, live_transcription
+from clients.gcp_client import gcp_gemini_generate_chat_stream, gemini_model
 from utils.gcp_context_builder import GcpChatContext
 from inout.recorder import record_once
-from inout.gcp_output import speak_and_display
+from inout.gcp_output import speak_and_display, speak_async
+from inout.llm_speech import speak_stream
 from utils.response_check import is_exit, is_clear_context
-from utils.cleaned_text import hapus_emoji_dan_ekspresi, clean_for_tts
-import time
+from utils.cleaned_text import hapus_emoji_dan_ekspresi
 
 
 def pilih_bahasa_input(lcd=None):
@@ -82,7 +82,7 @@ def speaking_mode(lcd=None):
     while True:
         # Loop hingga mendapat input suara yang valid
         while True:
-            audio = record_once(filename="speaking_input.wav", lcd=lcd)
+            audio = record_once(filename="speaking_input.wav", lcd=lcd, live=live_transcription(lang))
 
             if audio is None:
                 speak_and_display(
@@ -142,32 +142,19 @@ def speaking_mode(lcd=None):
             lcd.flash_message(f"User: {cleaned_input}", duration=2)
             lcd.display_text("Thinking..." if lang == "en" else "Berpikir...")
 
-        # Retry maksimal 3x jika model tidak membalas
-        response = ""
-        for attempt in range(1, 4):
-            try:
-                # Kirim ke Gemini dengan seluruh riwayat percakapan
-                response = gcp_gemini_generate_chat(context.get_context())
-            except Exception as e:
-                print(f"[ERROR] Gemini chat failed: {e}")
-                response = ""
-
-            # Bersihkan respon dari emoji, tanda kurung, dan simbol *
-            response = hapus_emoji_dan_ekspresi(response.replace("*", "")).strip()
-            response = clean_for_tts(response)
-
-            if response:
-                context.add_assistant_message(response)
-                break
-
-            print(f"[WARNING] Model tidak merespon, percobaan {attempt}/3")
-            if lcd:
-                lcd.flash_message(
-                    f"Retry {attempt}/3" if lang == "en" else f"Mencoba ulang {attempt}/3",
-                    duration=2
-                )
-            if attempt < 3:
-                time.sleep(1)
+        # Kirim ke Gemini dengan seluruh riwayat percakapan; respon diucapkan per kalimat
+        # selagi dihasilkan (emoji, tanda kurung, dan * dibuang). Retry dilakukan di client.
+        response = speak_stream(
+            gcp_gemini_generate_chat_stream(context.get_context()),
+            speak_async,
+            lang=lang, lcd=lcd, mode="scroll", scroll_speed=0.08,
+        )
+        if response:
+            context.add_assistant_message(response)
+        elif context.last_user_message() == cleaned_input:
+            # Gagal/dibatalkan: pesan user dihapus lagi agar giliran berikutnya
+            # tidak mengirim dua pesan user berturut-turut
+            context.messages.pop()
 
         # Jika tetap tidak ada respons
         if not response:
@@ -178,9 +165,6 @@ def speaking_mode(lcd=None):
             )
             continue
 
-        # Tampilkan dan bacakan respons (tetap flow asli)
-        speak_and_display(response, lang=lang, mode="scroll", lcd=lcd, scroll_speed=0.08)
-
         # Hitung interaksi, beri pesan setiap kelipatan 5
         interaction_count += 1
         if interaction_count % 5 == 0:
@@ -1,10 +1,21 @@
 from online.gcp_translator_init import GcpTranslator
 from offline.translator_init import Translator  # fallback offline
-from inout.gcp_transcriber import transcribe_auto
+from inout.gcp_transcriber import transcribe_auto, live_transcription
 from inout.recorder import record_once
-from inout.gcp_output import speak_and_display
+from inout.gcp_output import speak_and_display, speak_async, prefetch_speech
 from utils.response_check import is_exit
 
+TALK_AGAIN_PROMPT = "You can talk again!"
+EXIT_REMINDER_PROMPT = "You can talk again, or say 'exit' to leave translator mode."
+EXIT_REMINDER_EVERY = 5  # pengingat keluar setiap 5 interaksi
+
+
+def next_prompt(interaction_count):
+    """Prompt yang diucapkan setelah terjemahan ke-`interaction_count`."""
+    if interaction_count % EXIT_REMINDER_EVERY == 0:
+        return EXIT_REMINDER_PROMPT
+    return TALK_AGAIN_PROMPT
+
 
 def gcp_translator_mode(lcd=None):
     """
@@ -23,7 +34,7 @@ def gcp_translator_mode(lcd=None):
 
     while True:
         # Rekam input suara
-        audio_file = record_once(filename="gcp_translate_input.wav", lcd=lcd)
+        audio_file = record_once(filename="gcp_translate_input.wav", lcd=lcd, live=live_transcription("auto"))
         if not audio_file:
             speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
             continue
@@ -57,19 +68,20 @@ def gcp_translator_mode(lcd=None):
             target_lang = "en" if offline_translator.detect_direction(user_text)[0] == "id-en" else "id"
 
         # Tampilkan hasil terjemahan
-        speak_and_display(translated_text, lang=target_lang, mode="scroll", lcd=lcd)
+        handle = speak_async(translated_text, lang=target_lang, mode="scroll", lcd=lcd)
+        # Prompt berikutnya sudah pasti: disintesis selagi hasil terjemahan diputar
+        prefetch_speech(next_prompt(interaction_count + 1), lang="en")
+        if handle:
+            handle.wait()
 
         interaction_count += 1
 
         # Pengingat setiap 5 interaksi
-        if interaction_count % 5 == 0:
-            speak_and_display(
-                "You can talk again, or say 'exit' to leave translator mode.",
-                lang="en", lcd=lcd
-            )
+        if next_prompt(interaction_count) == EXIT_REMINDER_PROMPT:
+            speak_and_display(EXIT_REMINDER_PROMPT, lang="en", lcd=lcd)
             if lcd:
                 lcd.display_text("say 'exit' to quit")
         else:
-            speak_and_display("You can talk again!", lang="en", lcd=None)
+            speak_and_display(TALK_AGAIN_PROMPT, lang="en", lcd=None)
             if lcd:
                 lcd.display_text("Listening to input...")
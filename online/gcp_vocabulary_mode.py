@@ -3,8 +3,8 @@ import eng_to_ipa
 from clients.gcp_client import gcp_translate_text, gcp_gemini_generate, gemini_model
 from inout.gcp_transcriber import transcribe_id, transcribe_en, transcribe_auto
 from inout.recorder import record_once
-from inout.gcp_output import speak_and_display
-from utils.response_check import is_yes, is_no
+from inout.gcp_output import speak_and_display, speak_async, prefetch_speech
+from utils.response_check import is_yes, is_no, YES_NO_COMMANDS
 from utils.extract_word import extract_vocab_word
 
 
@@ -163,6 +163,10 @@ def ambil_definisi_gcp(word, lang):
     return ipa, definition, example_en, example_id
 
 
+def another_word_prompt(lang):
+    return "Ingin coba kata lain?" if lang == "id" else "Do you want to try another word?"
+
+
 def tampilkan_hasil(
     word, translated, ipa, definition, example_en, example_id, lang, lcd=None
 ):
@@ -177,14 +181,14 @@ def tampilkan_hasil(
         if lcd:
             lcd.display_text(f"Phonetic: {ipa}")
         speak_and_display(f"Phonetic: {translated}", lang="en", lcd=None)
-        speak_and_display(definition, lang="id", mode="scroll", lcd=lcd)
+        handle = speak_async(definition, lang="id", mode="scroll", lcd=lcd)
         if example_en:
-            speak_and_display(
+            handle = speak_async(
                 f"Example of use: {example_en}",
                 lang="en", mode="scroll", lcd=lcd
             )
         if example_id:
-            speak_and_display(
+            handle = speak_async(
                 f"Terjemahan: {example_id}",
                 lang="id", mode="scroll", lcd=lcd
             )
@@ -197,29 +201,29 @@ def tampilkan_hasil(
         speak_and_display(
             f"Terjemahan ke Indonesia: {translated}", lang="id", lcd=lcd
         )
-        speak_and_display(definition, lang="id", mode="scroll", lcd=lcd)
+        handle = speak_async(definition, lang="id", mode="scroll", lcd=lcd)
         if example_en:
-            speak_and_display(
+            handle = speak_async(
                 f"Example of use: {example_en}",
                 lang="en", mode="scroll", lcd=lcd
             )
         if example_id:
-            speak_and_display(
+            handle = speak_async(
                 f"Terjemahan: {example_id}",
                 lang="id", mode="scroll", lcd=lcd
             )
 
+    # Pertanyaan berikutnya hampir pasti "coba kata lain?": disintesis selagi hasil diputar
+    prefetch_speech(another_word_prompt(lang), lang=lang)
+    if handle:
+        handle.wait()
+
 
 def tanya_ulang(lang, lcd=None):
     """
     Menanyakan apakah pengguna ingin mencoba kata lain.
     """
-    speak_and_display(
-        "Ingin coba kata lain?"
-        if lang == "id"
-        else "Do you want to try another word?",
-        lang=lang, lcd=lcd
-    )
+    speak_and_display(another_word_prompt(lang), lang=lang, lcd=lcd)
 
     while True:
         audio = record_once(filename="ask_again.wav", lcd=lcd)
@@ -233,7 +237,7 @@ def tanya_ulang(lang, lcd=None):
             )
             continue
 
-        reply = transcribe_auto(audio, lcd=lcd).lower()
+        reply = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS).lower()
         print(f"[USER REPLY] {reply}")
 
         if is_no(reply):
@@ -2,7 +2,7 @@
 from inout.gcp_output import speak_and_display
 from inout.recorder import record_once
 from inout.gcp_transcriber import transcribe_auto
-from utils.response_check import is_yes, is_no, is_help, is_exit
+from utils.response_check import is_yes, is_no, is_help, is_exit, YES_NO_COMMANDS
 from online.gcp_translator_mode import gcp_translator_mode
 from online.gcp_vocabulary_mode import gcp_vocabulary_mode
 from online.gcp_assistant_mode import gcp_assistant_mode
@@ -32,7 +32,7 @@ def tetap_di_online_mode(lcd=None):
             speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
             continue
 
-        reply_raw = transcribe_auto(audio, lcd=lcd) or ""
+        reply_raw = transcribe_auto(audio, lcd=lcd, commands=YES_NO_COMMANDS) or ""
         reply = reply_raw.strip().lower()
         print(f"[USER REPLY] {reply}")
 
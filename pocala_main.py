@@ -6,12 +6,17 @@ import os
 from inout.recorder import record_once
 from inout.piper_output import speak_and_display
 from inout.whisper_transcriber import transcribe_auto
+from inout.whisper_server import whisper_server
+from inout.whisper_models import model_selector
 from inout.display import PocalaDisplay
-from utils.response_check import is_yes, is_no, is_repeat, is_help, is_status
-from utils.response_menu import is_online, is_offline, is_learning_audio
+from utils.response_check import is_yes, is_no, is_repeat, is_help, is_status, YES_NO_COMMANDS
+from utils.response_menu import is_online, is_offline, is_learning_audio, MAIN_MENU_COMMANDS
 from utils.path_helper import get_resource_path
 from animation.idle_manager import IdleManager
 from control.shutdown import shutdown_force
+from utils.cancellation import cancel_turn
+from clients.ollama_residency import ollama_residency
+from clients.ollama_server import ollama_server
 
 SHUTDOWN_FLAG = "/tmp/pocala_shutdown.flag"
 
@@ -23,9 +28,9 @@ def cek_koneksi_internet():
         return False
 
 
-def safe_transcribe(audio, lcd=None):
+def safe_transcribe(audio, lcd=None, commands=None):
     try:
-        return (transcribe_auto(audio, lcd=lcd) or "").lower()
+        return (transcribe_auto(audio, lcd=lcd, commands=commands) or "").lower()
     except Exception as e:
         print(f"[TRANSCRIBE ERROR] {e}")
         return ""
@@ -38,6 +43,9 @@ def monitor_shutdown_signal(lcd, idle_manager=None):
             print("[INFO] Shutdown signal received from system_button.")
             os.remove(SHUTDOWN_FLAG)
 
+            # Putus request LLM/ASR/TTS dan ucapan yang masih berjalan
+            cancel_turn("shutdown")
+
             # Stop animasi idle dulu biar layar clear
             if idle_manager is not None:
                 idle_manager.stop()
@@ -95,7 +103,7 @@ def main(lcd=None):
                 speak_and_display("No audio detected. Please try again.", lang="en", lcd=lcd)
                 continue
 
-            jawaban = safe_transcribe(audio, lcd=lcd)
+            jawaban = safe_transcribe(audio, lcd=lcd, commands=MAIN_MENU_COMMANDS)
             idle_manager.reset()
             print(f"[MENU USER] {jawaban}")
 
@@ -128,6 +136,8 @@ def main(lcd=None):
 
             if is_learning_audio(jawaban):
                 idle_manager.stop()
+                ollama_residency.unload()  # RAM untuk whisper/MarianMT
+                ollama_server.stop()
                 from learning_audio.play_audio import learning_audio_mode
                 learning_audio_mode(lcd=lcd)
                 idle_manager.start()
@@ -141,6 +151,8 @@ def main(lcd=None):
                     )
                     continue
                 idle_manager.stop()
+                ollama_residency.unload()  # mode online memakai Gemini
+                ollama_server.stop()
                 speak_and_display("Entering Online Mode...", lang="en", lcd=lcd)
                 from online.main_online import online_mode
                 online_mode(lcd=lcd)
@@ -175,7 +187,7 @@ def main(lcd=None):
                 )
                 continue
 
-            reply = safe_transcribe(audio, lcd=lcd)
+            reply = safe_transcribe(audio, lcd=lcd, commands=YES_NO_COMMANDS)
             idle_manager.reset()
             print(f"[JAWABAN ULANG] {reply}")
 
@@ -213,6 +225,10 @@ def main(lcd=None):
 
 
 if __name__ == "__main__":
+    # Muat model whisper di background selama welcome screen
+    whisper_server.start(wait=False)
+    # Boot pertama / model baru: ukur RTF tiap tier whisper setelah model utama siap
+    model_selector.start_benchmarks(after_server=whisper_server)
     lcd = PocalaDisplay()
     lcd.clear()
     main(lcd=lcd)
@@ -0,0 +1,194 @@
+# utils/cancellation.py
+# Token pembatalan untuk pekerjaan ASR/LLM/TTS yang sedang berjalan.
+# Satu "giliran" (turn) dimulai setiap kali rekaman baru dimulai; barge-in, shutdown,
+# atau keluar dari mode membatalkan token giliran sehingga request HTTP diputus,
+# subprocess dimatikan, dan audio yang diantrekan dibuang dalam waktu terbatas.
+import subprocess
+import threading
+import time
+
+POLL_INTERVAL = 0.05  # detik, granularitas pengecekan pembatalan saat menunggu
+
+
+class Cancelled(Exception):
+    """Dilempar saat pekerjaan dihentikan karena token dibatalkan."""
+
+
+class CancelToken:
+    """
+    Token pembatalan yang bisa dibagikan ke banyak thread.
+    - cancel() memanggil semua callback on_cancel (mis. menutup koneksi HTTP, kill proses).
+    - child() membuat token turunan yang ikut batal saat induknya batal.
+    """
+
+    def __init__(self, parent=None):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self.reason = None
+        if parent is not None:
+            parent.on_cancel(lambda: self.cancel(parent.reason))
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self, reason=None):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[WARNING] Callback pembatalan gagal: {e}")
+
+    def on_cancel(self, callback):
+        """
+        Daftarkan callback; langsung dipanggil jika token sudah batal.
+        Returns fungsi untuk membatalkan pendaftaran (panggil setelah pekerjaan selesai).
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled(self.reason or "dibatalkan")
+
+    def wait(self, timeout=None):
+        """Tunggu sampai batal. Returns True jika batal dalam batas waktu."""
+        return self._event.wait(timeout)
+
+    def sleep(self, seconds):
+        """time.sleep yang bisa diputus. Returns False jika token batal selama tidur."""
+        return not self._event.wait(seconds)
+
+    def child(self):
+        return CancelToken(parent=self)
+
+
+# === Token giliran global ===
+_turn = CancelToken()
+_turn_lock = threading.Lock()
+
+
+def current_turn():
+    """Token giliran yang sedang berjalan (default untuk semua parameter `cancel=None`)."""
+    return _turn
+
+
+def new_turn():
+    """Mulai giliran baru (dipanggil saat rekaman dimulai). Token lama tidak ikut dibatalkan."""
+    global _turn
+    with _turn_lock:
+        _turn = CancelToken()
+        return _turn
+
+
+def cancel_turn(reason="dibatalkan"):
+    """
+    Batalkan semua pekerjaan giliran saat ini (barge-in, exit, shutdown) dan langsung
+    mulai giliran baru, sehingga prompt sesudahnya tetap bisa berjalan normal.
+    """
+    global _turn
+    with _turn_lock:
+        turn, _turn = _turn, CancelToken()
+    turn.cancel(reason)
+
+
+def resolve(cancel):
+    return cancel if cancel is not None else current_turn()
+
+
+def run_cancellable(func, *args, cancel=None, max_wait=None, discard=None, **kwargs):
+    """
+    Jalankan fungsi blocking yang tidak punya hook pembatalan di thread terpisah.
+    Pemanggil kembali segera saat token batal (Cancelled) atau setelah max_wait detik
+    (TimeoutError). Panggilannya sendiri tetap berjalan sampai selesai, jadi pakai ini hanya
+    untuk tahap yang memang belum bisa diputus, dan berikan `discard`: dipanggil dengan hasil
+    yang terlambat (mis. response.close) agar koneksi/stream-nya langsung diputus.
+    Argumen lain (termasuk `timeout`) diteruskan ke func.
+    """
+    cancel = resolve(cancel)
+    cancel.raise_if_cancelled()
+    lock = threading.Lock()
+    done = threading.Event()
+    outcome = {}
+
+    def target():
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        else:
+            with lock:
+                abandoned = outcome.get("abandoned", False)
+                outcome["result"] = result
+            if abandoned and discard is not None:
+                _discard(discard, result)
+        finally:
+            done.set()
+
+    def abandon():
+        with lock:
+            outcome["abandoned"] = True
+            result = outcome.get("result")
+        if result is not None and discard is not None:
+            _discard(discard, result)
+
+    threading.Thread(target=target, daemon=True).start()
+    deadline = None if max_wait is None else time.monotonic() + max_wait
+    while not done.wait(POLL_INTERVAL):
+        if cancel.cancelled:
+            abandon()
+            cancel.raise_if_cancelled()
+        if deadline is not None and time.monotonic() > deadline:
+            abandon()
+            raise TimeoutError(f"Melebihi batas {max_wait} detik.")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def _discard(discard, result):
+    try:
+        discard(result)
+    except Exception as e:
+        print(f"[WARNING] Gagal memutus hasil yang ditinggalkan: {e}")
+
+
+def run_process(args, cancel=None, timeout=None, input=None, check=False, **kwargs):
+    """
+    Seperti subprocess.run, tetapi proses di-kill saat token batal (lalu Cancelled dilempar).
+    Returns subprocess.CompletedProcess.
+    """
+    cancel = resolve(cancel)
+    cancel.raise_if_cancelled()
+    if kwargs.pop("capture_output", False):
+        kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+    process = subprocess.Popen(args, stdin=subprocess.PIPE if input is not None else None, **kwargs)
+    unregister = cancel.on_cancel(process.kill)
+    try:
+        stdout, stderr = process.communicate(input=input, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        raise
+    finally:
+        unregister()
+    cancel.raise_if_cancelled()
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
@@ -1,6 +1,7 @@
 # utils/cleaned_text.py
 import re
 import unicodedata
+from utils.num_to_text import POLA_ANGKA, ganti_match, kelas_simbol, pola_minus, simbol_map
 
 # --- Regex precompiled untuk hapus emoji & ekspresi ---
 EMOJI_PATTERN = re.compile(
@@ -36,15 +37,185 @@ def hapus_emoji_dan_ekspresi(text: str) -> str:
     return text.strip()
 
 
+MAX_EXPRESSION_CHARS = 160  # "(" yang tidak ditutup sejauh ini dianggap bukan ekspresi
+
+_FENCE = "```"
+_SENTENCE_PUNCT = ".!?"
+
+# Pembersihan + ekspansi angka/simbol dalam satu regex terkompilasi (lihat _normalize_pattern).
+# Urutan alternatif penting: URL dicocokkan sebelum "/" diganti "atau".
+_CLEAN_PARTS = [
+    r"(?P<url>https?://\S+)",
+    f"(?P<drop>[*•{re.escape(QUOTE_CHARS)}]+|{EMOJI_PATTERN.pattern})",
+    r"(?P<slash>/)",
+    r"(?P<dash>–)",
+]
+_NORMALIZE_PATTERNS = {}
+
+
+def _normalize_pattern(lang):
+    """Regex gabungan untuk bahasa `lang` (None = hanya pembersihan, tanpa ekspansi angka/simbol)."""
+    pattern = _NORMALIZE_PATTERNS.get(lang)
+    if pattern is None:
+        parts = list(_CLEAN_PARTS)
+        if lang in simbol_map:
+            # "*" dibuang dan "/" dibaca "atau" oleh pembersihan, jadi tidak ikut dieja
+            kelas = kelas_simbol({k: v for k, v in simbol_map[lang].items() if k not in "*/"})
+            parts.insert(1, pola_minus(kelas_simbol(simbol_map[lang], "/"), tanda="[-–]"))
+            parts.append(f"(?P<symbol>{kelas})")
+            if lang == "id":
+                parts.insert(2, POLA_ANGKA)
+        pattern = _NORMALIZE_PATTERNS[lang] = re.compile("|".join(parts))
+    return pattern
+
+
+class TtsNormalizer:
+    """
+    Normalizer teks TTS satu lintasan yang aman untuk input bertahap (token LLM).
+
+    - feed(delta) -> daftar kalimat siap diucapkan yang sudah lengkap;
+      flush() -> sisa kalimat saat stream selesai.
+    - Blok kode ``` dan ekspresi dalam tanda kurung ditahan sampai ditutup lalu dibuang,
+      walaupun melewati batas potongan/kalimat. Kurung atau blok kode yang tidak pernah
+      ditutup (mis. jawaban LLM terpotong) dibacakan isinya; ")" tanpa pembuka tetap ditulis.
+    - Kalimat yang hanya berisi tanda baca (sisa setelah ekspresi dibuang, mis. "(tertawa).")
+      dilewati karena tidak ada yang bisa diucapkan.
+    - Per kalimat: normalisasi NFKC, lalu pembersihan (URL, markdown, kutip, emoji, "/")
+      dan ekspansi angka/simbol (lang "id"/"en", sama seperti convert_text) dalam satu regex.
+    - Kalimat yang lebih pendek dari min_chars digabung ke kalimat berikutnya.
+    """
+
+    def __init__(self, lang=None, min_chars=0):
+        self.lang = lang
+        self.min_chars = min_chars
+        self._pattern = _normalize_pattern(lang)
+        self._sentence = []    # karakter kalimat saat ini (di luar kurung/blok kode)
+        self._expression = []  # isi kurung yang belum ditutup
+        self._depth = 0
+        self._ticks = 0        # backtick berurutan yang belum diputuskan (inline/fence)
+        self._in_code = False
+        self._code = []        # isi blok kode yang belum ditutup
+        self._boundary = False  # karakter terakhir . ! ? (spasi berikutnya mengakhiri kalimat)
+        self._pending = ""
+
+    def feed(self, delta):
+        out = []
+        for ch in unicodedata.normalize("NFKC", delta):
+            self._push(ch, out)
+        return out
+
+    def flush(self):
+        out = []
+        self._resolve_ticks(out)
+        if self._in_code:
+            self._release_code(out)
+        if self._depth:
+            self._release_expression(out)
+        self._end_sentence(out)
+        if self._pending:
+            out.append(self._pending)
+            self._pending = ""
+        return out
+
+    def normalize(self, text):
+        """Normalisasi teks utuh (batch): semua kalimat digabung dengan spasi."""
+        return " ".join(self.feed(text) + self.flush())
+
+    def _push(self, ch, out):
+        if ch == "`":
+            self._ticks += 1
+            return
+        self._resolve_ticks(out)
+        if self._in_code:
+            self._code.append(ch)
+            return
+        if self._depth:
+            if ch == "(":
+                self._depth += 1
+            elif ch == ")":
+                self._depth -= 1
+                if not self._depth:
+                    self._expression = []
+                    return
+            self._expression.append(ch)
+            if len(self._expression) > MAX_EXPRESSION_CHARS:
+                self._release_expression(out)
+            return
+        if ch == "(":
+            self._depth = 1
+            return
+        if ch == "\n" or (self._boundary and ch.isspace()):
+            self._end_sentence(out)
+            return
+        self._sentence.append(ch)
+        self._boundary = ch in _SENTENCE_PUNCT
+
+    def _resolve_ticks(self, out):
+        """Tiga backtick atau lebih membuka/menutup blok kode; backtick inline dibuang saja."""
+        ticks, self._ticks = self._ticks, 0
+        if ticks >= len(_FENCE):
+            self._in_code = not self._in_code
+            self._code = []
+            if self._in_code and not self._depth:
+                self._end_sentence(out)
+
+    def _release_code(self, out):
+        """Blok kode tanpa penutup: isinya dibacakan sebagai teks biasa."""
+        chars = self._code
+        self._code = []
+        self._in_code = False
+        for ch in chars:
+            self._push(ch, out)
+
+    def _release_expression(self, out):
+        """Kurung tanpa penutup: isinya dibacakan sebagai teks biasa."""
+        chars = self._expression
+        self._expression = []
+        self._depth = 0
+        for ch in chars:
+            self._push(" " if ch == "(" else ch, out)
+
+    def _end_sentence(self, out):
+        text = self._normalize("".join(self._sentence))
+        self._sentence = []
+        self._boundary = False
+        if not text:
+            return
+        self._pending = f"{self._pending} {text}" if self._pending else text
+        if len(self._pending) >= self.min_chars:
+            out.append(self._pending)
+            self._pending = ""
+
+    def _normalize(self, text):
+        text = " ".join(self._pattern.sub(self._replace, text).split())
+        # Kalimat yang tinggal tanda baca (mis. "(tertawa).") tidak perlu dibacakan
+        if not text.strip(".,;:!? "):
+            return ""
+        return text
+
+    def _replace(self, match):
+        kind = match.lastgroup
+        if kind == "url":
+            return " tautan "
+        if kind == "drop":
+            return ""
+        if kind == "slash":
+            return " atau "
+        if kind == "dash":
+            return "-"
+        return ganti_match(match, self.lang)
+
+
 def clean_for_tts(text: str) -> str:
     """
     Bersihkan teks agar aman untuk TTS:
     - Normalisasi unicode (NFKC)
-    - Hapus markdown/backtick/quote
+    - Hapus markdown/backtick/quote dan blok kode
     - Ganti '/' → 'atau'
-    - Hapus emoji & ekspresi
+    - Hapus emoji & ekspresi dalam kurung
     - Ganti URL dengan kata 'tautan'
     - Rapikan spasi
+    Semua dikerjakan TtsNormalizer dalam satu lintasan.
     
     Args:
         text (str): Teks asli dari model/LLM.
@@ -53,29 +224,4 @@ def clean_for_tts(text: str) -> str:
     """
     if not text:
         return ""
-
-    # Normalisasi unicode (ubah fullwidth, tanda mirip, dsb.)
-    t = unicodedata.normalize("NFKC", text)
-
-    # Hapus blok code fence ```...``` dan inline `code`
-    t = re.sub(r"```.*?```", "", t, flags=re.S)
-    t = re.sub(r"`([^`]*)`", r"\1", t)
-
-    # Hilangkan bullet dan simbol markup umum
-    t = t.replace("*", "").replace("•", "").replace("–", "-")
-
-    # Ganti slash dengan kata "atau"
-    t = t.replace("/", " atau ")
-
-    # Hilangkan semua jenis tanda kutip (lurus/keriting/backtick)
-    t = re.sub(f"[{re.escape(QUOTE_CHARS)}]+", "", t)
-
-    # Ganti URL agar tidak dieja karakter per karakter
-    t = re.sub(r"https?://\S+", " tautan ", t)
-
-    # Hapus emoji dan ekspresi dalam tanda kurung
-    t = hapus_emoji_dan_ekspresi(t)
-
-    # Rapikan spasi
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
+    return TtsNormalizer().normalize(text)
@@ -111,23 +111,56 @@ def ubah_angka_ke_kata(angka_str):
     return hasil.strip()
 
 
-def angka_ke_kata_id(text):
+# Kata pengganti " - " (spasi di kedua sisi) sebagai operasi pengurangan
+minus_kata = {"id": "kurang", "en": "minus"}
+simbol_map = {"id": simbol_map_id, "en": simbol_map_en}
+
+POLA_ANGKA = r"(?P<number>\d+(?:\.\d+)?)"
+
+
+def kelas_simbol(simbol_map_lang, tambahan=""):
+    """Kelas karakter regex untuk simbol yang diganti kata ("-" ditangani pola_minus)."""
+    simbol = "".join(s for s in simbol_map_lang if s != "-") + tambahan
+    return f"[{re.escape(simbol)}]"
+
+
+def pola_minus(kelas, tanda="-"):
     """
-    Mengonversi angka dan simbol menjadi kata-kata
-    dalam Bahasa Indonesia.
+    " - " sebagai pengurangan. Simbol di sebelahnya ikut dihitung sebagai spasi karena
+    simbol diganti " kata " (sama seperti penggantian berurutan sebelumnya).
     """
+    return rf"(?P<minus>(?:\s|(?<={kelas})){tanda}(?:\s|(?={kelas})))"
+
 
-    def ganti_angka(match):
-        return ubah_angka_ke_kata(match.group(0))
+def pola_konversi(lang):
+    kelas = kelas_simbol(simbol_map[lang])
+    bagian = [pola_minus(kelas), f"(?P<symbol>{kelas})"]
+    if lang == "id":
+        bagian.insert(0, POLA_ANGKA)
+    return "|".join(bagian)
 
-    text = re.sub(r"\d+(\.\d+)?", ganti_angka, text)
 
-    for simbol, kata in simbol_map_id.items():
-        if simbol != "-":
-            text = text.replace(simbol, f" {kata} ")
+# Satu regex terkompilasi per bahasa: angka (khusus id), " - ", dan simbol diganti
+# dalam satu lintasan (sebelumnya satu str.replace per simbol).
+_POLA_KONVERSI = {lang: re.compile(pola_konversi(lang)) for lang in simbol_map}
 
-    text = re.sub(r"\s-\s", " kurang ", text)
-    return re.sub(r"\s+", " ", text).strip()
+
+def ganti_match(match, lang):
+    """Teks pengganti untuk satu match pola konversi (dipakai juga oleh normalizer TTS)."""
+    jenis = match.lastgroup
+    if jenis == "number":
+        return ubah_angka_ke_kata(match.group())
+    if jenis == "minus":
+        return f" {minus_kata[lang]} "
+    return f" {simbol_map[lang][match.group()]} "
+
+
+def angka_ke_kata_id(text):
+    """
+    Mengonversi angka dan simbol menjadi kata-kata
+    dalam Bahasa Indonesia.
+    """
+    return convert_text(text, lang="id")
 
 
 def simbol_ke_kata_en(text):
@@ -135,12 +168,7 @@ def simbol_ke_kata_en(text):
     Mengonversi simbol matematika ke kata dalam Bahasa Inggris.
     Angka tidak diubah.
     """
-    for simbol, kata in simbol_map_en.items():
-        if simbol != "-":
-            text = text.replace(simbol, f" {kata} ")
-
-    text = re.sub(r"\s-\s", " minus ", text)
-    return re.sub(r"\s+", " ", text).strip()
+    return convert_text(text, lang="en")
 
 
 def convert_text(text, lang="id"):
@@ -149,8 +177,8 @@ def convert_text(text, lang="id"):
     - "id": ubah angka + simbol ke kata (Bahasa Indonesia)
     - "en": ubah simbol ke kata (Bahasa Inggris)
     """
-    if lang.lower() == "id":
-        return angka_ke_kata_id(text)
-    if lang.lower() == "en":
-        return simbol_ke_kata_en(text)
-    return text
+    lang = lang.lower()
+    pola = _POLA_KONVERSI.get(lang)
+    if pola is None:
+        return text
+    return " ".join(pola.sub(lambda match: ganti_match(match, lang), text).split())
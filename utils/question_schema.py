@@ -0,0 +1,206 @@
+# question_schema.py
+# Keluaran terstruktur (JSON schema) untuk mode soal latihan offline (Ollama `format`)
+# dan online (Gemini response_schema): soal dan penilaian dikembalikan sebagai JSON,
+# divalidasi menjadi QuestionItem / Evaluation, dan LLM hanya ditanya ulang jika
+# keluarannya melanggar schema (dengan batas MAX_REASKS).
+import json
+import re
+
+MAX_REASKS = 2  # pertanyaan ulang setelah percobaan pertama (total maksimal 3 request)
+OPTION_LETTERS = ["A", "B", "C", "D"]
+VERDICTS = {
+    "multiple choice": ["benar", "salah"],
+    "short answer": ["benar", "hampir benar", "salah"],
+}
+# Kata kunci JSON schema yang didukung response_schema Gemini
+_GEMINI_KEYS = {"type", "properties", "required", "items", "enum", "description"}
+
+
+class SchemaError(ValueError):
+    """Keluaran LLM bukan JSON yang sesuai schema."""
+
+
+def question_schema(question_type):
+    """JSON schema satu soal; pilihan ganda punya tepat empat opsi dan kunci huruf A-D."""
+    properties = {
+        "question": {"type": "string", "description": "Question text without options or answer"},
+        "answer": {"type": "string", "description": "Correct answer"},
+        "rationale": {"type": "string", "description": "One short sentence explaining the answer"},
+    }
+    required = ["question", "answer", "rationale"]
+    if question_type == "multiple choice":
+        properties["options"] = {
+            "type": "array",
+            "items": {"type": "string"},
+            "minItems": len(OPTION_LETTERS),
+            "maxItems": len(OPTION_LETTERS),
+            "description": "Four answer choices in order A, B, C, D, without the letter labels",
+        }
+        properties["answer"] = {
+            "type": "string",
+            "enum": OPTION_LETTERS,
+            "description": "Letter of the correct option",
+        }
+        required.insert(1, "options")
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def evaluation_schema(question_type):
+    """JSON schema penilaian jawaban: verdict dari VERDICTS dan alasan dalam Bahasa Indonesia."""
+    return {
+        "type": "object",
+        "properties": {
+            "verdict": {"type": "string", "enum": VERDICTS[question_type]},
+            "reason": {"type": "string", "description": "Penjelasan singkat dan jawaban yang benar"},
+        },
+        "required": ["verdict", "reason"],
+    }
+
+
+def gemini_schema(schema):
+    """Ubah JSON schema menjadi subset yang diterima response_schema Gemini."""
+    converted = {}
+    for key, value in schema.items():
+        if key not in _GEMINI_KEYS:
+            continue
+        if key == "type":
+            value = value.upper()
+        elif key == "properties":
+            value = {name: gemini_schema(prop) for name, prop in value.items()}
+        elif key == "items":
+            value = gemini_schema(value)
+        converted[key] = value
+    if "enum" in converted:
+        converted["format"] = "enum"
+    return converted
+
+
+def _load_object(raw):
+    """Parse teks model menjadi dict JSON (pagar ```json diabaikan)."""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", (raw or "").strip())
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise SchemaError(f"bukan JSON yang valid ({e})")
+    if not isinstance(data, dict):
+        raise SchemaError("JSON harus berupa object")
+    return data
+
+
+def _text_field(data, name):
+    value = data.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise SchemaError(f"field '{name}' harus berupa teks yang tidak kosong")
+    return value.strip()
+
+
+class QuestionItem:
+    """
+    Satu soal latihan tervalidasi.
+    - options: teks pilihan tanpa label huruf ([] untuk jawaban singkat).
+    - answer: huruf A-D untuk pilihan ganda, teks jawaban untuk jawaban singkat.
+    """
+
+    def __init__(self, question, options, answer, rationale=""):
+        self.question = question
+        self.options = options
+        self.answer = answer
+        self.rationale = rationale
+
+    @classmethod
+    def from_json(cls, raw, question_type):
+        """Parse dan validasi keluaran model. Melempar SchemaError jika tidak sesuai schema."""
+        data = _load_object(raw)
+        question = _text_field(data, "question")
+        answer = _text_field(data, "answer")
+        rationale = data.get("rationale")
+        rationale = rationale.strip() if isinstance(rationale, str) else ""
+        if question_type != "multiple choice":
+            return cls(question, [], answer, rationale)
+
+        options = data.get("options")
+        if (not isinstance(options, list) or len(options) != len(OPTION_LETTERS)
+                or not all(isinstance(option, str) and option.strip() for option in options)):
+            raise SchemaError(f"field 'options' harus berisi tepat {len(OPTION_LETTERS)} teks")
+        # Label "A)" / "A." yang tetap ditulis model dibuang, bukan dianggap pelanggaran
+        options = [re.sub(r"^[A-D][).:]\s*", "", option.strip()) for option in options]
+
+        lowered = [option.lower() for option in options]
+        letter = re.match(r"^([A-D])(?:[).:\s]|$)", answer.upper())
+        if answer.lower() in lowered:
+            answer = OPTION_LETTERS[lowered.index(answer.lower())]
+        elif letter:
+            answer = letter.group(1)
+        else:
+            raise SchemaError(f"field 'answer' harus salah satu huruf {'/'.join(OPTION_LETTERS)}")
+        return cls(question, options, answer, rationale)
+
+    def option_lines(self):
+        """Pilihan berlabel untuk diucapkan/ditampilkan: ["A) ...", "B) ...", ...]."""
+        return [f"{letter}) {option}" for letter, option in zip(OPTION_LETTERS, self.options)]
+
+    def answer_text(self):
+        """Kunci jawaban lengkap, mis. "B) went" (atau teks jawaban untuk jawaban singkat)."""
+        if self.options:
+            return f"{self.answer}) {self.options[OPTION_LETTERS.index(self.answer)]}"
+        return self.answer
+
+    def local_evaluation(self, user_answer):
+        """
+        Penilaian tanpa LLM (dipakai jika penilaian model gagal): pilihan ganda dicocokkan
+        dengan kunci; jawaban singkat tidak dinilai, hanya kunci jawabannya yang disebutkan.
+        """
+        reason = f"Jawaban yang benar: {self.answer_text()}. {self.rationale}".strip()
+        if not self.options:
+            return Evaluation("", reason)
+        return Evaluation("benar" if user_answer == self.answer else "salah", reason)
+
+
+class Evaluation:
+    """Hasil penilaian jawaban pengguna: verdict (lihat VERDICTS, "" jika tidak dinilai) dan alasan."""
+
+    def __init__(self, verdict, reason):
+        self.verdict = verdict
+        self.reason = reason
+
+    @classmethod
+    def from_json(cls, raw, question_type):
+        data = _load_object(raw)
+        verdict = _text_field(data, "verdict").lower()
+        if verdict not in VERDICTS[question_type]:
+            raise SchemaError(f"field 'verdict' harus salah satu dari {VERDICTS[question_type]}")
+        return cls(verdict, _text_field(data, "reason"))
+
+
+def ask_with_schema(ask, parse, label="Keluaran", max_reasks=MAX_REASKS):
+    """
+    Minta keluaran terstruktur dengan batas tanya ulang.
+
+    Parameters:
+    - ask(invalid): kirim request dan kembalikan teks model. `invalid` None pada percobaan
+      pertama, atau (teks_sebelumnya, pesan_error) agar prompt bisa meminta perbaikan.
+    - parse(teks): kembalikan objek tervalidasi atau lempar SchemaError.
+
+    Returns:
+    - Objek hasil parse, atau None jika request gagal/dibatalkan (tidak ditanya ulang:
+      klien LLM sudah punya retry sendiri) atau schema tetap dilanggar setelah max_reasks.
+    """
+    invalid = None
+    for attempt in range(max_reasks + 1):
+        raw = ask(invalid)
+        if not raw or raw.startswith("[Gagal]"):
+            return None
+        try:
+            return parse(raw)
+        except SchemaError as e:
+            print(f"[WARNING] {label} tidak sesuai schema (percobaan {attempt + 1}/{max_reasks + 1}): {e}")
+            invalid = (raw, str(e))
+    return None
+
+
+def repair_prompt(error):
+    """Pesan user untuk tanya ulang setelah keluaran melanggar schema."""
+    return (
+        f"Your previous reply was invalid: {error}.\n"
+        "Reply again with only the JSON object that matches the required schema."
+    )
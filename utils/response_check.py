@@ -1,76 +1,133 @@
+import difflib
+import re
+
+YES_KEYWORDS = [
+    "yes", "ya", "yup", "sure", "oke",
+    "iya", "ayo", "lanjut", "yeah", "yea", "betul"
+]
+
+NO_KEYWORDS = [
+    "no", "tidak", "gak", "nggak", "ga",
+    "cukup", "nope", "not", "jangan", "nein"
+]
+
+EXIT_KEYWORDS = [
+    "exit", "x it", "x-sit"
+]
+
+CLEAR_CONTEXT_KEYWORDS = [
+    "hapus konteks", "reset konteks", "lupakan", "forget context",
+    "clear context", "bersihkan konteks", "reset memory", "clear memory",
+    "forget memory", "hapus memori", "hapus ingatan", "bersihkan ingatan"
+]
+
+REPEAT_KEYWORDS = [
+    "ulang", "ulangi", "repeat", "say again", "once more",
+    "bisa diulang", "repeat please", "ulang lagi", "rip"
+]
+
+HELP_KEYWORDS = ["help", "bantuan", "panduan", "guide", "manual", "cara pakai", "hell"]
+
+STATUS_KEYWORDS = ["status", "informasi", "cek status", "info", "statistik", "stat"]
+
+# Himpunan perintah untuk pertanyaan tertutup ya/tidak (dipakai transcriber `commands=`)
+YES_NO_COMMANDS = YES_KEYWORDS + NO_KEYWORDS + REPEAT_KEYWORDS + HELP_KEYWORDS + EXIT_KEYWORDS
+
+# Salah dengar Whisper yang umum ("exit" → "x it", "repeat" → "rip", "help" → "hell").
+# Hanya untuk pencocokan; tidak dimasukkan ke initial prompt agar decoder tidak diarahkan ke sana.
+COMMAND_ALIASES = {"x it", "x-sit", "rip", "hell"}
+
+COMMAND_FUZZY_CUTOFF = 0.8
+
+
 def is_yes(text):
     """
     Deteksi apakah input teks mengandung ekspresi afirmatif (setuju).
     """
-    yes_keywords = [
-        "yes", "ya", "yup", "sure", "oke",
-        "iya", "ayo", "lanjut", "yeah", "yea", "betul"
-    ]
     text = text.lower().strip()
-    return any(word in text for word in yes_keywords)
+    return any(word in text for word in YES_KEYWORDS)
 
 
 def is_no(text):
     """
     Deteksi apakah input teks mengandung ekspresi negatif (menolak).
     """
-    no_keywords = [
-        "no", "tidak", "gak", "nggak", "ga",
-        "cukup", "nope", "not", "jangan", "nein"
-    ]
     text = text.lower().strip()
-    return any(word in text for word in no_keywords)
+    return any(word in text for word in NO_KEYWORDS)
 
 
 def is_exit(text):
     """
     Deteksi apakah input teks mengandung perintah keluar eksplisit.
     """
-    exit_keywords = [
-        "exit", "x it", "x-sit"
-    ]
     text = text.lower().strip()
-    return any(word in text for word in exit_keywords)
+    return any(word in text for word in EXIT_KEYWORDS)
 
 
 def is_clear_context(text):
     """
     Deteksi apakah input teks mengandung perintah untuk menghapus atau mereset konteks.
     """
-    clear_keywords = [
-        "hapus konteks", "reset konteks", "lupakan", "forget context",
-        "clear context", "bersihkan konteks", "reset memory", "clear memory",
-        "forget memory", "hapus memori", "hapus ingatan", "bersihkan ingatan"
-    ]
     text = text.lower().strip()
-    return any(word in text for word in clear_keywords)
+    return any(word in text for word in CLEAR_CONTEXT_KEYWORDS)
 
 
 def is_repeat(text):
     """
     Deteksi apakah input teks mengandung permintaan untuk mengulang pertanyaan.
     """
-    repeat_keywords = [
-        "ulang", "ulangi", "repeat", "say again", "once more",
-        "bisa diulang", "repeat please", "ulang lagi", "rip"
-    ]
     text = text.lower().strip()
-    return any(word in text for word in repeat_keywords)
-    
-    
+    return any(word in text for word in REPEAT_KEYWORDS)
+
+
 def is_help(text: str) -> bool:
     """
     Deteksi apakah input user meminta 'help'.
     """
-    keywords = ["help", "bantuan", "panduan", "guide", "manual", "cara pakai", "hell"]
     text = text.lower().strip()
-    return any(word in text for word in keywords)
+    return any(word in text for word in HELP_KEYWORDS)
 
 
 def is_status(text: str) -> bool:
     """
     Deteksi apakah input user memilih 'status'.
     """
-    keywords = ["status", "informasi", "cek status", "info", "statistik", "stat"]
     text = text.lower().strip()
-    return any(word in text for word in keywords)
+    return any(word in text for word in STATUS_KEYWORDS)
+
+
+def command_prompt(commands):
+    """
+    Initial prompt Whisper untuk daftar perintah: hanya kata kanonis, tanpa duplikat
+    dan tanpa alias salah dengar (COMMAND_ALIASES).
+    """
+    return ", ".join(c for c in dict.fromkeys(commands) if c not in COMMAND_ALIASES)
+
+
+def match_command(text, commands, cutoff=COMMAND_FUZZY_CUTOFF):
+    """
+    Cocokkan transkrip pendek dengan daftar perintah yang diharapkan.
+
+    Perintah yang muncul utuh (per kata) di teks langsung cocok; selain itu
+    dicoba kemiripan ejaan (difflib) per kata dan per frasa.
+
+    Returns:
+        str perintah yang cocok, atau None.
+    """
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    normalized = " ".join(words)
+    phrases = {" ".join(re.findall(r"\w+", c.lower())): c for c in commands}
+    phrases.pop("", None)
+
+    for phrase, command in phrases.items():
+        if re.search(rf"\b{re.escape(phrase)}\b", normalized):
+            return command
+
+    candidates = [normalized] + words
+    for candidate in candidates:
+        close = difflib.get_close_matches(candidate, phrases.keys(), n=1, cutoff=cutoff)
+        if close:
+            return phrases[close[0]]
+    return None
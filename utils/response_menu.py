@@ -1,27 +1,38 @@
 # utils/response_menu.py
+from utils.response_check import HELP_KEYWORDS, STATUS_KEYWORDS, REPEAT_KEYWORDS
+
+ONLINE_KEYWORDS = ["online", "online mode", "mode online", "internet"]
+
+OFFLINE_KEYWORDS = ["offline", "offline mode", "mode offline", "luring"]
+
+LEARNING_AUDIO_KEYWORDS = ["learn", "learning audio", "audio belajar", "belajar audio", "music","musik", "lagu", "belajar musik"]
+
+# Himpunan perintah menu utama (dipakai transcriber `commands=`)
+MAIN_MENU_COMMANDS = (
+    ONLINE_KEYWORDS + OFFLINE_KEYWORDS + LEARNING_AUDIO_KEYWORDS
+    + HELP_KEYWORDS + STATUS_KEYWORDS + REPEAT_KEYWORDS
+)
+
 
 def is_online(text: str) -> bool:
     """
     Deteksi apakah input user memilih 'online mode'.
     """
-    keywords = ["online", "online mode", "mode online", "internet"]
     text = text.lower().strip()
-    return any(word in text for word in keywords)
+    return any(word in text for word in ONLINE_KEYWORDS)
 
 
 def is_offline(text: str) -> bool:
     """
     Deteksi apakah input user memilih 'offline mode'.
     """
-    keywords = ["offline", "offline mode", "mode offline", "luring"]
     text = text.lower().strip()
-    return any(word in text for word in keywords)
+    return any(word in text for word in OFFLINE_KEYWORDS)
 
 
 def is_learning_audio(text: str) -> bool:
     """
     Deteksi apakah input user memilih 'learning audio'.
     """
-    keywords = ["learn", "learning audio", "audio belajar", "belajar audio", "music","musik", "lagu", "belajar musik"]
     text = text.lower().strip()
-    return any(word in text for word in keywords)
+    return any(word in text for word in LEARNING_AUDIO_KEYWORDS)